@@ -1,7 +1,11 @@
 import streamlit as st
 import os
-from datetime import datetime
-import google.generativeai as genai
+from datetime import date, datetime, time
+from controllers import AppController
+from models import AppointmentStatus, Patient, UserRole
+from services.gemini import GeminiClient
+from services.metrics import METRICS
+from storage import SQLiteStorage
 
 st.set_page_config(page_title="MediBook", page_icon="💨", layout="wide")
 
@@ -16,51 +20,67 @@ def inject_css():
 
 inject_css()
 
-if "auth" not in st.session_state:
-    st.session_state.auth = False
-    st.session_state.user = None
-    st.session_state.booking = False
-    st.session_state.doc_sel = None
-    st.session_state.appointments = []
+for key, value in (("token", None), ("booking", False), ("doc_sel", None)):
+    st.session_state.setdefault(key, value)
+
+@st.cache_resource
+def get_gemini_client(api_key: str) -> GeminiClient:
+    return GeminiClient.from_env(api_key=api_key)
+
+@st.cache_resource
+def get_controller(api_key: str | None) -> AppController:
+    db = os.getenv("MEDIBOOK_DB")
+    return AppController(SQLiteStorage(db) if db else None, gemini=get_gemini_client(api_key) if api_key else None,
+                         admin_password=st.secrets.get("MEDIBOOK_ADMIN_PASSWORD"))
+
+@st.cache_data(max_entries=256)
+def doctor_cards(directory_version: int, search: str) -> list[dict]:
+    page = get_controller(api_key).search_doctors(text=search or None, limit=50)
+    return [{"id": d.id, "name": d.name, "spec": d.speciality, "exp": d.experience_years, "loc": d.location} for d in page.items]
+
+@st.cache_data(max_entries=2048)
+def slot_options(doctor_version: int, doctor_id: str, day: date) -> list[tuple[str, str]]:
+    slots = get_controller(api_key).get_free_slots(doctor_id, datetime.combine(day, time()))
+    return [(s.slot_id, s.start_time.strftime("%I:%M %p")) for s in slots]
+
+@st.cache_data(max_entries=2048)
+def appointment_rows(patient_version: int, patient_id: str) -> list[dict]:
+    c = get_controller(api_key)
+    rows = []
+    for appt in c.get_patient_appointments(c.auth.find_user_by_id(patient_id), statuses=[AppointmentStatus.BOOKED]):
+        doc, slot = c.get_doctor(appt.doctor_id), c.get_slot(appt.slot_id)
+        rows.append({"id": appt.appointment_id, "doctor": doc.name, "spec": doc.speciality,
+                     "date": str(slot.date.date()), "time": slot.start_time.strftime("%I:%M %p")})
+    return rows
 
 api_key = st.secrets.get("GEMINI_API_KEY", os.getenv("GEMINI_API_KEY"))
-if api_key:
-    genai.configure(api_key=api_key)
-    ai_ok = True
-else:
-    ai_ok = False
+controller = get_controller(api_key)
+user = controller.resume_session(st.session_state.token)
 
-docs = [
-    {"id": 1, "name": "Dr. Sarah Johnson", "spec": "Cardiology", "exp": 12, "loc": "New York"},
-    {"id": 2, "name": "Dr. Michael Chen", "spec": "Neurology", "exp": 8, "loc": "San Francisco"},
-    {"id": 3, "name": "Dr. Emily Rodriguez", "spec": "Dermatology", "exp": 6, "loc": "Los Angeles"},
-    {"id": 4, "name": "Dr. James Wilson", "spec": "Orthopedics", "exp": 15, "loc": "Chicago"},
-    {"id": 5, "name": "Dr. Lisa Anderson", "spec": "Pediatrics", "exp": 10, "loc": "Houston"},
-    {"id": 6, "name": "Dr. Robert Kumar", "spec": "Oncology", "exp": 20, "loc": "Boston"},
-    {"id": 7, "name": "Dr. Jessica Lee", "spec": "Pulmonology", "exp": 9, "loc": "Seattle"},
-    {"id": 8, "name": "Dr. David Martinez", "spec": "Gastroenterology", "exp": 14, "loc": "Miami"},
-    {"id": 9, "name": "Dr. Priya Patel", "spec": "Psychiatry", "exp": 11, "loc": "Denver"},
-    {"id": 10, "name": "Dr. Christopher Brown", "spec": "Ophthalmology", "exp": 7, "loc": "Austin"},
-    {"id": 11, "name": "Dr. Amanda White", "spec": "Endocrinology", "exp": 13, "loc": "Philadelphia"},
-    {"id": 12, "name": "Dr. Thomas Garcia", "spec": "Urology", "exp": 18, "loc": "Dallas"},
-    {"id": 13, "name": "Dr. Victoria Lee", "spec": "Rheumatology", "exp": 9, "loc": "Portland"},
-    {"id": 14, "name": "Dr. William Harris", "spec": "Nephrology", "exp": 12, "loc": "Atlanta"},
-    {"id": 15, "name": "Dr. Sophie Clark", "spec": "Hematology", "exp": 10, "loc": "Phoenix"},
-]
+TIME_WINDOWS = {"morning": (time(0), time(12)), "afternoon": (time(12), time(17)), "evening": (time(17), time(23, 59))}
 
-def find_doc_by_spec(spec):
-    for d in docs:
-        if d["spec"].lower() == spec.lower():
-            return d
-    return docs[0]
+def book_earliest(patient: Patient, spec: str, date_str: str | None, window: tuple | None):
+    try:
+        day = datetime.fromisoformat(date_str) if date_str else None
+    except ValueError:
+        day = None
+    time_from, time_to = window or (None, None)
+    found = controller.find_earliest_slots(speciality=spec, limit=1, date_from=day, time_from=time_from, time_to=time_to)
+    if not found and window:
+        found = controller.find_earliest_slots(speciality=spec, limit=1, date_from=day)
+    if not found:
+        raise ValueError(f"No free {spec} slots available")
+    doc, slot = found[0]
+    return doc, slot, controller.book_appointment(patient, doc, slot.slot_id)
 
 with st.sidebar:
     st.markdown("### 📄 MediBook")
     st.markdown('<span class="accent-pill">OOAD Capstone</span>', unsafe_allow_html=True)
-    if st.session_state.auth:
-        st.markdown(f"**{st.session_state.user}**")
+    if user:
+        st.markdown(f"**{user.name}**")
         if st.button("🚪 Logout", use_container_width=True):
-            st.session_state.auth = False
+            controller.logout(st.session_state.token)
+            st.session_state.token = None
             st.session_state.booking = False
             st.rerun()
     else:
@@ -71,11 +91,13 @@ with st.sidebar:
             p = st.text_input("Password", type="password")
             if st.button("Sign In", use_container_width=True):
                 if e and p:
-                    st.session_state.auth = True
-                    st.session_state.user = e.split("@")[0]
-                    st.session_state.appointments = []
-                    st.success("Logged in!")
-                    st.rerun()
+                    session = controller.create_session(e, p)
+                    if session:
+                        st.session_state.token = session[1]
+                        st.success("Logged in!")
+                        st.rerun()
+                    else:
+                        st.error("Invalid email or password")
         else:
             st.subheader("✍️ Register")
             n = st.text_input("Name")
@@ -83,31 +105,71 @@ with st.sidebar:
             p = st.text_input("Password", type="password")
             if st.button("Create", use_container_width=True):
                 if n and e and p:
-                    st.session_state.auth = True
-                    st.session_state.user = n
-                    st.session_state.appointments = []
-                    st.success("Account created!")
-                    st.rerun()
+                    try:
+                        patient = controller.register_patient(n, e, p)
+                    except ValueError as err:
+                        st.error(str(err))
+                    else:
+                        st.session_state.token = controller.start_session(patient)
+                        st.success("Account created!")
+                        st.rerun()
 
-if not st.session_state.auth:
+if not user:
     st.markdown('<div class="section-title">Welcome to MediBook</div>', unsafe_allow_html=True)
     st.write("### Smart medical scheduling, reimagined.")
     st.write("Book appointments with AI-assisted recommendations.")
+elif user.role == UserRole.ADMIN:
+    st.markdown('<div class="section-title">Admin - Performance</div>', unsafe_allow_html=True)
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        enabled = st.toggle("Record latencies", value=METRICS.enabled)
+        if enabled != METRICS.enabled:
+            controller.set_metrics_enabled(enabled)
+    with c2:
+        profiling = st.toggle("Sampling profiler", value=METRICS.profiler.running)
+        if profiling != METRICS.profiler.running:
+            controller.set_profiling(profiling)
+    with c3:
+        if st.button("Reset", use_container_width=True):
+            METRICS.reset()
+            METRICS.profiler.reset()
+    snapshot = controller.metrics_snapshot()
+    if snapshot:
+        st.dataframe([{"operation": name, **row} for name, row in snapshot.items()], use_container_width=True, hide_index=True)
+    else:
+        st.info("No latencies recorded yet")
+    if METRICS.profiler.samples:
+        st.write("**Hottest functions (samples)**")
+        st.dataframe([{"function": fn, "samples": n} for fn, n in controller.profile_top()], use_container_width=True, hide_index=True)
+    with st.expander("Prometheus export"):
+        st.code(controller.metrics_prometheus(), language="text")
+    report = controller.get_admin_report()
+    st.write("**Appointments by speciality**")
+    st.dataframe([{"speciality": spec, **row} for spec, row in report.by_speciality().items()], use_container_width=True, hide_index=True)
+elif not isinstance(user, Patient):
+    st.markdown('<div class="section-title">Doctor Dashboard</div>', unsafe_allow_html=True)
+    st.info("Booking is available to patient accounts.")
 else:
     if st.session_state.booking and st.session_state.doc_sel:
-        doc = st.session_state.doc_sel
-        st.markdown(f'<div class="section-title">Book with Dr. {doc["name"].split()[-1]}</div>', unsafe_allow_html=True)
+        doc = controller.get_doctor(st.session_state.doc_sel)
+        st.markdown(f'<div class="section-title">Book with Dr. {doc.name.split()[-1]}</div>', unsafe_allow_html=True)
         d = st.date_input("Date", min_value=datetime.now().date())
-        t = st.selectbox("Time", ["09:00 AM", "10:00 AM", "11:00 AM", "02:00 PM", "03:00 PM", "04:00 PM"])
+        options = {label: slot_id for slot_id, label in slot_options(controller.doctor_version(doc.id), doc.id, d)}
+        t = st.selectbox("Time", list(options)) if options else None
+        if not options:
+            st.info("No free slots on this day")
         c1, c2 = st.columns(2)
         with c1:
-            if st.button("✅ Confirm", use_container_width=True):
-                appt = {"doctor": doc["name"], "spec": doc["spec"], "date": str(d), "time": t, "id": len(st.session_state.appointments) + 1}
-                st.session_state.appointments.append(appt)
-                st.success(f"Booked! Dr. {doc['name']} on {d} at {t}")
-                st.session_state.booking = False
-                st.session_state.doc_sel = None
-                st.rerun()
+            if st.button("✅ Confirm", use_container_width=True, disabled=not t):
+                try:
+                    controller.book_appointment(user, doc, options[t])
+                except ValueError as err:
+                    st.error(str(err))
+                else:
+                    st.success(f"Booked! {doc.name} on {d} at {t}")
+                    st.session_state.booking = False
+                    st.session_state.doc_sel = None
+                    st.rerun()
         with c2:
             if st.button("❌ Back", use_container_width=True):
                 st.session_state.booking = False
@@ -117,7 +179,7 @@ else:
         if page == "Doctors":
             st.markdown('<div class="section-title">Browse Doctors</div>', unsafe_allow_html=True)
             search = st.text_input("Search")
-            flt = [d for d in docs if not search or search.lower() in d["spec"].lower()]
+            flt = doctor_cards(controller.directory_version(), search.strip())
             cols = st.columns(2)
             for i, d in enumerate(flt):
                 with cols[i % 2]:
@@ -125,58 +187,46 @@ else:
                     st.markdown(f"**Dr. {d['name'].split()[-1]}** - {d['spec']}")
                     st.write(f"{d['exp']}y | {d['loc']}")
                     if st.button("Book", key=f"b{d['id']}", use_container_width=True):
-                        st.session_state.doc_sel = d
+                        st.session_state.doc_sel = d["id"]
                         st.session_state.booking = True
                         st.rerun()
                     st.markdown('</div>', unsafe_allow_html=True)
         elif page == "Appointments":
             st.markdown('<div class="section-title">My Appointments</div>', unsafe_allow_html=True)
-            if not st.session_state.appointments:
+            appointments = appointment_rows(controller.patient_version(user.id), user.id)
+            if not appointments:
                 st.info("📌 No appointments yet")
             else:
-                for appt in st.session_state.appointments:
+                for appt in appointments:
                     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-                    st.write(f"**Dr. {appt['doctor']}** - {appt['spec']}")
+                    st.write(f"**{appt['doctor']}** - {appt['spec']}")
                     st.write(f"📅 {appt['date']} at {appt['time']}")
                     if st.button(f"Cancel", key=f"cancel_{appt['id']}", use_container_width=True):
-                        st.session_state.appointments.remove(appt)
-                        st.success("Appointment cancelled")
-                        st.rerun()
+                        try:
+                            controller.cancel_appointment(user, appt["id"])
+                        except ValueError as err:
+                            st.error(str(err))
+                        else:
+                            st.success("Appointment cancelled")
+                            st.rerun()
                     st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.markdown('<div class="section-title">AI Assistant - Book Appointment</div>', unsafe_allow_html=True)
-            if not ai_ok:
-                st.error("API not configured")
-            else:
-                q = st.text_area("Describe your appointment need (e.g., 'I need a cardiologist next week'):")
-                if st.button("Ask AI to Book", use_container_width=True):
-                    if q.strip():
-                        with st.spinner("Processing..."):
-                            try:
-                                m = genai.GenerativeModel('gemini-2.5-flash')
-                                r = m.generate_content(f"""You are a medical appointment booking assistant. Parse this request and extract:
-1. Medical speciality needed
-2. Preferred date (if mentioned)
-3. Time preference
-
-Request: {q}
-
-Respond with ONLY: speciality|date|time
-Example: Cardiology|2025-12-26|10:00 AM
-
-If date is not specified, use 2025-12-26. If time is not specified, use 10:00 AM.""")
-                                parts = r.text.strip().split('|')
-                                spec = parts[0].strip() if len(parts) > 0 else "Cardiology"
-                                date_str = parts[1].strip() if len(parts) > 1 else str(datetime.now().date())
-                                time_str = parts[2].strip() if len(parts) > 2 else "10:00 AM"
-                                doc = find_doc_by_spec(spec)
-                                appt = {"doctor": doc["name"], "spec": doc["spec"], "date": date_str, "time": time_str, "id": len(st.session_state.appointments) + 1}
-                                st.session_state.appointments.append(appt)
-                                st.success(f"🤖 AI Booked! Dr. {doc['name']} ({doc['spec']}) on {date_str} at {time_str}")
-                            except Exception as e:
-                                st.error(f"Error: {str(e)[:80]}")
-                    else:
-                        st.warning("Please describe your appointment need")
+            q = st.text_area("Describe your appointment need (e.g., 'I need a cardiologist next week'):")
+            if st.button("Ask AI to Book", use_container_width=True):
+                if q.strip():
+                    with st.spinner("Processing..."):
+                        try:
+                            parsed = controller.parse_request(q)
+                            spec = parsed.get("speciality")
+                            if not spec:
+                                raise ValueError("Could not tell which speciality you need")
+                            doc, slot, _ = book_earliest(user, spec, parsed.get("date_hint"), TIME_WINDOWS.get(parsed.get("preferred_time_of_day")))
+                            st.success(f"🤖 AI Booked! {doc.name} ({doc.speciality}) on {slot.date.date()} at {slot.start_time.strftime('%I:%M %p')}")
+                        except Exception as e:
+                            st.error(f"Error: {str(e)[:80]}")
+                else:
+                    st.warning("Please describe your appointment need")
 
 st.divider()
 st.markdown("<div style='text-align:center;color:#999;font-size:11px;'>MediBook © 2024 | Streamlit + Gemini</div>", unsafe_allow_html=True)
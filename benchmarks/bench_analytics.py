@@ -0,0 +1,78 @@
+import argparse
+import time as _time
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta, timezone
+from models import Doctor, UserRole, TimeSlot, Appointment, AppointmentStatus
+from services import AppointmentService, AnalyticsEngine
+
+SPECIALITIES = ("Cardiologist", "Dermatologist", "Neurologist", "Pediatrician", "Orthopedic", "Oncologist")
+STATUSES = (AppointmentStatus.BOOKED, AppointmentStatus.COMPLETED, AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED)
+
+def build(appointments: int, doctors: int) -> AppointmentService:
+    svc = AppointmentService(change_log_size=100000)
+    svc.add_doctors(Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "!", UserRole.DOCTOR, speciality=SPECIALITIES[i % 6])
+                    for i in range(doctors))
+    days = [datetime(2025, 1, 6) + timedelta(days=d) for d in range(120)]
+    times = [(time(8 + h // 2, 30 * (h % 2)), time(8 + (h + 1) // 2, 30 * ((h + 1) % 2))) for h in range(16)]
+    created = [datetime(2024, 12, 1) + timedelta(hours=h) for h in range(24 * 60)]
+    per_doctor = -(-appointments // doctors)
+    def slots():
+        for i in range(doctors):
+            for n in range(per_doctor):
+                start, end = times[n % 16]
+                yield TimeSlot(f"s-{i}-{n}", f"doc-{i}", days[(n // 16) % 120], start, end)
+    svc.add_slots(slots(), skip_overlaps=True)
+    svc.add_appointments(Appointment(f"a-{n}", f"p-{n % 50000}", slot.doctor_id, slot.slot_id, STATUSES[n % 4], created[n % len(created)])
+                         for n, slot in enumerate(list(svc.slots.values())[:appointments]))
+    return svc
+
+def naive(svc: AppointmentService, now: datetime) -> tuple:
+    totals, booked = Counter(), Counter()
+    for slot in svc.slots.values():
+        totals[slot.doctor_id] += 1
+        booked[slot.doctor_id] += slot.is_booked
+    per_spec, cancelled, heatmap, leads = Counter(), Counter(), defaultdict(int), []
+    for appt in svc.appointments.values():
+        spec = svc.doctors[appt.doctor_id].speciality
+        per_spec[spec] += 1
+        if appt.status == AppointmentStatus.CANCELLED:
+            cancelled[spec] += 1
+            continue
+        slot = svc.slots[appt.slot_id]
+        start = datetime.combine(slot.date.date(), slot.start_time)
+        created = appt.created_at.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        leads.append((start - created).total_seconds() / 3600)
+        heatmap[(start.weekday(), start.hour)] += 1
+    return totals, booked, per_spec, cancelled, heatmap, sorted(leads)[len(leads) // 2]
+
+def timed(fn, *args):
+    t0 = _time.perf_counter()
+    result = fn(*args)
+    return result, _time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Vectorized admin analytics versus a Python loop")
+    ap.add_argument("--appointments", type=int, default=10_000_000)
+    ap.add_argument("--doctors", type=int, default=5000)
+    args = ap.parse_args()
+    svc, elapsed = timed(build, args.appointments, args.doctors)
+    print(f"built {len(svc.appointments):,} appointments over {len(svc.slots):,} slots in {elapsed:.1f}s")
+    engine = AnalyticsEngine(svc)
+    report, cold = timed(engine.report)
+    _, cached = timed(engine.report)
+    patient_slots = [s for s in svc.iter_free_slots("doc-0")][:200]
+    for n, slot in enumerate(patient_slots):
+        appt = Appointment(f"new-{n}", "p-new", slot.doctor_id, slot.slot_id, AppointmentStatus.BOOKED, datetime(2025, 1, 1))
+        svc.add_appointments([appt])
+    report, patched = timed(engine.report)
+    _, naive_elapsed = timed(naive, svc, datetime.now())
+    print(f"cold build + compute      {cold * 1e3:10.1f} ms")
+    print(f"cached report             {cached * 1e6:10.1f} us")
+    print(f"patch after {len(patient_slots)} bookings   {patched * 1e3:10.1f} ms")
+    print(f"naive Python aggregation  {naive_elapsed * 1e3:10.1f} ms")
+    print(f"lead time hours {report.lead_time_hours}, engine {engine.stats()}")
+    for spec, row in report.by_speciality().items():
+        print(f"  {spec:<14} {row}")
+
+if __name__ == "__main__":
+    main()
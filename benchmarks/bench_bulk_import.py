@@ -0,0 +1,71 @@
+import argparse
+import csv
+import os
+import resource
+import shutil
+import tempfile
+import time as _time
+from datetime import date, timedelta
+from services import AuthService, AppointmentService
+from services.bulk import DOCTOR_FIELDS, SLOT_FIELDS, APPOINTMENT_FIELDS, import_doctors, import_slots, import_appointments, export_slots
+
+SPECIALITIES = ("Cardiologist", "Dermatologist", "Neurologist", "Pediatrician", "Orthopedic", "Oncologist")
+CITIES = ("Hyderabad", "Bengaluru", "Chennai", "Mumbai", "Delhi", "Pune")
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def generate(root: str, doctors: int, days: int, per_day: int, booked_every: int) -> tuple:
+    paths = tuple(os.path.join(root, f"{name}.csv") for name in ("doctors", "slots", "appointments"))
+    with open(paths[0], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(DOCTOR_FIELDS)
+        for i in range(doctors):
+            w.writerow((f"doc-{i}", f"Doctor {i}", f"doc{i}@hospital.example", "", SPECIALITIES[i % 6], i % 30, CITIES[i % 6], "In-person"))
+    start = date(2025, 1, 6)
+    with open(paths[1], "w", newline="") as f, open(paths[2], "w", newline="") as g:
+        ws, wa = csv.writer(f), csv.writer(g)
+        ws.writerow(SLOT_FIELDS)
+        wa.writerow(APPOINTMENT_FIELDS)
+        n = 0
+        for i in range(doctors):
+            for d in range(days):
+                day = (start + timedelta(days=d)).isoformat()
+                for h in range(per_day):
+                    slot_id = f"s-{i}-{d}-{h}"
+                    n += 1
+                    booked = n % booked_every == 0
+                    ws.writerow((slot_id, f"doc-{i}", day, f"{8 + h // 2:02d}:{30 * (h % 2):02d}:00", f"{8 + (h + 1) // 2:02d}:{30 * ((h + 1) % 2):02d}:00", int(booked)))
+                    if booked:
+                        wa.writerow((f"a-{n}", f"p-{n % 5000}", f"doc-{i}", slot_id, "BOOKED", "2025-01-01T09:00:00"))
+    return paths
+
+def timed(label: str, fn, *args) -> None:
+    t0 = _time.perf_counter()
+    report = fn(*args)
+    elapsed = _time.perf_counter() - t0
+    rows = report if isinstance(report, int) else report.imported
+    print(f"{label:<22} {rows:>11,} rows {rows / elapsed:>11,.0f} rows/s  peak RSS {peak_rss_mb():>7.0f} MB")
+
+def main():
+    ap = argparse.ArgumentParser(description="Streaming CSV import/export throughput and peak RSS")
+    ap.add_argument("--doctors", type=int, default=10000)
+    ap.add_argument("--days", type=int, default=20)
+    ap.add_argument("--per-day", type=int, default=16)
+    ap.add_argument("--booked-every", type=int, default=5)
+    ap.add_argument("--batch-size", type=int, default=10000)
+    args = ap.parse_args()
+    root = tempfile.mkdtemp(prefix="bench-bulk-")
+    try:
+        doctors, slots, appointments = generate(root, args.doctors, args.days, args.per_day, args.booked_every)
+        print(f"generated CSVs, peak RSS {peak_rss_mb():.0f} MB")
+        auth, appts = AuthService(), AppointmentService()
+        timed("import doctors", import_doctors, auth, appts, doctors, args.batch_size)
+        timed("import slots", import_slots, appts, slots, args.batch_size)
+        timed("import appointments", import_appointments, appts, appointments, args.batch_size)
+        timed("export slots", export_slots, appts, os.path.join(root, "export.csv"), args.batch_size)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
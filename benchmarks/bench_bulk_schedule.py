@@ -0,0 +1,40 @@
+import argparse
+import time as _time
+from datetime import date, time, timedelta
+from models import Doctor, RecurrenceRule
+from services import AppointmentService
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk slot generation and indexing throughput")
+    ap.add_argument("--doctors", type=int, default=1000)
+    ap.add_argument("--weeks", type=int, default=13)
+    ap.add_argument("--slot-minutes", type=int, default=30)
+    ap.add_argument("--batch-size", type=int, default=50000)
+    args = ap.parse_args()
+    start = date(2025, 1, 6)
+    rule = RecurrenceRule(
+        start_date=start,
+        end_date=start + timedelta(weeks=args.weeks) - timedelta(days=1),
+        day_start=time(9),
+        day_end=time(18),
+        slot_minutes=args.slot_minutes,
+        breaks=((time(13), time(14)),),
+    )
+    svc = AppointmentService()
+    for i in range(args.doctors):
+        svc.add_doctor(Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality="Cardiologist"))
+    t0 = _time.perf_counter()
+    total = 0
+    for doctor_id in svc.doctors:
+        total += svc.publish_schedule(doctor_id, rule, args.batch_size)
+    elapsed = _time.perf_counter() - t0
+    print(f"slots={total} elapsed={elapsed:.2f}s rate={total / elapsed:,.0f} slots/s")
+    t0 = _time.perf_counter()
+    try:
+        svc.publish_schedule("doc-0", rule, args.batch_size)
+    except ValueError:
+        pass
+    print(f"overlap rejection of a full schedule: {(_time.perf_counter() - t0) * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
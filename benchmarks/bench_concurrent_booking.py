@@ -0,0 +1,60 @@
+import argparse
+import random
+import time as _time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+from models import Doctor, Patient, TimeSlot
+from services import AppointmentService
+
+def build(n_doctors: int, per_doctor: int):
+    svc = AppointmentService()
+    day = datetime(2025, 1, 6)
+    doctors = []
+    for i in range(n_doctors):
+        doc = Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality="Cardiologist")
+        svc.add_doctor(doc)
+        doctors.append(doc)
+        for h in range(per_doctor):
+            svc.add_slot(TimeSlot(f"s-{i}-{h}", doc.id, day, time(h % 24, 0), time(h % 24, 30)))
+    return svc, doctors
+
+def run(threads: int, attempts: int, n_doctors: int, per_doctor: int, seed: int):
+    svc, doctors = build(n_doctors, per_doctor)
+    rng = random.Random(seed)
+    plan = []
+    for i in range(attempts):
+        d = rng.randrange(n_doctors)
+        plan.append((Patient(f"p-{i}", f"P{i}", f"p{i}@bench.local", "", "PATIENT"), doctors[d], f"s-{d}-{rng.randrange(per_doctor)}"))
+    def attempt(args):
+        patient, doctor, slot_id = args
+        try:
+            svc.book(patient, doctor, slot_id)
+            return True
+        except ValueError:
+            return False
+    t0 = _time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        booked = sum(pool.map(attempt, plan, chunksize=64))
+    elapsed = _time.perf_counter() - t0
+    per_slot = Counter(a.slot_id for a in svc.appointments.values())
+    doubles = sum(1 for c in per_slot.values() if c > 1)
+    assert doubles == 0, f"{doubles} slots booked more than once"
+    assert booked == len(per_slot) == sum(1 for s in svc.slots.values() if s.is_booked)
+    return booked, attempts / elapsed, booked / elapsed
+
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent booking stress test; fails on any double booking")
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    ap.add_argument("--attempts", type=int, default=20000)
+    ap.add_argument("--doctors", type=int, default=50)
+    ap.add_argument("--slots-per-doctor", type=int, default=40)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    print(f"{'threads':>8} {'booked':>8} {'attempts/s':>12} {'bookings/s':>12}")
+    for n in args.threads:
+        booked, rate, book_rate = run(n, args.attempts, args.doctors, args.slots_per_doctor, args.seed)
+        print(f"{n:>8} {booked:>8} {rate:>12.0f} {book_rate:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import time as _time
+from datetime import date, time, timedelta
+from models import Doctor, Patient, RecurrenceRule
+from services import AppointmentService
+from services.context import SlotContextCache
+
+SPECIALITIES = ["Cardiologist", "Neurologist", "Dermatologist", "Orthopedist"]
+
+def build(n_doctors: int, days: int) -> AppointmentService:
+    svc = AppointmentService()
+    start = date(2025, 1, 6)
+    rule = RecurrenceRule(start, start + timedelta(days=days - 1), weekdays=tuple(range(7)), day_start=time(9), day_end=time(17), slot_minutes=30)
+    for i in range(n_doctors):
+        doc = Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality=SPECIALITIES[i % len(SPECIALITIES)])
+        svc.add_doctor(doc)
+        svc.publish_schedule(doc.id, rule)
+    return svc
+
+def timed(fn, reps: int) -> float:
+    t0 = _time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (_time.perf_counter() - t0) / reps * 1e3
+
+def main():
+    ap = argparse.ArgumentParser(description="AI prompt context build time with and without the cache")
+    ap.add_argument("--doctors", type=int, default=400)
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+    svc = build(args.doctors, args.days)
+    spec = SPECIALITIES[0]
+    cold = SlotContextCache(svc)
+    full_ms = timed(lambda: SlotContextCache(svc).get(spec), args.reps)
+    cache = SlotContextCache(svc)
+    cache.get(spec)
+    hit_ms = timed(lambda: cache.get(spec), args.reps * 100)
+    patient = Patient("p-1", "Bench", "p1@bench.local", "", "PATIENT")
+    slots = [s for s in svc.slots.values() if svc.doctors[s.doctor_id].speciality == spec][: args.reps]
+    t0 = _time.perf_counter()
+    for slot in slots:
+        svc.book(patient, svc.doctors[slot.doctor_id], slot.slot_id)
+        cache.get(spec)
+    patch_ms = (_time.perf_counter() - t0) / len(slots) * 1e3
+    assert cache.get(spec) == cold.get(spec)
+    print(f"free slots in context: {cache.get(spec).count(chr(10)) + 1}")
+    print(f"full rebuild:        {full_ms:8.3f} ms")
+    print(f"cache hit:           {hit_ms:8.4f} ms")
+    print(f"book + patch:        {patch_ms:8.3f} ms")
+    print(f"cache stats: {cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import random
+import time as _time
+from datetime import date, time, timedelta
+from models import Doctor, RecurrenceRule
+from services import AppointmentService
+
+SPECIALITIES = ["Cardiology", "Neurology", "Dermatology", "Orthopedics", "Pediatrics", "Oncology", "Pulmonology", "Gastroenterology",
+                "Psychiatry", "Ophthalmology", "Endocrinology", "Urology", "Rheumatology", "Nephrology", "Hematology"]
+CITIES = ["Hyderabad", "Chennai", "Bengaluru", "Mumbai", "Delhi", "Pune", "Kolkata", "Ahmedabad", "Jaipur", "Kochi"]
+FIRST = ["Arjun", "Priya", "Sarah", "Michael", "Emily", "James", "Lisa", "Robert", "Jessica", "David", "Ananya", "Vikram", "Meera", "Rahul"]
+LAST = ["Rao", "Patel", "Johnson", "Chen", "Rodriguez", "Wilson", "Anderson", "Kumar", "Lee", "Martinez", "Iyer", "Sharma", "Reddy", "Nair"]
+
+def build(n: int, seed: int) -> AppointmentService:
+    rng = random.Random(seed)
+    svc = AppointmentService()
+    start = date.today() + timedelta(days=1)
+    doctors = []
+    for i in range(n):
+        doctors.append(Doctor(f"doc-{i}", f"Dr. {rng.choice(FIRST)} {rng.choice(LAST)}", f"doc{i}@bench.local", "", "DOCTOR",
+                     speciality=rng.choice(SPECIALITIES), experience_years=rng.randrange(1, 35), location=rng.choice(CITIES),
+                     consultation_mode=rng.choice(["In-person", "Online"])))
+    svc.add_doctors(doctors)
+    for doc in doctors:
+        day = start + timedelta(days=rng.randrange(14))
+        svc.publish_schedule(doc.id, RecurrenceRule(day, day, weekdays=tuple(range(7)), day_start=time(9 + rng.randrange(8)), day_end=time(18), slot_minutes=60))
+    return svc
+
+QUERIES = [
+    ("speciality + location", dict(speciality="Cardiology", location="Hyderabad")),
+    ("speciality + location + mode", dict(speciality="Neurology", location="Chennai", mode="Online")),
+    ("speciality by availability", dict(speciality="Dermatology", sort="availability")),
+    ("mode only (dense)", dict(mode="In-person")),
+    ("browse all, page 1", dict()),
+    ("browse all, page 50", dict(offset=1000)),
+    ("text 'card'", dict(text="card")),
+    ("text 'priya pat'", dict(text="priya pat")),
+    ("text 'ra' (prefix)", dict(text="ra")),
+    ("text + location", dict(text="kumar", location="Pune")),
+]
+
+def main():
+    ap = argparse.ArgumentParser(description="Doctor search latency over a large catalogue")
+    ap.add_argument("--doctors", type=int, default=100_000)
+    ap.add_argument("--reps", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=11)
+    args = ap.parse_args()
+    t0 = _time.perf_counter()
+    svc = build(args.doctors, args.seed)
+    print(f"built {args.doctors} doctors in {_time.perf_counter() - t0:.1f}s")
+    svc.search_doctors()
+    print(f"{'query':<30} {'total':>7} {'us/query':>10}")
+    for label, q in QUERIES:
+        page = svc.search_doctors(**q)
+        t0 = _time.perf_counter()
+        for _ in range(args.reps):
+            svc.search_doctors(**q)
+        print(f"{label:<30} {page.total:>7} {(_time.perf_counter() - t0) / args.reps * 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    main()
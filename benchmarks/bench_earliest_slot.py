@@ -0,0 +1,71 @@
+import argparse
+import random
+import time as _time
+from datetime import date, datetime, time, timedelta
+from models import Doctor, Patient, RecurrenceRule
+from services import AppointmentService
+
+SPECIALITIES = ["Cardiology", "Neurology", "Dermatology", "Orthopedics", "Pediatrics", "Oncology", "Pulmonology", "Gastroenterology",
+                "Psychiatry", "Ophthalmology", "Endocrinology", "Urology", "Rheumatology", "Nephrology", "Hematology"]
+CITIES = ["Hyderabad", "Chennai", "Bengaluru", "Mumbai", "Delhi", "Pune", "Kolkata", "Ahmedabad", "Jaipur", "Kochi"]
+
+def build(n_doctors: int, weeks: int, slot_minutes: int, seed: int) -> AppointmentService:
+    rng = random.Random(seed)
+    svc = AppointmentService()
+    svc.add_doctors(Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality=rng.choice(SPECIALITIES),
+                           experience_years=rng.randrange(1, 35), location=rng.choice(CITIES),
+                           consultation_mode=rng.choice(["In-person", "In-person", "Online"])) for i in range(n_doctors))
+    start = date.today() + timedelta(days=1)
+    rule = RecurrenceRule(start, start + timedelta(weeks=weeks), day_start=time(9), day_end=time(17), slot_minutes=slot_minutes)
+    for doctor_id in svc.doctors:
+        svc.publish_schedule(doctor_id, rule, batch_size=100_000)
+    return svc
+
+def naive(svc: AppointmentService, speciality: str, location: str, time_from: time, limit: int):
+    found = []
+    for d in svc.list_doctors(speciality):
+        if d.location == location:
+            found.extend((s.date, s.start_time, s.slot_id) for s in svc.get_free_slots(d.id) if s.start_time >= time_from)
+    return sorted(found)[:limit]
+
+def main():
+    ap = argparse.ArgumentParser(description="Earliest-available slot queries across doctors")
+    ap.add_argument("--doctors", type=int, default=10_000)
+    ap.add_argument("--weeks", type=int, default=13)
+    ap.add_argument("--slot-minutes", type=int, default=30, help="13 weeks of 30-minute slots is ~1000 slots per doctor (10M total at 10k doctors)")
+    ap.add_argument("--reps", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=5)
+    args = ap.parse_args()
+    t0 = _time.perf_counter()
+    svc = build(args.doctors, args.weeks, args.slot_minutes, args.seed)
+    print(f"built {args.doctors} doctors / {len(svc.slots):,} slots in {_time.perf_counter() - t0:.1f}s")
+    queries = [
+        ("cardiology in Hyderabad after 3pm", dict(speciality="Cardiology", location="Hyderabad", time_from=time(15))),
+        ("any neurology", dict(speciality="Neurology")),
+        ("online dermatology", dict(speciality="Dermatology", mode="Online")),
+        ("any speciality in Pune, mornings", dict(location="Pune", time_to=time(12))),
+        ("oncology next week", dict(speciality="Oncology", date_from=datetime.now() + timedelta(days=7))),
+    ]
+    for label, q in queries:
+        res = svc.find_earliest_slots(limit=10, **q)
+        t0 = _time.perf_counter()
+        for _ in range(args.reps):
+            svc.find_earliest_slots(limit=10, **q)
+        print(f"{label:<36} found={len(res):>3} {(_time.perf_counter() - t0) / args.reps * 1e6:>9.1f} us/query")
+    t0 = _time.perf_counter()
+    naive(svc, "Cardiology", "Hyderabad", time(15), 10)
+    print(f"{'naive per-doctor scan (same as #1)':<36}           {(_time.perf_counter() - t0) * 1e6:>9.1f} us/query")
+    patient = Patient("p-1", "Bench", "p1@bench.local", "", "PATIENT")
+    rng = random.Random(args.seed)
+    picks = rng.sample(list(svc.slots), min(args.reps, len(svc.slots)))
+    t0 = _time.perf_counter()
+    appts = [svc.book(patient, svc.doctors[svc.slots[sid].doctor_id], sid) for sid in picks]
+    book_us = (_time.perf_counter() - t0) / len(picks) * 1e6
+    t0 = _time.perf_counter()
+    for appt in appts:
+        svc.cancel(appt.appointment_id, patient)
+    cancel_us = (_time.perf_counter() - t0) / len(picks) * 1e6
+    print(f"book {book_us:.1f} us, cancel {cancel_us:.1f} us (including index updates)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time as _time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+from models import TimeSlot, Appointment, AppointmentStatus
+from storage.eventlog import EventLogStorage, SNAPSHOT_FILE
+
+def slot(n: int) -> TimeSlot:
+    return TimeSlot(f"s-{n}", f"doc-{n % 1000}", datetime(2025, 1, 6), time(9 + n % 8), time(9 + n % 8, 30))
+
+def write_events(storage: EventLogStorage, events: int, snapshot_at: int | None = None):
+    n = 0
+    while n < events:
+        s = slot(n)
+        storage.save_slots([s])
+        appt = Appointment(f"a-{n}", f"p-{n % 5000}", s.doctor_id, s.slot_id, AppointmentStatus.BOOKED, datetime(2025, 1, 1))
+        storage.save_booking(appt, s)
+        if n % 3 == 0:
+            storage.save_cancellation(appt, s)
+        else:
+            storage.save_completion(appt)
+        n += 3 if n % 3 == 0 else 2
+        if snapshot_at and n >= snapshot_at:
+            storage.snapshot()
+            snapshot_at = None
+
+def append_rate(path: str, writers: int, events: int, durable: bool) -> float:
+    storage = EventLogStorage(path, durable=durable, snapshot_every=10 ** 9)
+    per_writer = events // writers
+    def work(w: int):
+        for i in range(per_writer):
+            storage.save_completion(Appointment(f"a-{w}-{i}", "p", "d", "s", AppointmentStatus.BOOKED, datetime(2025, 1, 1)))
+    storage.appointments.update({f"a-{w}-{i}": ("", "", "", "", "BOOKED", "") for w in range(writers) for i in range(per_writer)})
+    t0 = _time.perf_counter()
+    with ThreadPoolExecutor(writers) as pool:
+        list(pool.map(work, range(writers)))
+    storage.sync()
+    elapsed = _time.perf_counter() - t0
+    commits = storage.commits
+    storage.close()
+    shutil.rmtree(path)
+    return per_writer * writers / elapsed, per_writer * writers / max(commits, 1)
+
+def cold_start(path: str) -> tuple:
+    t0 = _time.perf_counter()
+    storage = EventLogStorage(path)
+    elapsed = _time.perf_counter() - t0
+    replayed = storage.replayed
+    storage.close()
+    return elapsed, replayed
+
+def main():
+    ap = argparse.ArgumentParser(description="Event log append throughput and cold-start recovery time")
+    ap.add_argument("--events", type=int, default=10_000_000)
+    ap.add_argument("--appends", type=int, default=20000)
+    ap.add_argument("--writers", type=int, nargs="+", default=[1, 8, 64])
+    ap.add_argument("--tail", type=float, default=0.05, help="fraction of events written after the snapshot")
+    args = ap.parse_args()
+    root = tempfile.mkdtemp(prefix="bench-events-")
+    try:
+        print(f"{'writers':>8} {'mode':>9} {'events/s':>11} {'events/fsync':>13}")
+        for writers in args.writers:
+            for durable in (True, False):
+                rate, per_commit = append_rate(os.path.join(root, "append"), writers, args.appends, durable)
+                print(f"{writers:>8} {'durable' if durable else 'buffered':>9} {rate:>11,.0f} {per_commit:>13.1f}")
+        path = os.path.join(root, "recovery")
+        storage = EventLogStorage(path, durable=False, snapshot_every=10 ** 9)
+        t0 = _time.perf_counter()
+        write_events(storage, args.events, int(args.events * (1 - args.tail)))
+        storage.close()
+        size = os.path.getsize(os.path.join(path, "events.jsonl"))
+        print(f"wrote {args.events:,} events ({size / 2 ** 20:.0f} MiB) in {_time.perf_counter() - t0:.1f}s")
+        elapsed, replayed = cold_start(path)
+        print(f"cold start from snapshot + tail: {elapsed:.2f}s ({replayed:,} events replayed)")
+        os.remove(os.path.join(path, SNAPSHOT_FILE))
+        elapsed, replayed = cold_start(path)
+        print(f"cold start from full log replay: {elapsed:.2f}s ({replayed:,} events replayed)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import random
+import threading
+import time as _time
+from concurrent.futures import ThreadPoolExecutor
+from services.gemini import GeminiClient
+
+class FakeModel:
+    def __init__(self, latency: float, failure_rate: float, hang_rate: float, seed: int):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.inflight = self.peak = 0
+    def generate_content(self, prompt: str):
+        with self.lock:
+            roll = self.rng.random()
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+        try:
+            if roll < self.hang_rate:
+                _time.sleep(self.latency * 50)
+            else:
+                _time.sleep(self.latency)
+            if roll > 1 - self.failure_rate:
+                raise RuntimeError("503 from fake model")
+            return type("Resp", (), {"text": '{"speciality": "Cardiologist", "echo": %d}' % len(prompt)})()
+        finally:
+            with self.lock:
+                self.inflight -= 1
+
+def main():
+    ap = argparse.ArgumentParser(description="GeminiClient against a local fake model")
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--distinct", type=int, default=40)
+    ap.add_argument("--threads", type=int, default=32)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--failure-rate", type=float, default=0.05)
+    ap.add_argument("--hang-rate", type=float, default=0.01)
+    ap.add_argument("--timeout", type=float, default=0.2)
+    args = ap.parse_args()
+    model = FakeModel(args.latency, args.failure_rate, args.hang_rate, seed=3)
+    client = GeminiClient(model, timeout=args.timeout, max_concurrency=args.concurrency, retries=2, backoff=0.01)
+    prompts = [f"Parse:  \"I need a cardiologist  next week #{i % args.distinct}\"" for i in range(args.requests)]
+    def call(p):
+        try:
+            client.generate(p)
+            return True
+        except Exception:
+            return False
+    t0 = _time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        ok = sum(pool.map(call, prompts))
+    elapsed = _time.perf_counter() - t0
+    print(f"ok={ok}/{args.requests} elapsed={elapsed:.2f}s peak model concurrency={model.peak}")
+    print(client.stats())
+    client.close()
+
+if __name__ == "__main__":
+    main()
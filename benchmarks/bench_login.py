@@ -0,0 +1,47 @@
+import argparse
+import time as _time
+from concurrent.futures import ThreadPoolExecutor
+from services import AuthService
+from services.passwords import PasswordHasher
+
+def run(pool_size: int, users: int, logins: int, cost: tuple, processes: bool) -> tuple:
+    hasher = PasswordHasher(cost, max_workers=pool_size, processes=processes)
+    auth = AuthService(hasher=hasher)
+    for i in range(users):
+        auth.register_patient(f"Patient {i}", f"p{i}@bench.local", f"secret-{i}")
+    def login(n: int) -> float:
+        t0 = _time.perf_counter()
+        assert auth.login(f"p{n % users}@bench.local", f"secret-{n % users}")
+        return _time.perf_counter() - t0
+    with ThreadPoolExecutor(users) as clients:
+        t0 = _time.perf_counter()
+        latencies = sorted(clients.map(login, range(logins)))
+        elapsed = _time.perf_counter() - t0
+    hasher.close()
+    return logins / elapsed, latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3
+
+def main():
+    ap = argparse.ArgumentParser(description="Login throughput under concurrent users for several hashing pool sizes")
+    ap.add_argument("--pools", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--users", type=int, default=32)
+    ap.add_argument("--logins", type=int, default=200)
+    ap.add_argument("--n", type=int, default=2 ** 14)
+    ap.add_argument("--processes", action="store_true")
+    args = ap.parse_args()
+    cost = (args.n, 8, 1)
+    print(f"scrypt n={args.n}, {args.users} concurrent users, {args.logins} logins")
+    print(f"{'pool':>5} {'logins/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for pool in args.pools:
+        rate, p50, p99 = run(pool, args.users, args.logins, cost, args.processes)
+        print(f"{pool:>5} {rate:>10.1f} {p50:>9.1f} {p99:>9.1f}")
+    auth = AuthService(hasher=PasswordHasher(cost))
+    auth.register_patient("Patient", "p@bench.local", "secret")
+    _, token = auth.create_session("p@bench.local", "secret")
+    reps = 100000
+    t0 = _time.perf_counter()
+    for _ in range(reps):
+        auth.resume_session(token)
+    print(f"cached session resume: {(_time.perf_counter() - t0) / reps * 1e6:.2f} us")
+
+if __name__ == "__main__":
+    main()
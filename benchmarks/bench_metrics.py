@@ -0,0 +1,57 @@
+import argparse
+import random
+import time as _time
+from services.metrics import Metrics, Histogram
+
+def per_call_ns(fn, reps: int) -> float:
+    t0 = _time.perf_counter_ns()
+    for _ in range(reps):
+        fn(1)
+    return (_time.perf_counter_ns() - t0) / reps
+
+def main():
+    ap = argparse.ArgumentParser(description="Instrumentation overhead and histogram accuracy")
+    ap.add_argument("--reps", type=int, default=1_000_000)
+    ap.add_argument("--samples", type=int, default=1_000_000)
+    args = ap.parse_args()
+    metrics = Metrics(enabled=False)
+    def work(x):
+        return x + 1
+    wrapped = metrics.timed("work")(work)
+    base = per_call_ns(work, args.reps)
+    disabled = per_call_ns(wrapped, args.reps)
+    metrics.enabled = True
+    enabled = per_call_ns(wrapped, args.reps)
+    print(f"plain call {base:7.0f} ns | decorated, disabled {disabled:7.0f} ns (+{disabled - base:.0f}) | enabled {enabled:7.0f} ns (+{enabled - base:.0f})")
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(13, 1.2)) + 1 for _ in range(args.samples)]
+    hist = Histogram()
+    t0 = _time.perf_counter()
+    for v in values:
+        hist.record(v)
+    record_ns = (_time.perf_counter() - t0) / len(values) * 1e9
+    exact = sorted(values)
+    print(f"record {record_ns:.0f} ns/value, {len(hist._counts)} buckets for {len(values):,} values")
+    for q, approx in zip((0.5, 0.95, 0.99), hist.quantiles()):
+        true = exact[int(q * len(exact)) - 1]
+        print(f"  p{int(q * 100):<3} exact {true / 1e6:9.3f} ms  histogram {approx / 1e6:9.3f} ms  error {abs(approx - true) / true:6.2%}")
+    t0 = _time.perf_counter()
+    for i in range(200):
+        metrics.histogram(f"op.{i}").record(i + 1000)
+    metrics.to_prometheus()
+    metrics.to_json()
+    print(f"export 200 series: {(_time.perf_counter() - t0) * 1e3:.1f} ms")
+    metrics.enabled = False
+    spin = lambda: sum(i * i for i in range(2_000_000))
+    t0 = _time.perf_counter()
+    spin()
+    plain = _time.perf_counter() - t0
+    metrics.profiler.start()
+    t0 = _time.perf_counter()
+    spin()
+    profiled = _time.perf_counter() - t0
+    metrics.profiler.stop()
+    print(f"sampling profiler overhead {profiled / plain - 1:+.1%}, top: {metrics.profiler.top(3)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import json
+import re
+import time as _time
+from datetime import date, time, timedelta
+from models import Doctor, Patient, RecurrenceRule
+from services import AppointmentService, AIRecommendationService
+
+class StubModel:
+    def __init__(self, us_per_char: float):
+        self.us_per_char = us_per_char
+        self.last_prompt_chars = 0
+    def generate_content(self, prompt: str):
+        self.last_prompt_chars = len(prompt)
+        _time.sleep(len(prompt) * self.us_per_char / 1e6)
+        m = re.search(r"doctor_id=(\S+), slot_id=(\S+),", prompt)
+        return type("Resp", (), {"text": json.dumps({"doctor_id": m.group(1), "slot_id": m.group(2), "reason": "stub"})})()
+
+def build(n_doctors: int, days: int) -> AppointmentService:
+    svc = AppointmentService()
+    start = date.today() + timedelta(days=1)
+    rule = RecurrenceRule(start, start + timedelta(days=days - 1), weekdays=tuple(range(7)), day_start=time(9), day_end=time(17), slot_minutes=30)
+    for i in range(n_doctors):
+        doc = Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality="Cardiologist",
+                     experience_years=i % 25, location=["Hyderabad", "Chennai"][i % 2], consultation_mode=["In-person", "Online"][i % 3 == 0])
+        svc.add_doctor(doc)
+        svc.publish_schedule(doc.id, rule)
+    return svc
+
+def main():
+    ap = argparse.ArgumentParser(description="Prompt size and recommend_slot latency vs free-slot count")
+    ap.add_argument("--doctors", type=int, nargs="+", default=[10, 100, 500])
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--top-k", type=int, default=20)
+    ap.add_argument("--us-per-char", type=float, default=0.05)
+    args = ap.parse_args()
+    patient = Patient("p-1", "Bench", "p1@bench.local", "", "PATIENT", preferred_speciality="Cardiologist")
+    constraints = {"location": "Hyderabad", "consultation_mode": "Online", "time_of_day": "morning"}
+    print(f"{'slots':>8} {'mode':>6} {'prompt chars':>13} {'latency ms':>11}")
+    for n in args.doctors:
+        svc = build(n, args.days)
+        for label, top_k in (("full", None), (f"top{args.top_k}", args.top_k)):
+            model = StubModel(args.us_per_char)
+            ai = AIRecommendationService(svc, model=model, top_k=top_k)
+            ai.context_cache.get("Cardiologist")
+            t0 = _time.perf_counter()
+            res = ai.recommend_slot(patient, "Cardiologist", "high", constraints)
+            elapsed = (_time.perf_counter() - t0) * 1e3
+            assert res and res["slot_id"] in svc.slots
+            print(f"{len(svc.slots):>8} {label:>6} {model.last_prompt_chars:>13} {elapsed:>11.2f}")
+
+if __name__ == "__main__":
+    main()
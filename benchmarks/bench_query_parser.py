@@ -0,0 +1,69 @@
+import argparse
+import time as _time
+from datetime import date
+from services.query_parser import parse_query
+
+CORPUS = [
+    "I need a cardiologist next week",
+    "Book a heart specialist tomorrow morning",
+    "urgent chest pain, need to see someone today",
+    "dermatologist for acne on friday afternoon",
+    "my skin rash is getting worse, asap please",
+    "routine checkup with an ophthalmologist in 2 weeks",
+    "eye test next month",
+    "neurologist for migraines next tuesday at 10am",
+    "I keep having seizures, emergency",
+    "knee pain after running, evening appointment",
+    "orthopedic consult on 2025-12-26",
+    "pediatrician for my baby this week",
+    "my child has a fever tomorrow",
+    "oncology follow-up on 5th march",
+    "need a psychiatrist, anxiety has been bad, no rush",
+    "depression counselling after work",
+    "pulmonologist for asthma in 3 days",
+    "persistent cough, morning slot please",
+    "stomach pain and acid reflux",
+    "gastroenterologist on monday",
+    "thyroid check next week",
+    "diabetes review with an endocrinologist",
+    "urologist for prostate exam",
+    "kidney stone, urgent",
+    "arthritis flare, rheumatologist soon",
+    "dialysis consultation on wednesday",
+    "anemia tests with a hematologist",
+    "Can I see a doctor?",
+    "something for my heart and my skin",
+    "I feel unwell, what should I do",
+    "book the best available specialist",
+    "appointment at 4pm",
+    "my son has a rash",
+    "need a second opinion on my scan",
+    "back pain after lifting boxes at 3pm",
+    "vision is blurry lately",
+]
+
+def main():
+    ap = argparse.ArgumentParser(description="Local parser hit rate and latency over a query corpus")
+    ap.add_argument("--threshold", type=float, default=0.8)
+    ap.add_argument("--reps", type=int, default=200)
+    ap.add_argument("--model-ms", type=float, default=900.0, help="assumed Gemini round trip per query")
+    args = ap.parse_args()
+    today = date(2025, 6, 2)
+    roster = ["Cardiologist", "Neurology", "Dermatology", "Orthopedics", "Pediatrics", "Oncology", "Pulmonology", "Gastroenterology",
+              "Psychiatry", "Ophthalmology", "Endocrinology", "Urology", "Rheumatology", "Nephrology", "Hematology"]
+    results = [parse_query(q, roster, today) for q in CORPUS]
+    hits = sum(r.confidence >= args.threshold for r in results)
+    t0 = _time.perf_counter()
+    for _ in range(args.reps):
+        for q in CORPUS:
+            parse_query(q, roster, today)
+    us = (_time.perf_counter() - t0) / (args.reps * len(CORPUS)) * 1e6
+    for q, r in zip(CORPUS, results):
+        mark = "local" if r.confidence >= args.threshold else "model"
+        print(f"{mark:>5} {r.confidence:.2f} {q!r:<62} {r.as_dict()}")
+    print(f"\nlocal hit rate: {hits}/{len(CORPUS)} ({hits / len(CORPUS):.0%})")
+    print(f"local parse latency: {us:.1f} us/query")
+    print(f"model time saved per {len(CORPUS)} queries: {hits * args.model_ms / 1e3:.1f} s (at {args.model_ms:.0f} ms/call)")
+
+if __name__ == "__main__":
+    main()
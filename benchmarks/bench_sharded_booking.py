@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import time as _time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from models import Doctor, Patient, RecurrenceRule, Appointment
+from services import AppointmentService
+from services.sharding import ShardedAppointmentService
+
+def make_slots(doctors, rule: RecurrenceRule):
+    return [s for d in doctors for s in rule.expand(d.id, d.id)]
+
+def dataset(n_doctors: int, days: int, n_patients: int, seed: int):
+    start = date(2025, 1, 6)
+    rule = RecurrenceRule(start, start + timedelta(days=days - 1), weekdays=tuple(range(7)))
+    doctors = [Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality=f"Spec{i % 12}") for i in range(n_doctors)]
+    patients = [Patient(f"p-{i}", f"P{i}", f"p{i}@bench.local", "", "PATIENT") for i in range(n_patients)]
+    rng = random.Random(seed)
+    plan = [(rng.choice(patients), doctors[int(s.doctor_id[4:])], s.slot_id) for s in make_slots(doctors, rule)]
+    rng.shuffle(plan)
+    return doctors, rule, plan
+
+def run(book_batch, plan: list, clients: int, batch: int) -> float:
+    chunks = [plan[i:i + batch] for i in range(0, len(plan), batch)]
+    t0 = _time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        booked = sum(pool.map(book_batch, chunks))
+    elapsed = _time.perf_counter() - t0
+    assert booked == len(plan), f"{len(plan) - booked} bookings failed"
+    return len(plan) / elapsed
+
+def in_process(doctors, rule, plan, clients: int, batch: int) -> float:
+    svc = AppointmentService()
+    svc.add_doctors(doctors)
+    svc.add_slots(make_slots(doctors, rule))
+    def book_batch(chunk):
+        return sum(1 for patient, doctor, slot_id in chunk if svc.book(patient, doctor, slot_id))
+    return run(book_batch, plan, clients, batch)
+
+def sharded(shards: int, doctors, rule, plan, clients: int, batch: int) -> tuple:
+    with ShardedAppointmentService(shards) as engine:
+        t0 = _time.perf_counter()
+        engine.add_doctors(doctors)
+        engine.add_slots(make_slots(doctors, rule))
+        load = _time.perf_counter() - t0
+        if batch == 1:
+            rate = run(lambda chunk: sum(1 for args in chunk if engine.book(*args)), plan, clients, 1)
+        else:
+            rate = run(lambda chunk: sum(isinstance(r, Appointment) for r in engine.book_many(chunk)), plan, clients, batch)
+        assert sum(s["appointments"] for s in engine.stats()) == len(plan)
+    return rate, load
+
+def main():
+    cpus = os.cpu_count() or 1
+    ap = argparse.ArgumentParser(description="Booking throughput of the doctor-sharded multi-process engine from 1 to N shards")
+    ap.add_argument("--shards", type=int, nargs="+", default=sorted({1, 2, 4, 8, cpus} - {n for n in (2, 4, 8) if n > cpus}))
+    ap.add_argument("--doctors", type=int, default=1000)
+    ap.add_argument("--days", type=int, default=5)
+    ap.add_argument("--patients", type=int, default=5000)
+    ap.add_argument("--clients", type=int, default=4, help="client threads submitting bookings")
+    ap.add_argument("--batch", type=int, nargs="+", default=[1, 256], help="bookings per request (1 = one round trip per booking)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    doctors, rule, plan = dataset(args.doctors, args.days, args.patients, args.seed)
+    print(f"{len(doctors)} doctors, {len(plan):,} slots to book, {args.clients} client threads, {cpus} cpus")
+    print(f"{'engine':>12} {'batch':>6} {'bookings/s':>12} {'speedup':>8} {'load s':>7}")
+    for batch in args.batch:
+        base = in_process(doctors, rule, plan, args.clients, batch)
+        print(f"{'in-process':>12} {batch:>6} {base:>12,.0f} {1.0:>8.2f} {'':>7}")
+        for shards in args.shards:
+            rate, load = sharded(shards, doctors, rule, plan, args.clients, batch)
+            print(f"{f'{shards} shards':>12} {batch:>6} {rate:>12,.0f} {rate / base:>8.2f} {load:>7.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import time as _time
+from datetime import datetime, time, timedelta
+from models import Doctor, TimeSlot
+from services import AppointmentService
+
+def build(n_doctors: int, days: int, per_day: int) -> AppointmentService:
+    svc = AppointmentService()
+    start = datetime(2025, 1, 6)
+    for i in range(n_doctors):
+        doc = Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality="Cardiologist")
+        svc.add_doctor(doc)
+        for d in range(days):
+            day = start + timedelta(days=d)
+            for h in range(per_day):
+                svc.add_slot(TimeSlot(f"s-{i}-{d}-{h}", doc.id, day, time(8 + h % 12, 0), time(8 + h % 12, 30)))
+    return svc
+
+def measure(svc: AppointmentService, n_doctors: int, reps: int) -> float:
+    day = datetime(2025, 1, 7)
+    t0 = _time.perf_counter()
+    for r in range(reps):
+        doc_id = f"doc-{r % n_doctors}"
+        svc.get_doctor_slots(doc_id, day)
+        svc.get_free_slots(doc_id, day)
+    return (_time.perf_counter() - t0) / reps * 1e6
+
+def main():
+    ap = argparse.ArgumentParser(description="Slot lookup latency as the total slot count grows")
+    ap.add_argument("--per-day", type=int, default=8)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--doctors", type=int, nargs="+", default=[10, 100, 1000, 4000])
+    ap.add_argument("--reps", type=int, default=20000)
+    args = ap.parse_args()
+    print(f"{'doctors':>8} {'total slots':>12} {'us/lookup':>10}")
+    for n in args.doctors:
+        svc = build(n, args.days, args.per_day)
+        print(f"{n:>8} {len(svc.slots):>12} {measure(svc, n, args.reps):>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from models import RecurrenceRule
+
+@dataclass
+class DictTimeSlot:
+    slot_id: str
+    doctor_id: str
+    date: datetime
+    start_time: time
+    end_time: time
+    is_booked: bool = False
+
+def legacy_slots(rule: RecurrenceRule, doctor_id: str):
+    for slot in rule.expand(doctor_id):
+        day = slot.date
+        yield DictTimeSlot(str(uuid.uuid4()), doctor_id, datetime(day.year, day.month, day.day),
+                           time(slot.start_time.hour, slot.start_time.minute), time(slot.end_time.hour, slot.end_time.minute))
+
+def measure(factory, rule: RecurrenceRule, doctors: int) -> tuple[int, int]:
+    tracemalloc.start()
+    held = []
+    for i in range(doctors):
+        held.extend(factory(rule, f"doc-{i}"))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(held), current
+
+def main():
+    ap = argparse.ArgumentParser(description="Bytes per slot for dict-backed vs compact TimeSlot storage")
+    ap.add_argument("--doctors", type=int, default=100)
+    ap.add_argument("--weeks", type=int, default=4)
+    args = ap.parse_args()
+    start = date(2025, 1, 6)
+    rule = RecurrenceRule(start, start + timedelta(weeks=args.weeks), slot_minutes=15)
+    for name, factory in (("dict dataclass + uuid4", legacy_slots), ("slots dataclass + shared", lambda r, d: r.expand(d))):
+        n, size = measure(factory, rule, args.doctors)
+        print(f"{name:<26} slots={n} bytes/slot={size / n:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import os
+import tempfile
+import time as _time
+from datetime import datetime, time, timedelta
+from models import Doctor, Patient, TimeSlot
+from services import AppointmentService
+from storage import Storage, SQLiteStorage
+
+def populate(svc: AppointmentService, n_doctors: int, days: int, per_day: int):
+    start = datetime(2025, 1, 6)
+    for i in range(n_doctors):
+        doc = Doctor(f"doc-{i}", f"Doctor {i}", f"doc{i}@bench.local", "", "DOCTOR", speciality="Cardiologist")
+        svc.add_doctor(doc)
+        for d in range(days):
+            day = start + timedelta(days=d)
+            for h in range(per_day):
+                svc.add_slot(TimeSlot(f"s-{i}-{d}-{h}", doc.id, day, time(8 + h % 12, 0), time(8 + h % 12, 30)))
+
+def bench(name: str, storage: Storage, args) -> None:
+    svc = AppointmentService(storage)
+    t0 = _time.perf_counter()
+    populate(svc, args.doctors, args.days, args.per_day)
+    load_s = _time.perf_counter() - t0
+    patient = Patient("p-1", "Bench", "p1@bench.local", "", "PATIENT")
+    slot_ids = list(svc.slots)[: args.bookings]
+    t0 = _time.perf_counter()
+    for sid in slot_ids:
+        slot = svc.slots[sid]
+        svc.book(patient, svc.doctors[slot.doctor_id], sid)
+    book_rate = len(slot_ids) / (_time.perf_counter() - t0)
+    day = datetime(2025, 1, 7)
+    t0 = _time.perf_counter()
+    for r in range(args.queries):
+        svc.get_free_slots(f"doc-{r % args.doctors}", day)
+    cached_us = (_time.perf_counter() - t0) / args.queries * 1e6
+    line = f"{name:>8} {load_s:>9.2f} {book_rate:>12.0f} {cached_us:>14.2f}"
+    if isinstance(storage, SQLiteStorage):
+        t0 = _time.perf_counter()
+        for r in range(args.queries):
+            storage.load_doctor_slots(f"doc-{r % args.doctors}", day)
+        line += f" {(_time.perf_counter() - t0) / args.queries * 1e6:>12.2f}"
+    print(line)
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare in-memory and SQLite storage backends")
+    ap.add_argument("--doctors", type=int, default=200)
+    ap.add_argument("--days", type=int, default=10)
+    ap.add_argument("--per-day", type=int, default=8)
+    ap.add_argument("--bookings", type=int, default=5000)
+    ap.add_argument("--queries", type=int, default=5000)
+    args = ap.parse_args()
+    print(f"{'backend':>8} {'load (s)':>9} {'bookings/s':>12} {'cached us/q':>14} {'db us/q':>12}")
+    bench("memory", Storage(), args)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "bench.sqlite3"))
+        bench("sqlite", storage, args)
+        storage.close()
+
+if __name__ == "__main__":
+    main()
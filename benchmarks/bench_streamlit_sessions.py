@@ -0,0 +1,71 @@
+import argparse
+import os
+import time as _time
+from streamlit.testing.v1 import AppTest
+import streamlit as st
+from controllers import AppController
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+def session(token: str | None = None) -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.secrets["GEMINI_API_KEY"] = ""
+    if token:
+        at.session_state["token"] = token
+    return at.run()
+
+def widget(widgets, label: str):
+    return next(w for w in widgets if w.label == label)
+
+def login_token() -> str:
+    at = session()
+    widget(at.radio, "Action").set_value("Register").run()
+    widget(at.text_input, "Name").input("Bench Patient")
+    widget(at.text_input, "Email").input("bench@medibook.local")
+    widget(at.text_input, "Password").input("bench-password")
+    try:
+        widget(at.button, "Create").click().run()
+    except KeyError as e:  # AppTest in Streamlit 1.28 fails this way after the script calls st.rerun()
+        if "client_state" not in str(e):
+            raise
+    assert "token" in at.session_state and at.session_state["token"], "registration did not start a session"
+    token = at.session_state["token"]
+    check = session(token)
+    assert not check.exception and any(b.label == "🚪 Logout" for b in check.button), "session token does not render the patient pages"
+    return token
+
+def rerun_ms(sessions: list, rounds: int, clear: bool = False) -> float:
+    t0 = _time.perf_counter()
+    for _ in range(rounds):
+        for at in sessions:
+            if clear:
+                st.cache_data.clear()
+            at.run()
+    return (_time.perf_counter() - t0) / (rounds * len(sessions)) * 1e3
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-rerun latency and memory of app.py as concurrent sessions grow")
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100, 250, 500])
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+    t0 = _time.perf_counter()
+    AppController()
+    print(f"per-session controller rebuild (old behaviour): {(_time.perf_counter() - t0) * 1e3:.0f} ms")
+    base = rss_mb()
+    token = login_token()
+    sessions: list = []
+    print(f"{'sessions':>8} {'rerun ms':>9} {'no-cache ms':>12} {'RSS MB':>8} {'MB/session':>11}")
+    for n in sorted(args.sessions):
+        while len(sessions) < n:
+            sessions.append(session(token))
+        cached = rerun_ms(sessions, args.rounds)
+        uncached = rerun_ms(sessions[:10], 1, clear=True)
+        rss = rss_mb()
+        print(f"{n:>8} {cached:>9.1f} {uncached:>12.1f} {rss:>8.0f} {(rss - base) / n:>11.2f}")
+
+if __name__ == "__main__":
+    main()
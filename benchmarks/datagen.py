@@ -0,0 +1,56 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from typing import List
+from controllers import AppController
+from models import Doctor, Patient, RecurrenceRule
+
+SPECIALITIES = ("Cardiology", "Neurology", "Dermatology", "Orthopedics", "Pediatrics", "Oncology",
+                "Pulmonology", "Gastroenterology", "Psychiatry", "Ophthalmology", "Endocrinology", "Urology")
+CITIES = ("New York", "San Francisco", "Los Angeles", "Chicago", "Houston", "Boston", "Seattle", "Miami")
+MODES = ("In-person", "Online")
+PASSWORD = "bench-password"
+
+@dataclass
+class DataSpec:
+    doctors: int = 200
+    patients: int = 1000
+    slots_per_day: int = 16
+    horizon_days: int = 14
+    seed: int = 42
+
+@dataclass
+class Dataset:
+    spec: DataSpec
+    doctors: List[Doctor] = field(default_factory=list)
+    patients: List[Patient] = field(default_factory=list)
+    @property
+    def slots(self) -> int:
+        return self.spec.doctors * self.spec.slots_per_day * self.spec.horizon_days
+
+def populate(controller: AppController, spec: DataSpec, start: date | None = None) -> Dataset:
+    rng = random.Random(spec.seed)
+    password_hash = controller.auth.hasher.hash(PASSWORD)
+    data = Dataset(spec)
+    for i in range(spec.doctors):
+        doctor = Doctor.create(f"Dr. Bench {i}", f"doctor{i}@bench.local", None, rng.choice(SPECIALITIES), rng.randint(1, 30),
+                               rng.choice(CITIES), rng.choice(MODES), password_hash=password_hash)
+        doctor.id = f"doc-{spec.seed}-{i}"
+        data.doctors.append(doctor)
+    for i in range(spec.patients):
+        patient = Patient.create(f"Patient {i}", f"patient{i}@bench.local", None, rng.randint(18, 90), rng.choice(("F", "M")),
+                                 rng.choice(SPECIALITIES), password_hash=password_hash)
+        patient.id = f"pat-{spec.seed}-{i}"
+        data.patients.append(patient)
+    controller.auth.add_users(data.doctors + data.patients)
+    controller.appt_service.add_doctors(data.doctors)
+    start = start or date.today()
+    minutes = 30 if spec.slots_per_day <= 28 else max(5, 840 // spec.slots_per_day)
+    end = 8 * 60 + spec.slots_per_day * minutes
+    if end >= 1440:
+        raise ValueError("slots_per_day does not fit in one day")
+    rule = RecurrenceRule(start, start + timedelta(days=spec.horizon_days - 1), weekdays=tuple(range(7)), day_start=time(8),
+                          day_end=time(end // 60, end % 60), slot_minutes=minutes)
+    for doctor in data.doctors:
+        controller.appt_service.add_slots(rule.expand(doctor.id, doctor.id))
+    return data
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time as _time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List
+from benchmarks.datagen import DataSpec, populate
+from benchmarks.scenarios import MIXES, StubModel, Worker, run_worker
+from controllers import AppController
+from services.gemini import GeminiClient
+from services.metrics import METRICS, Histogram
+
+def build(spec: DataSpec, ai_latency: float):
+    controller = AppController(gemini=GeminiClient(StubModel(ai_latency), timeout=5.0, retries=0), seed=False)
+    return controller, populate(controller, spec)
+
+def run_replica(spec: DataSpec, ai_latency: float, mix: Dict[str, int], threads: int, replica: int, replicas: int,
+                ops: int | None, duration: float | None) -> tuple:
+    controller, data = build(spec, ai_latency)
+    METRICS.reset()
+    workers = [Worker(controller, data, replica * threads + i, replicas * threads, spec.seed) for i in range(threads)]
+    per_worker = -(-ops // (threads * replicas)) if ops else None
+    start = _time.perf_counter()
+    deadline = start + duration if duration else None
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda w: run_worker(w, mix, per_worker, deadline), workers))
+    elapsed = _time.perf_counter() - start
+    controller.ai.client.close()
+    return results, elapsed, sum(w.misses for w in workers), METRICS.snapshot()
+
+def summarize(args, results: List[Dict[str, List[int]]], elapsed: float, misses: int) -> dict:
+    histograms: Dict[str, Histogram] = {}
+    total = Histogram()
+    for latencies in results:
+        for name, values in latencies.items():
+            hist = histograms.setdefault(name, Histogram())
+            for value in values:
+                hist.record(value)
+                if name != "errors":
+                    total.record(value)
+    ops = {name: dict(hist.snapshot(), throughput=hist.count / elapsed) for name, hist in sorted(histograms.items()) if hist.count}
+    return {"config": {"mix": args.mix, "weights": MIXES[args.mix], "threads": args.threads, "processes": args.processes,
+                       "doctors": args.doctors, "patients": args.patients, "slots_per_day": args.slots_per_day,
+                       "horizon_days": args.horizon_days, "seed": args.seed, "ops": args.ops, "duration": args.duration,
+                       "ai_latency": args.ai_latency, "repeat": args.repeat},
+            "env": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "elapsed_s": elapsed, "booking_misses": misses, "total": dict(total.snapshot(), throughput=total.count / elapsed),
+            "ops": ops}
+
+def _median(values: list):
+    return statistics.median_low(values) if all(isinstance(v, int) for v in values) else statistics.median(values)
+
+def median_report(reports: List[dict]) -> dict:
+    if len(reports) == 1:
+        return reports[0]
+    merged = dict(reports[0], elapsed_s=_median([r["elapsed_s"] for r in reports]),
+                  booking_misses=_median([r["booking_misses"] for r in reports]))
+    merged["total"] = {key: _median([r["total"][key] for r in reports]) for key in reports[0]["total"]}
+    ops = {}
+    for name in sorted({name for r in reports for name in r["ops"]}):
+        runs = [r["ops"][name] for r in reports if name in r["ops"]]
+        ops[name] = {key: _median([run[key] for run in runs]) for key in runs[0]}
+    merged["ops"] = ops
+    if "metrics" in reports[0]:
+        merged["metrics"] = [m for r in reports for m in r["metrics"]]
+    return merged
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    rows = [("total", report["total"], baseline.get("total", {}))]
+    rows += [(name, stats, baseline.get("ops", {}).get(name, {})) for name, stats in report["ops"].items() if name != "errors"]
+    print(f"\n{'op':<12} {'throughput':>20} {'p95 ms':>22} {'p99 ms':>22}")
+    for name, now, base in rows:
+        if not base.get("count"):
+            continue
+        cells = []
+        for key, higher_is_better in (("throughput", True), ("p95_ms", False), ("p99_ms", False)):
+            change = now[key] / base[key] - 1 if base[key] else 0.0
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(f"{name} {key}: {base[key]:.3f} -> {now[key]:.3f} ({change:+.1%})")
+            cells.append(f"{now[key]:>10.3f} ({change:+7.1%})")
+        print(f"{name:<12} {cells[0]:>20} {cells[1]:>22} {cells[2]:>22}")
+    return regressions
+
+def print_report(report: dict):
+    print(f"{'op':<12} {'count':>8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, s in list(report["ops"].items()) + [("total", report["total"])]:
+        print(f"{name:<12} {s['count']:>8} {s['throughput']:>10.1f} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['max_ms']:>9.3f}")
+    print(f"elapsed {report['elapsed_s']:.2f}s, {report['booking_misses']} bookings found no free slot")
+
+def run_once(args, spec: DataSpec, ops: int | None) -> dict:
+    if args.processes > 1:
+        with ProcessPoolExecutor(args.processes) as pool:
+            futures = [pool.submit(run_replica, spec, args.ai_latency, MIXES[args.mix], args.threads, i, args.processes, ops, args.duration)
+                       for i in range(args.processes)]
+            parts = [f.result() for f in futures]
+    else:
+        parts = [run_replica(spec, args.ai_latency, MIXES[args.mix], args.threads, 0, 1, ops, args.duration)]
+    results = [r for part in parts for r in part[0]]
+    report = summarize(args, results, max(part[1] for part in parts), sum(part[2] for part in parts))
+    if args.metrics:
+        report["metrics"] = [part[3] for part in parts]
+    return report
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Reproducible load generation against an in-process AppController")
+    ap.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    ap.add_argument("--doctors", type=int, default=200)
+    ap.add_argument("--patients", type=int, default=1000)
+    ap.add_argument("--slots-per-day", type=int, default=16)
+    ap.add_argument("--horizon-days", type=int, default=14)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--threads", type=int, default=4, help="worker threads per process")
+    ap.add_argument("--processes", type=int, default=1, help="processes, each driving its own replica of the dataset")
+    ap.add_argument("--ops", type=int, default=20000, help="total operations across all workers")
+    ap.add_argument("--duration", type=float, help="run for this many seconds instead of a fixed number of operations")
+    ap.add_argument("--ai-latency", type=float, default=0.0, help="simulated Gemini latency in seconds")
+    ap.add_argument("--metrics", action="store_true", help="enable internal instrumentation and include it in the output")
+    ap.add_argument("--output", help="write the JSON report here")
+    ap.add_argument("--baseline", help="compare against a previously written JSON report")
+    ap.add_argument("--repeat", type=int, default=3, help="run the benchmark this many times and report the median of each statistic")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression of the medians before failing")
+    args = ap.parse_args(argv)
+    spec = DataSpec(args.doctors, args.patients, args.slots_per_day, args.horizon_days, args.seed)
+    ops = None if args.duration else args.ops
+    METRICS.enabled = args.metrics
+    reports = []
+    for n in range(args.repeat):
+        report = run_once(args, spec, ops)
+        if args.repeat > 1:
+            print(f"run {n + 1}/{args.repeat}: {report['total']['throughput']:.1f} ops/s, p95 {report['total']['p95_ms']:.3f} ms")
+        reports.append(report)
+    report = median_report(reports)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nregressions beyond tolerance:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import random
+import re
+import time as _time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from benchmarks.datagen import CITIES, PASSWORD, SPECIALITIES, Dataset
+from controllers import AppController
+
+MIXES = {
+    "browse": {"login": 1, "search": 40, "slots": 50, "book": 5, "cancel": 2, "recommend": 2},
+    "booking": {"login": 2, "search": 15, "slots": 25, "book": 35, "cancel": 18, "recommend": 5},
+    "login": {"login": 100},
+    "ai": {"search": 20, "slots": 20, "recommend": 60},
+    "mixed": {"login": 5, "search": 30, "slots": 30, "book": 15, "cancel": 8, "recommend": 12},
+}
+
+class StubModel:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+    async def generate_content_async(self, prompt: str):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        doctor, slot = re.search(r"doctor_id=([^,\s]+)", prompt), re.search(r"slot_id=([^,\s]+)", prompt)
+        if doctor and slot:
+            text = json.dumps({"doctor_id": doctor.group(1), "slot_id": slot.group(1), "reason": "stub"})
+        else:
+            text = json.dumps({"speciality": None, "urgency": "routine", "preferred_time_of_day": None, "date_hint": None})
+        return type("Resp", (), {"text": text})()
+
+class Worker:
+    def __init__(self, controller: AppController, data: Dataset, worker_id: int, workers: int, seed: int):
+        self.controller = controller
+        self.data = data
+        self.rng = random.Random(seed * 7919 + worker_id)
+        self.patients = data.patients[worker_id::workers] or data.patients
+        self.booked: List[tuple] = []
+        self.misses = 0
+    def patient(self):
+        return self.rng.choice(self.patients)
+    def login(self):
+        patient = self.patient()
+        if not self.controller.create_session(patient.email, PASSWORD):
+            raise ValueError(f"login failed for {patient.email}")
+    def search(self):
+        roll = self.rng.random()
+        if roll < 0.4:
+            self.controller.search_doctors(speciality=self.rng.choice(SPECIALITIES))
+        elif roll < 0.7:
+            self.controller.search_doctors(speciality=self.rng.choice(SPECIALITIES), location=self.rng.choice(CITIES))
+        else:
+            self.controller.search_doctors(text=f"bench {self.rng.randrange(len(self.data.doctors))}")
+    def slots(self):
+        doctor = self.rng.choice(self.data.doctors)
+        day = datetime.combine(datetime.now().date(), datetime.min.time()) + timedelta(days=self.rng.randrange(self.data.spec.horizon_days))
+        if self.rng.random() < 0.5:
+            self.controller.get_free_slots(doctor.id, day)
+        else:
+            self.controller.get_doctor_slots(doctor.id, day)
+    def book(self):
+        patient = self.patient()
+        for doctor, slot in self.controller.find_earliest_slots(self.rng.choice(SPECIALITIES), limit=5):
+            try:
+                appt = self.controller.book_appointment(patient, doctor, slot.slot_id)
+            except ValueError:
+                continue
+            self.booked.append((patient, appt.appointment_id))
+            return
+        self.misses += 1
+    def cancel(self):
+        if not self.booked:
+            return self.book()
+        patient, appointment_id = self.booked.pop(self.rng.randrange(len(self.booked)))
+        self.controller.cancel_appointment(patient, appointment_id)
+    def recommend(self):
+        self.controller.recommend_slot(self.patient(), self.rng.choice(SPECIALITIES), self.rng.choice(("routine", "urgent", "high")))
+    def ops(self) -> Dict[str, Callable[[], None]]:
+        return {"login": self.login, "search": self.search, "slots": self.slots, "book": self.book, "cancel": self.cancel,
+                "recommend": self.recommend}
+
+def run_worker(worker: Worker, mix: Dict[str, int], ops: int | None, deadline: float | None) -> Dict[str, List[int]]:
+    table = worker.ops()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies: Dict[str, List[int]] = {n: [] for n in names}
+    latencies["errors"] = []
+    clock = _time.perf_counter_ns
+    deadline_ns = int(deadline * 1e9) if deadline is not None else None
+    done = 0
+    while (ops is None or done < ops) and (deadline is None or _time.perf_counter() < deadline):
+        for name in worker.rng.choices(names, weights, k=64):
+            op = table[name]
+            start = clock()
+            try:
+                op()
+            except ValueError:
+                latencies["errors"].append(clock() - start)
+            else:
+                latencies[name].append(clock() - start)
+            done += 1
+            if done == ops or (deadline is not None and start > deadline_ns):
+                break
+    return latencies
@@ -1,52 +1,191 @@
-from typing import Optional
-from datetime import datetime, time
-from models import User, UserRole, Patient, Doctor, TimeSlot, Appointment
-from services import AuthService, AppointmentService
+import os
+from typing import Optional, Tuple
+from datetime import datetime, time, timedelta
+from models import User, UserRole, Patient, Doctor, TimeSlot, Appointment, AppointmentStatus, RecurrenceRule
+from services import AuthService, AppointmentService, AIRecommendationService, AnalyticsEngine, AnalyticsReport
+from services.gemini import GeminiClient
+from services.passwords import PasswordHasher
+from services.query_parser import LOCAL_PARSE_CONFIDENCE, parse_query
+from services.metrics import METRICS, timed
+from storage import Storage
+
+DEMO_DOCTORS = [
+    ("Dr. Sarah Johnson", "Cardiology", 12, "New York"),
+    ("Dr. Michael Chen", "Neurology", 8, "San Francisco"),
+    ("Dr. Emily Rodriguez", "Dermatology", 6, "Los Angeles"),
+    ("Dr. James Wilson", "Orthopedics", 15, "Chicago"),
+    ("Dr. Lisa Anderson", "Pediatrics", 10, "Houston"),
+    ("Dr. Robert Kumar", "Oncology", 20, "Boston"),
+    ("Dr. Jessica Lee", "Pulmonology", 9, "Seattle"),
+    ("Dr. David Martinez", "Gastroenterology", 14, "Miami"),
+    ("Dr. Priya Patel", "Psychiatry", 11, "Denver"),
+    ("Dr. Christopher Brown", "Ophthalmology", 7, "Austin"),
+    ("Dr. Amanda White", "Endocrinology", 13, "Philadelphia"),
+    ("Dr. Thomas Garcia", "Urology", 18, "Dallas"),
+    ("Dr. Victoria Lee", "Rheumatology", 9, "Portland"),
+    ("Dr. William Harris", "Nephrology", 12, "Atlanta"),
+    ("Dr. Sophie Clark", "Hematology", 10, "Phoenix"),
+]
 
 class AppController:
-    def __init__(self):
-        self.auth = AuthService()
-        self.appt_service = AppointmentService()
-        self._seed_data()
+    def __init__(self, storage: Storage | None = None, hasher: PasswordHasher | None = None, gemini: GeminiClient | None = None, seed: bool = True,
+                 admin_password: str | None = None):
+        self.auth = AuthService(storage, hasher)
+        self.appt_service = AppointmentService(storage)
+        self.analytics = AnalyticsEngine(self.appt_service)
+        self.ai = AIRecommendationService(self.appt_service, client=gemini) if gemini else None
+        doctors = [u for u in self.auth.users() if isinstance(u, Doctor)]
+        self.appt_service.add_doctors(doctors)
+        if not doctors and seed:
+            self._seed_data(admin_password or os.getenv("MEDIBOOK_ADMIN_PASSWORD"))
     
-    def _seed_data(self):
+    def _seed_data(self, admin_password: str | None = None):
         doc = self.auth.register_doctor(
             "Dr. Arjun Rao",
             "arjun@medibook.local",
             "doctor123",
-            speciality="Cardiologist",
+            speciality="Cardiology",
             exp_yrs=8,
             location="Hyderabad",
             mode="In-person"
         )
-        self.appt_service.add_doctor(doc)
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        for h in [10, 11, 12, 15, 16]:
-            slot = TimeSlot.create(
-                doctor_id=doc.id,
-                date=today,
-                start_time=time(hour=h),
-                end_time=time(hour=h + 1),
-            )
-            self.appt_service.add_slot(slot)
+        demo_hash = self.auth.hasher.hash("doctor123")
+        demo = [Doctor.create(name, f"{'.'.join(name.split()[1:]).lower()}@medibook.local", None, spec, exp, loc, password_hash=demo_hash)
+                for name, spec, exp, loc in DEMO_DOCTORS]
+        self.auth.add_users(demo)
+        if admin_password:
+            self.auth.add_users([User.create("Administrator", "admin@medibook.local", None, UserRole.ADMIN,
+                                             password_hash=self.auth.hasher.hash(admin_password))])
+        self.appt_service.add_doctors([doc] + demo)
+        today = datetime.now().date()
+        rule = RecurrenceRule(
+            start_date=today,
+            end_date=today + timedelta(days=13),
+            weekdays=tuple(range(7)),
+            day_start=time(hour=10),
+            day_end=time(hour=17),
+            slot_minutes=60,
+            breaks=((time(hour=13), time(hour=15)),),
+        )
+        for d in [doc] + demo:
+            self.appt_service.publish_schedule(d.id, rule)
     
+    @timed("controller.login")
     def login(self, email: str, password: str) -> Optional[User]:
         return self.auth.login(email, password)
     
+    @timed("controller.create_session")
+    def create_session(self, email: str, password: str) -> Optional[Tuple[User, str]]:
+        return self.auth.create_session(email, password)
+    
+    @timed("controller.resume_session")
+    def resume_session(self, token: str | None) -> Optional[User]:
+        return self.auth.resume_session(token)
+    
+    def logout(self, token: str):
+        self.auth.end_session(token)
+    
+    @timed("controller.register_patient")
     def register_patient(self, name, email, password, **extra) -> Patient:
         return self.auth.register_patient(name, email, password, **extra)
     
+    def start_session(self, user: User) -> str:
+        return self.auth.start_session(user)
+    
+    def get_doctor(self, doctor_id: str) -> Optional[Doctor]:
+        return self.appt_service.doctors.get(doctor_id)
+    
+    def specialities(self) -> list[str]:
+        return self.appt_service.specialities()
+    
     def get_doctors(self, speciality: str | None = None):
         return self.appt_service.list_doctors(speciality)
     
+    def publish_schedule(self, doctor: Doctor, rule: RecurrenceRule, skip_overlaps: bool = False) -> int:
+        return self.appt_service.publish_schedule(doctor.id, rule, skip_overlaps=skip_overlaps)
+    
+    @timed("controller.search_doctors")
+    def search_doctors(self, text: str | None = None, speciality: str | None = None, location: str | None = None, mode: str | None = None,
+                       sort: str = "experience", offset: int = 0, limit: int = 20):
+        return self.appt_service.search_doctors(text, speciality, location, mode, sort, offset, limit)
+    
+    @timed("controller.find_earliest_slots")
+    def find_earliest_slots(self, speciality: str | None = None, location: str | None = None, limit: int = 10, **window):
+        return self.appt_service.find_earliest_slots(speciality, location, limit=limit, **window)
+    
+    def get_free_slots(self, doctor_id: str, date: datetime | None = None):
+        return self.appt_service.get_free_slots(doctor_id, date)
+    
+    def get_slot(self, slot_id: str) -> Optional[TimeSlot]:
+        return self.appt_service.slots.get(slot_id)
+    
+    def directory_version(self) -> int:
+        return self.appt_service.directory_version
+    
+    def doctor_version(self, doctor_id: str) -> int:
+        return self.appt_service.doctor_version(doctor_id)
+    
+    def patient_version(self, patient_id: str) -> int:
+        return self.appt_service.patient_version(patient_id)
+    
+    @timed("controller.get_doctor_slots")
     def get_doctor_slots(self, doctor_id: str, date: datetime | None = None):
         return self.appt_service.get_doctor_slots(doctor_id, date)
     
+    @timed("controller.recommend_slot")
+    def recommend_slot(self, patient: Patient, speciality: str | None = None, urgency: str = "routine", constraints: dict | None = None):
+        if not self.ai:
+            raise ValueError("AI recommendations are not configured")
+        return self.ai.recommend_slot(patient, speciality, urgency, constraints)
+    
+    @timed("controller.parse_request")
+    def parse_request(self, text: str) -> dict:
+        if self.ai:
+            return self.ai.parse_natural_query(text)
+        parsed = parse_query(text, self.specialities())
+        if parsed.confidence < LOCAL_PARSE_CONFIDENCE:
+            raise ValueError("AI parsing is not configured; please name the speciality you need")
+        return parsed.as_dict()
+    
+    @timed("controller.book_appointment")
     def book_appointment(self, patient: Patient, doctor: Doctor, slot_id: str):
         return self.appt_service.book(patient, doctor, slot_id)
     
+    @timed("controller.cancel_appointment")
     def cancel_appointment(self, patient: Patient, appointment_id: str):
         self.appt_service.cancel(appointment_id, patient)
     
-    def get_patient_appointments(self, patient: Patient):
-        return self.appt_service.list_patient_appointments(patient)
+    @timed("controller.complete_appointment")
+    def complete_appointment(self, appointment_id: str):
+        self.appt_service.complete(appointment_id)
+    
+    def get_patient_appointments(self, patient: Patient, statuses: list[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None):
+        return self.appt_service.list_patient_appointments(patient, statuses, date_from, date_to)
+    
+    def get_patient_appointment_page(self, patient: Patient, cursor: int | None = None, limit: int = 20, **filters):
+        return self.appt_service.page_patient_appointments(patient, cursor=cursor, limit=limit, **filters)
+    
+    def get_doctor_appointment_page(self, doctor: Doctor, cursor: int | None = None, limit: int = 20, **filters):
+        return self.appt_service.page_doctor_appointments(doctor, cursor=cursor, limit=limit, **filters)
+    
+    @timed("controller.get_admin_report")
+    def get_admin_report(self) -> AnalyticsReport:
+        return self.analytics.report()
+    
+    def metrics_snapshot(self) -> dict:
+        return METRICS.snapshot()
+    
+    def metrics_prometheus(self) -> str:
+        return METRICS.to_prometheus()
+    
+    def set_metrics_enabled(self, enabled: bool):
+        METRICS.enabled = enabled
+    
+    def set_profiling(self, enabled: bool):
+        if enabled:
+            METRICS.profiler.start()
+        else:
+            METRICS.profiler.stop()
+    
+    def profile_top(self, n: int = 20) -> list:
+        return METRICS.profiler.top(n)
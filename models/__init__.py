@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
+from typing import Iterator
 import uuid
 import hashlib
-from datetime import datetime, time
+import hmac
+import os
+from datetime import date, datetime, time, timedelta
 
 class UserRole(str, Enum):
     PATIENT = "PATIENT"
@@ -14,9 +17,31 @@ class AppointmentStatus(str, Enum):
     CANCELLED = "CANCELLED"
     COMPLETED = "COMPLETED"
 
-def _hash_password(pw: str) -> str:
+SCRYPT_COST = (2 ** 14, 8, 1)
+
+def _legacy_hash(pw: str) -> str:
     return hashlib.sha256(pw.encode()).hexdigest()
 
+def hash_password(pw: str, cost: tuple = SCRYPT_COST) -> str:
+    n, r, p = cost
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(pw.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024)
+    return f"scrypt${n}${r}${p}${salt.hex()}${digest.hex()}"
+
+def verify_password(pw: str, stored: str) -> bool:
+    if not stored.startswith("scrypt$"):
+        return hmac.compare_digest(stored, _legacy_hash(pw))
+    try:
+        _, n, r, p, salt, digest = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        expected = hashlib.scrypt(pw.encode(), salt=bytes.fromhex(salt), n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024)
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected.hex(), digest)
+
+def needs_rehash(stored: str, cost: tuple = SCRYPT_COST) -> bool:
+    return not stored.startswith(f"scrypt${cost[0]}${cost[1]}${cost[2]}$")
+
 @dataclass
 class User:
     id: str
@@ -25,10 +50,10 @@ class User:
     password_hash: str
     role: UserRole
     @classmethod
-    def create(cls, name, email, password, role):
-        return cls(str(uuid.uuid4()), name, email.lower(), _hash_password(password), role)
+    def create(cls, name, email, password, role, password_hash=None):
+        return cls(str(uuid.uuid4()), name, email.lower(), password_hash or hash_password(password), role)
     def check_password(self, pw: str) -> bool:
-        return self.password_hash == _hash_password(pw)
+        return verify_password(pw, self.password_hash)
 
 @dataclass
 class Patient(User):
@@ -36,8 +61,8 @@ class Patient(User):
     gender: str | None = None
     preferred_speciality: str | None = None
     @classmethod
-    def create(cls, name, email, password, age=None, gender=None, pref_spec=None):
-        base = User.create(name, email, password, UserRole.PATIENT)
+    def create(cls, name, email, password, age=None, gender=None, pref_spec=None, password_hash=None):
+        base = User.create(name, email, password, UserRole.PATIENT, password_hash)
         return cls(**base.__dict__, age=age, gender=gender, preferred_speciality=pref_spec)
 
 @dataclass
@@ -47,11 +72,11 @@ class Doctor(User):
     location: str = ""
     consultation_mode: str = "In-person"
     @classmethod
-    def create(cls, name, email, password, speciality, exp_yrs=0, location="", mode="In-person"):
-        base = User.create(name, email, password, UserRole.DOCTOR)
+    def create(cls, name, email, password, speciality, exp_yrs=0, location="", mode="In-person", password_hash=None):
+        base = User.create(name, email, password, UserRole.DOCTOR, password_hash)
         return cls(**base.__dict__, speciality=speciality, experience_years=exp_yrs, location=location, consultation_mode=mode)
 
-@dataclass
+@dataclass(slots=True)
 class TimeSlot:
     slot_id: str
     doctor_id: str
@@ -68,6 +93,42 @@ class TimeSlot:
         self.is_booked = False
 
 @dataclass
+class RecurrenceRule:
+    start_date: date
+    end_date: date
+    weekdays: tuple[int, ...] = (0, 1, 2, 3, 4)
+    day_start: time = time(9)
+    day_end: time = time(17)
+    slot_minutes: int = 30
+    breaks: tuple[tuple[time, time], ...] = ()
+    def day_template(self) -> list[tuple[time, time]]:
+        if self.slot_minutes <= 0:
+            raise ValueError("slot_minutes must be positive")
+        start = self.day_start.hour * 60 + self.day_start.minute
+        stop = self.day_end.hour * 60 + self.day_end.minute
+        breaks = [(b.hour * 60 + b.minute, e.hour * 60 + e.minute) for b, e in self.breaks]
+        res = []
+        while start + self.slot_minutes <= stop:
+            end = start + self.slot_minutes
+            if not any(start < be and bs < end for bs, be in breaks):
+                res.append((time(start // 60, start % 60), time(end // 60, end % 60)))
+            start = end
+        return res
+    def expand(self, doctor_id: str, id_prefix: str | None = None) -> Iterator["TimeSlot"]:
+        template = self.day_template()
+        prefix = id_prefix or uuid.uuid4().hex[:12]
+        weekdays = set(self.weekdays)
+        day = datetime(self.start_date.year, self.start_date.month, self.start_date.day)
+        last = datetime(self.end_date.year, self.end_date.month, self.end_date.day)
+        n = 0
+        while day <= last:
+            if day.weekday() in weekdays:
+                for start, end in template:
+                    yield TimeSlot(f"{prefix}-{n}", doctor_id, day, start, end)
+                    n += 1
+            day += timedelta(days=1)
+
+@dataclass(slots=True)
 class Appointment:
     appointment_id: str
     patient_id: str
@@ -1,105 +1,510 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime, time
-from models import User, Patient, Doctor, TimeSlot, Appointment, UserRole, AppointmentStatus
-import google.generativeai as genai
-import os
+from collections import deque
+from contextlib import ExitStack
+from heapq import merge
+from itertools import count, islice
+from operator import attrgetter
+import threading
+from models import User, Patient, Doctor, TimeSlot, Appointment, UserRole, AppointmentStatus, RecurrenceRule
+from services.indexes import SlotIndex, SlotTimeIndex, AppointmentIndex, AppointmentPage
+from services.locks import StripedLock
+from storage import Storage
+from services.context import SlotContextCache
+from services.ranking import RankedSlot, rank_slots
+from services.gemini import GeminiClient
+from services.query_parser import LOCAL_PARSE_CONFIDENCE, ParsedQuery, parse_query
+from services.search import DoctorSearchIndex, DoctorPage, NO_AVAILABILITY
+from services.passwords import PasswordHasher, SessionCache
+from services.analytics import AnalyticsEngine, AnalyticsReport
+from services.metrics import timed
 import json
 
+_start_time = attrgetter("start_time")
+
 class AuthService:
-    def __init__(self):
-        self._users_by_email: Dict[str, User] = {}
+    def __init__(self, storage: Storage | None = None, hasher: PasswordHasher | None = None, sessions: SessionCache | None = None):
+        self.storage = storage or Storage()
+        self.hasher = hasher or PasswordHasher()
+        self.sessions = sessions or SessionCache()
+        self._users_by_email: Dict[str, User] = {u.email: u for u in self.storage.load_users()}
+        self._users_by_id: Dict[str, User] = {u.id: u for u in self._users_by_email.values()}
+        self._register_lock = threading.Lock()
+    def users(self) -> List[User]:
+        return list(self._users_by_email.values())
+    def find_user(self, email: str) -> Optional[User]:
+        return self._users_by_email.get(email.lower())
+    def _register(self, user: User) -> User:
+        with self._register_lock:
+            if user.email in self._users_by_email:
+                raise ValueError("Email already in use")
+            self.storage.save_user(user)
+            self._users_by_email[user.email] = user
+            self._users_by_id[user.id] = user
+        return user
+    def add_users(self, users: Iterable[User]) -> int:
+        users = list(users)
+        with self._register_lock:
+            emails, ids = set(), set()
+            for user in users:
+                if user.email in self._users_by_email or user.email in emails:
+                    raise ValueError(f"Email already in use: {user.email}")
+                if user.id in self._users_by_id or user.id in ids:
+                    raise ValueError(f"User id already in use: {user.id}")
+                emails.add(user.email)
+                ids.add(user.id)
+            self.storage.save_users(users)
+            for user in users:
+                self._users_by_email[user.email] = user
+                self._users_by_id[user.id] = user
+        return len(users)
+    @timed("auth.register")
     def register_patient(self, name, email, password, **extra) -> Patient:
         if email.lower() in self._users_by_email:
             raise ValueError("Email already in use")
-        patient = Patient.create(name, email, password, **extra)
-        self._users_by_email[patient.email] = patient
-        return patient
+        return self._register(Patient.create(name, email, None, password_hash=self.hasher.hash(password), **extra))
+    @timed("auth.register")
     def register_doctor(self, name, email, password, speciality, **extra) -> Doctor:
         if email.lower() in self._users_by_email:
             raise ValueError("Email already in use")
-        doctor = Doctor.create(name, email, password, speciality, **extra)
-        self._users_by_email[doctor.email] = doctor
-        return doctor
+        return self._register(Doctor.create(name, email, None, speciality, password_hash=self.hasher.hash(password), **extra))
+    def find_user_by_id(self, user_id: str) -> Optional[User]:
+        return self._users_by_id.get(user_id)
+    @timed("auth.login")
     def login(self, email: str, password: str) -> Optional[User]:
         user = self._users_by_email.get(email.lower())
-        if not user or not user.check_password(password):
+        if not user or not self.hasher.verify(password, user.password_hash):
             return None
+        if self.hasher.needs_rehash(user.password_hash):
+            user.password_hash = self.hasher.hash(password)
+            self.storage.save_user(user)
+            self.hasher.rehashes += 1
         return user
+    def create_session(self, email: str, password: str) -> Optional[Tuple[User, str]]:
+        user = self.login(email, password)
+        if not user:
+            return None
+        return user, self.start_session(user)
+    def start_session(self, user: User) -> str:
+        return self.sessions.issue(user.id)
+    def resume_session(self, token: str | None) -> Optional[User]:
+        user_id = self.sessions.resolve(token) if token else None
+        return self._users_by_id.get(user_id) if user_id else None
+    def end_session(self, token: str):
+        self.sessions.revoke(token)
 
 class AppointmentService:
-    def __init__(self):
+    def __init__(self, storage: Storage | None = None, lock_stripes: int = 64, change_log_size: int = 10000):
+        self.storage = storage or Storage()
+        self.version = 0
+        self._version_counter = count(1)
+        self._doctor_versions: Dict[str, int] = {}
+        self._patient_versions: Dict[str, int] = {}
+        self.directory_version = 0
+        self._changes: deque = deque(maxlen=change_log_size)
+        self._changes_lock = threading.Lock()
+        self._specialities: Dict[str, str] = {}
+        self.doctor_index = DoctorSearchIndex()
+        self._doctor_index_version = 0
+        self._doctor_index_day = datetime.now().date()
         self.doctors: Dict[str, Doctor] = {}
         self.slots: Dict[str, TimeSlot] = {}
         self.appointments: Dict[str, Appointment] = {}
+        self._slot_holders: Dict[str, str] = {}
+        self._slot_index = SlotIndex()
+        self._free_index = SlotIndex()
+        self._free_by_speciality = SlotTimeIndex()
+        self._free_query_locks = StripedLock(lock_stripes)
+        self._patient_appts = AppointmentIndex()
+        self._doctor_appts = AppointmentIndex()
+        self._locks = StripedLock(lock_stripes)
+        for slot in self.storage.load_slots():
+            self._index_slot(slot)
+        for appt in self.storage.load_appointments():
+            self._index_appointment(appt)
+    def _touch(self, doctor_id: str, patient_id: str | None = None):
+        with self._changes_lock:
+            v = next(self._version_counter)
+            self._doctor_versions[doctor_id] = v
+            if patient_id:
+                self._patient_versions[patient_id] = v
+            self._changes.append((v, doctor_id))
+            self.version = v
+    def doctor_version(self, doctor_id: str) -> int:
+        return self._doctor_versions.get(doctor_id, 0)
+    def patient_version(self, patient_id: str) -> int:
+        return self._patient_versions.get(patient_id, 0)
+    def changes_since(self, version: int) -> Optional[Set[str]]:
+        with self._changes_lock:
+            if version >= self.version:
+                return set()
+            if not self._changes or self._changes[0][0] > version + 1:
+                return None
+            changed = set()
+            for v, doctor_id in reversed(self._changes):
+                if v <= version:
+                    break
+                changed.add(doctor_id)
+            return changed
     def add_doctor(self, doctor: Doctor):
         self.doctors[doctor.id] = doctor
+        self._specialities.setdefault(doctor.speciality.lower(), doctor.speciality)
+        self.doctor_index.add(doctor, self._next_available(doctor.id, self._doctor_index_day))
+        with self._locks.for_key(doctor.id):
+            for slot in self._free_index.iter_slots(doctor.id):
+                self._add_query_slot(doctor, slot)
+        self.directory_version += 1
+        self._touch(doctor.id)
+    def add_doctors(self, doctors: Iterable[Doctor]):
+        doctors = list(doctors)
+        for doctor in doctors:
+            self.doctors[doctor.id] = doctor
+            self._specialities.setdefault(doctor.speciality.lower(), doctor.speciality)
+        self.doctor_index.add_many([(d, self._next_available(d.id, self._doctor_index_day)) for d in doctors])
+        self.directory_version += 1
+        for doctor in doctors:
+            with self._locks.for_key(doctor.id):
+                for slot in self._free_index.iter_slots(doctor.id):
+                    self._add_query_slot(doctor, slot)
+            self._touch(doctor.id)
+    def specialities(self) -> List[str]:
+        return list(self._specialities.values())
     def list_doctors(self, speciality: str | None = None) -> List[Doctor]:
-        docs = list(self.doctors.values())
         if speciality:
-            docs = [d for d in docs if d.speciality.lower() == speciality.lower()]
-        return docs
-    def add_slot(self, slot: TimeSlot):
+            return self.doctor_index.by_speciality(speciality)
+        return list(self.doctors.values())
+    def _next_available(self, doctor_id: str, today) -> tuple:
+        for slot in self._free_index.iter_slots(doctor_id, today):
+            return (slot.date.toordinal(), slot.start_time.hour * 60 + slot.start_time.minute)
+        return NO_AVAILABILITY
+    def _sync_doctor_index(self):
+        version, today = self.version, datetime.now().date()
+        changed = self.changes_since(self._doctor_index_version) if today == self._doctor_index_day else None
+        if changed is None:
+            changed = list(self.doctors)
+        self.doctor_index.set_availabilities({doctor_id: self._next_available(doctor_id, today) for doctor_id in changed})
+        self._doctor_index_version, self._doctor_index_day = version, today
+    @timed("appointments.search_doctors")
+    def search_doctors(self, text: str | None = None, speciality: str | None = None, location: str | None = None, mode: str | None = None,
+                       sort: str = "experience", offset: int = 0, limit: int = 20) -> DoctorPage:
+        self._sync_doctor_index()
+        return self.doctor_index.search(text, speciality, location, mode, sort, offset, limit)
+    def _slot_query_keys(self, doctor: Doctor) -> List[str]:
+        speciality = doctor.speciality.lower()
+        keys = [speciality]
+        if doctor.location:
+            keys.append(f"{speciality}|{doctor.location.lower()}")
+        if doctor.consultation_mode:
+            keys.append(f"{speciality}#{doctor.consultation_mode.lower()}")
+        return keys
+    def _add_query_slot(self, doctor: Doctor, slot: TimeSlot):
+        for key in self._slot_query_keys(doctor):
+            with self._free_query_locks.for_key(key):
+                self._free_by_speciality.add(key, slot)
+    def _remove_query_slot(self, doctor: Doctor, slot: TimeSlot):
+        for key in self._slot_query_keys(doctor):
+            with self._free_query_locks.for_key(key):
+                self._free_by_speciality.remove(key, slot)
+    def _add_free(self, slot: TimeSlot):
+        self._free_index.add(slot.doctor_id, slot)
+        doctor = self.doctors.get(slot.doctor_id)
+        if doctor:
+            self._add_query_slot(doctor, slot)
+    def _remove_free(self, slot: TimeSlot):
+        self._free_index.remove(slot.doctor_id, slot)
+        doctor = self.doctors.get(slot.doctor_id)
+        if doctor:
+            self._remove_query_slot(doctor, slot)
+    def _index_slot(self, slot: TimeSlot):
+        old = self.slots.get(slot.slot_id)
+        if old:
+            self._slot_index.remove(old.doctor_id, old)
+            if not old.is_booked:
+                self._remove_free(old)
         self.slots[slot.slot_id] = slot
+        self._slot_index.add(slot.doctor_id, slot)
+        if not slot.is_booked:
+            self._add_free(slot)
+    def _index_appointment(self, appt: Appointment):
+        self.appointments[appt.appointment_id] = appt
+        if appt.status == AppointmentStatus.BOOKED:
+            self._slot_holders[appt.slot_id] = appt.appointment_id
+        self._patient_appts.add(appt.patient_id, appt)
+        self._doctor_appts.add(appt.doctor_id, appt)
+    def _release_holder(self, appt: Appointment):
+        if self._slot_holders.get(appt.slot_id) == appt.appointment_id:
+            del self._slot_holders[appt.slot_id]
+    def add_slot(self, slot: TimeSlot):
+        with self._locks.for_key(slot.doctor_id):
+            self.storage.save_slots([slot])
+            self._index_slot(slot)
+            self._touch(slot.doctor_id)
+    @timed("appointments.add_slots")
+    def add_slots(self, slots: Iterable[TimeSlot], batch_size: int = 10000, skip_overlaps: bool = False,
+                  errors: List[Tuple[TimeSlot, str]] | None = None) -> int:
+        it = iter(slots)
+        added = 0
+        while batch := list(islice(it, batch_size)):
+            added += self._add_slot_batch(batch, skip_overlaps, errors)
+        return added
+    def _add_slot_batch(self, batch: List[TimeSlot], skip_overlaps: bool, errors: List[Tuple[TimeSlot, str]] | None) -> int:
+        groups: Dict[tuple, List[TimeSlot]] = {}
+        for slot in batch:
+            groups.setdefault((slot.doctor_id, slot.date.date()), []).append(slot)
+        with ExitStack() as stack:
+            for lock in self._locks.for_keys({doctor_id for doctor_id, _ in groups}):
+                stack.enter_context(lock)
+            accepted = []
+            for (doctor_id, day), group in groups.items():
+                group.sort(key=_start_time)
+                existing = self._slot_index.has_day(doctor_id, day)
+                if (not existing and self.slots.keys().isdisjoint([s.slot_id for s in group])
+                        and all(a.end_time <= b.start_time for a, b in zip(group, islice(group, 1, None)))):
+                    accepted.append((doctor_id, day, group))
+                    continue
+                kept = []
+                for slot in group:
+                    clash = slot.slot_id in self.slots or (kept and kept[-1].end_time > slot.start_time)
+                    if not clash and existing:
+                        clash = self._slot_index.overlapping(doctor_id, slot) is not None
+                    if clash:
+                        error = f"Slot {slot.slot_id} overlaps existing availability for doctor {doctor_id} on {day}"
+                        if not skip_overlaps:
+                            raise ValueError(error)
+                        if errors is not None:
+                            errors.append((slot, error))
+                        continue
+                    kept.append(slot)
+                accepted.append((doctor_id, day, kept))
+            self.storage.save_slots([s for _, _, kept in accepted for s in kept])
+            for doctor_id, day, kept in accepted:
+                self.slots.update((slot.slot_id, slot) for slot in kept)
+                free = [s for s in kept if not s.is_booked]
+                self._slot_index.extend_day(doctor_id, day, kept)
+                self._free_index.extend_day(doctor_id, day, free)
+                doctor = self.doctors.get(doctor_id)
+                if doctor and free:
+                    for key in self._slot_query_keys(doctor):
+                        with self._free_query_locks.for_key(key):
+                            self._free_by_speciality.extend(key, day, free)
+            for doctor_id in {doctor_id for doctor_id, _, kept in accepted if kept}:
+                self._touch(doctor_id)
+        return sum(len(kept) for _, _, kept in accepted)
+    @timed("appointments.add_appointments")
+    def add_appointments(self, appts: Iterable[Appointment], batch_size: int = 10000, skip_conflicts: bool = False,
+                         errors: List[Tuple[Appointment, str]] | None = None) -> int:
+        it = iter(appts)
+        added = 0
+        while batch := list(islice(it, batch_size)):
+            added += self._add_appointment_batch(batch, skip_conflicts, errors)
+        return added
+    def _appointment_conflict(self, appt: Appointment, seen: Set[str], booked: Set[str]) -> Optional[str]:
+        slot = self.slots.get(appt.slot_id)
+        if appt.appointment_id in self.appointments or appt.appointment_id in seen:
+            return f"Appointment {appt.appointment_id} already exists"
+        if not slot or slot.doctor_id != appt.doctor_id:
+            return f"Appointment {appt.appointment_id} references an unknown slot for doctor {appt.doctor_id}"
+        if appt.status == AppointmentStatus.BOOKED and (slot.slot_id in self._slot_holders or slot.slot_id in booked):
+            return f"Slot {slot.slot_id} is already booked"
+        return None
+    def _add_appointment_batch(self, batch: List[Appointment], skip_conflicts: bool, errors: List[Tuple[Appointment, str]] | None) -> int:
+        seen: Set[str] = set()
+        booked: Set[str] = set()
+        accepted = []
+        with ExitStack() as stack:
+            for lock in self._locks.for_keys({a.doctor_id for a in batch}):
+                stack.enter_context(lock)
+            for appt in batch:
+                error = self._appointment_conflict(appt, seen, booked)
+                if error:
+                    if not skip_conflicts:
+                        raise ValueError(error)
+                    if errors is not None:
+                        errors.append((appt, error))
+                    continue
+                seen.add(appt.appointment_id)
+                if appt.status == AppointmentStatus.BOOKED:
+                    booked.add(appt.slot_id)
+                accepted.append(appt)
+            self.storage.save_appointments(accepted)
+            for appt in accepted:
+                slot = self.slots[appt.slot_id]
+                if appt.status == AppointmentStatus.BOOKED and not slot.is_booked:
+                    slot.mark_booked()
+                    self._remove_free(slot)
+                self._index_appointment(appt)
+            for doctor_id in {a.doctor_id for a in accepted}:
+                self._touch(doctor_id)
+        with self._changes_lock:
+            for patient_id in {a.patient_id for a in accepted}:
+                self._patient_versions[patient_id] = self.version
+        return len(accepted)
+    def publish_schedule(self, doctor_id: str, rule: RecurrenceRule, batch_size: int = 10000, skip_overlaps: bool = False) -> int:
+        return self.add_slots(rule.expand(doctor_id), batch_size, skip_overlaps)
+    @timed("appointments.get_doctor_slots")
     def get_doctor_slots(self, doctor_id: str, date: datetime | None = None) -> List[TimeSlot]:
-        res = [s for s in self.slots.values() if s.doctor_id == doctor_id]
-        if date:
-            res = [s for s in res if s.date.date() == date.date()]
-        return sorted(res, key=lambda s: (s.date, s.start_time))
+        with self._locks.for_key(doctor_id):
+            if date:
+                return self._slot_index.day(doctor_id, date.date())
+            return self._slot_index.all(doctor_id)
+    @timed("appointments.get_free_slots")
+    def get_free_slots(self, doctor_id: str, date: datetime | None = None) -> List[TimeSlot]:
+        with self._locks.for_key(doctor_id):
+            if date:
+                return self._free_index.day(doctor_id, date.date())
+            return self._free_index.all(doctor_id)
+    def iter_free_slots(self, doctor_id: str, start: datetime | None = None) -> Iterable[TimeSlot]:
+        return self._free_index.iter_slots(doctor_id, start.date() if start else None)
+    @timed("appointments.find_earliest_slots")
+    def find_earliest_slots(self, speciality: str | None = None, location: str | None = None, mode: str | None = None,
+                            date_from: datetime | None = None, date_to: datetime | None = None,
+                            time_from: time | None = None, time_to: time | None = None, limit: int = 10) -> List[Tuple[Doctor, TimeSlot]]:
+        now = datetime.now()
+        start = max(date_from, now) if date_from else now
+        end = date_to.date() if date_to else None
+        specs = [speciality.lower()] if speciality else list(self._specialities)
+        keys = [f"{s}|{location.lower()}" if location else f"{s}#{mode.lower()}" if mode else s for s in specs]
+        streams = [self._free_by_speciality.iter_window(k, start.date(), end, time_from, time_to) for k in keys]
+        stream = streams[0] if len(streams) == 1 else merge(*streams, key=lambda s: (s.date, s.start_time))
+        res = []
+        for slot in stream:
+            if slot.is_booked or (slot.date.date() == start.date() and slot.start_time < start.time()):
+                continue
+            doctor = self.doctors[slot.doctor_id]
+            if mode and doctor.consultation_mode.lower() != mode.lower():
+                continue
+            res.append((doctor, slot))
+            if len(res) == limit:
+                break
+        return res
+    @timed("appointments.book")
     def book(self, patient: Patient, doctor: Doctor, slot_id: str) -> Appointment:
         slot = self.slots.get(slot_id)
         if not slot or slot.doctor_id != doctor.id:
             raise ValueError("Invalid slot")
-        if slot.is_booked:
-            raise ValueError("Slot already booked")
-        appt = Appointment.create(patient.id, doctor.id, slot.slot_id)
-        slot.mark_booked()
-        self.appointments[appt.appointment_id] = appt
+        with self._locks.for_key(doctor.id):
+            if slot.is_booked:
+                raise ValueError("Slot already booked")
+            appt = Appointment.create(patient.id, doctor.id, slot.slot_id)
+            self.storage.save_booking(appt, slot)
+            slot.mark_booked()
+            self._remove_free(slot)
+            self._index_appointment(appt)
+            self._touch(doctor.id, patient.id)
         return appt
+    @timed("appointments.cancel")
     def cancel(self, appointment_id: str, patient: Patient):
         appt = self.appointments.get(appointment_id)
         if not appt or appt.patient_id != patient.id:
             raise ValueError("Appointment not found")
-        appt.cancel()
-        slot = self.slots.get(appt.slot_id)
-        if slot:
-            slot.mark_free()
-    def list_patient_appointments(self, patient: Patient) -> List[Appointment]:
-        return [a for a in self.appointments.values() if a.patient_id == patient.id]
+        with self._locks.for_key(appt.doctor_id):
+            if appt.status != AppointmentStatus.BOOKED:
+                raise ValueError("Appointment is not active")
+            slot = self.slots.get(appt.slot_id)
+            self.storage.save_cancellation(appt, slot)
+            appt.cancel()
+            self._release_holder(appt)
+            if slot and slot.is_booked:
+                slot.mark_free()
+                self._add_free(slot)
+            self._touch(appt.doctor_id, appt.patient_id)
+    @timed("appointments.complete")
+    def complete(self, appointment_id: str):
+        appt = self.appointments.get(appointment_id)
+        if not appt:
+            raise ValueError("Appointment not found")
+        with self._locks.for_key(appt.doctor_id):
+            if appt.status != AppointmentStatus.BOOKED:
+                raise ValueError("Appointment is not active")
+            self.storage.save_completion(appt)
+            appt.complete()
+            self._release_holder(appt)
+            self._touch(appt.doctor_id, appt.patient_id)
+    def _appointment_filter(self, statuses: Iterable[AppointmentStatus] | None, date_from: datetime | None, date_to: datetime | None):
+        if not statuses and not date_from and not date_to:
+            return None
+        statuses = set(statuses) if statuses else None
+        start = date_from.date() if date_from else None
+        end = date_to.date() if date_to else None
+        def match(appt: Appointment) -> bool:
+            if statuses and appt.status not in statuses:
+                return False
+            if start or end:
+                slot = self.slots.get(appt.slot_id)
+                if not slot:
+                    return False
+                day = slot.date.date()
+                if (start and day < start) or (end and day > end):
+                    return False
+            return True
+        return match
+    def list_patient_appointments(self, patient: Patient, statuses: Iterable[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None) -> List[Appointment]:
+        return list(self._patient_appts.iter(patient.id, self._appointment_filter(statuses, date_from, date_to)))
+    def page_patient_appointments(self, patient: Patient, statuses: Iterable[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None, cursor: int | None = None, limit: int = 20) -> AppointmentPage:
+        return self._patient_appts.page(patient.id, self._appointment_filter(statuses, date_from, date_to), cursor, limit)
+    def list_doctor_appointments(self, doctor: Doctor, statuses: Iterable[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None) -> List[Appointment]:
+        return list(self._doctor_appts.iter(doctor.id, self._appointment_filter(statuses, date_from, date_to)))
+    def page_doctor_appointments(self, doctor: Doctor, statuses: Iterable[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None, cursor: int | None = None, limit: int = 20) -> AppointmentPage:
+        return self._doctor_appts.page(doctor.id, self._appointment_filter(statuses, date_from, date_to), cursor, limit)
 
 class AIRecommendationService:
-    def __init__(self, appointment_service: AppointmentService):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("GEMINI_API_KEY not set")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+    def __init__(self, appointment_service: AppointmentService, client: GeminiClient | None = None, top_k: int | None = 20, model=None, local_parse_confidence: float = LOCAL_PARSE_CONFIDENCE):
+        if client is None:
+            client = GeminiClient(model) if model is not None else GeminiClient.from_env()
+        self.client = client
+        self.top_k = top_k
+        self.local_parse_confidence = local_parse_confidence
+        self.local_parses = 0
+        self.model_parses = 0
         self.appointment_service = appointment_service
+        self.context_cache = SlotContextCache(appointment_service)
     def _build_context(self, speciality: str | None = None) -> str:
-        doctors = self.appointment_service.list_doctors(speciality)
-        lines = []
-        for d in doctors:
-            slots = self.appointment_service.get_doctor_slots(d.id)
-            free_slots = [s for s in slots if not s.is_booked]
-            for s in free_slots:
-                lines.append(f"Doctor {d.name} ({d.speciality}), doctor_id={d.id}, slot_id={s.slot_id}, date={s.date.date()}, start={s.start_time}, end={s.end_time}")
-        return "\n".join(lines) or "No free slots."
+        return self.context_cache.get(speciality)
+    def context_cache_stats(self) -> Dict[str, float]:
+        return self.context_cache.stats()
+    @timed("ai.rank_candidates")
+    def rank_candidates(self, patient: Patient, speciality: Optional[str], urgency: str, constraints: Dict | None = None, k: int = 20) -> List[RankedSlot]:
+        svc = self.appointment_service
+        now = datetime.now()
+        return rank_slots(((d, svc.iter_free_slots(d.id, now)) for d in svc.list_doctors(speciality)), patient, urgency, constraints, k, now)
+    @timed("ai.recommend_slot")
     def recommend_slot(self, patient: Patient, speciality: Optional[str], urgency: str, constraints: Dict | None = None) -> Optional[Dict]:
         constraints = constraints or {}
-        context = self._build_context(speciality)
+        ranked = []
+        if self.top_k:
+            ranked = self.rank_candidates(patient, speciality, urgency, constraints, self.top_k)
+            if not ranked:
+                return None
+            context = "\n".join(r.line() for r in ranked)
+        else:
+            context = self._build_context(speciality)
         prompt = f"Patient: {patient.name}\nUrgency: {urgency}\nConstraints: {constraints}\nAvailable slots:\n{context}\nReturn JSON with doctor_id, slot_id, reason."
         try:
-            resp = self.model.generate_content(prompt)
-            text = resp.text.strip()
+            text = self.client.generate(prompt).strip()
             start, end = text.find("{"), text.rfind("}") + 1
-            return json.loads(text[start:end])
+            choice = json.loads(text[start:end])
+            if ranked and choice.get("slot_id") not in {r.slot.slot_id for r in ranked}:
+                raise ValueError("Model picked a slot outside the candidates")
+            return choice
         except:
-            return None
+            if not ranked:
+                return None
+            best = ranked[0]
+            return {"doctor_id": best.doctor.id, "slot_id": best.slot.slot_id, "reason": "Best local match (AI recommendation unavailable)"}
+    @timed("ai.parse_natural_query")
     def parse_natural_query(self, text: str) -> Dict:
-        prompt = f"Parse: \"{text}\"\nReturn JSON with speciality, urgency, preferred_time_of_day, date_hint (or null if missing)."
+        local = ParsedQuery()
         try:
-            resp = self.model.generate_content(prompt)
-            text_out = resp.text.strip()
+            local = parse_query(text, self.appointment_service.specialities())
+            if local.confidence >= self.local_parse_confidence:
+                self.local_parses += 1
+                return local.as_dict()
+            self.model_parses += 1
+            prompt = (f"Today is {datetime.now().date().isoformat()}.\nParse: \"{text}\"\n"
+                      "Return JSON with speciality, urgency (low, medium or high), preferred_time_of_day (morning, afternoon or evening) "
+                      "and date_hint (YYYY-MM-DD), using null for anything missing.")
+            text_out = self.client.generate(prompt).strip()
             start, end = text_out.find("{"), text_out.rfind("}") + 1
             return json.loads(text_out[start:end])
         except:
-            return {}
+            return {k: v for k, v in local.as_dict().items() if v}
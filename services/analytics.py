@@ -0,0 +1,186 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from models import Appointment, AppointmentStatus
+from services.metrics import timed
+
+STATUS_CODES = {AppointmentStatus.BOOKED: 0, AppointmentStatus.CANCELLED: 1, AppointmentStatus.COMPLETED: 2}
+BOOKED, CANCELLED, COMPLETED = 0, 1, 2
+
+def _minutes(dt: datetime) -> int:
+    return dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
+
+@lru_cache(maxsize=4096)
+def _utc_offset_minutes(hour: datetime) -> int:
+    return int(hour.replace(tzinfo=timezone.utc).astimezone().utcoffset().total_seconds()) // 60
+
+def _local_minutes(utc: datetime) -> int:
+    return _minutes(utc) + _utc_offset_minutes(utc.replace(minute=0, second=0, microsecond=0))
+
+class _Column:
+    def __init__(self, dtype):
+        self.data = np.zeros(1024, dtype)
+        self.size = 0
+    def extend(self, values: Iterable, count: int):
+        end = self.size + count
+        if end > len(self.data):
+            grown = np.zeros(max(end, 2 * len(self.data)), self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = np.fromiter(values, self.data.dtype, count)
+        self.size = end
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+@dataclass
+class AnalyticsReport:
+    version: int
+    doctor_ids: List[str]
+    slots_total: np.ndarray
+    slots_booked: np.ndarray
+    utilization: np.ndarray
+    specialities: List[str]
+    appointments: np.ndarray
+    cancellation_rate: np.ndarray
+    no_show_rate: np.ndarray
+    lead_time_hours: Dict[str, float]
+    heatmap: np.ndarray
+    def top_utilized(self, n: int = 10) -> List[tuple]:
+        order = np.argsort(-self.utilization, kind="stable")[:n]
+        return [(self.doctor_ids[i], float(self.utilization[i]), int(self.slots_booked[i]), int(self.slots_total[i])) for i in order]
+    def by_speciality(self) -> Dict[str, Dict[str, float]]:
+        return {spec: {"appointments": int(self.appointments[i]), "cancellation_rate": float(self.cancellation_rate[i]),
+                       "no_show_rate": float(self.no_show_rate[i])} for i, spec in enumerate(self.specialities)}
+
+class AnalyticsEngine:
+    def __init__(self, appointment_service):
+        self.appointment_service = appointment_service
+        self._lock = threading.Lock()
+        self._report: Optional[AnalyticsReport] = None
+        self._version = 0
+        self.hits = self.patches = self.rebuilds = 0
+        self._reset()
+    def _reset(self):
+        self._doctor_codes: Dict[str, int] = {}
+        self._doctor_ids: List[str] = []
+        self._spec_codes: Dict[str, int] = {}
+        self._specialities: List[str] = []
+        self._doctor_spec = _Column(np.int32)
+        self._slots_total = _Column(np.int64)
+        self._slots_booked = _Column(np.int64)
+        self._appt_rows: Dict[str, int] = {}
+        self._appt_doctor = _Column(np.int32)
+        self._appt_status = _Column(np.int8)
+        self._appt_start = _Column(np.int64)
+        self._appt_created = _Column(np.int64)
+    def _doctor_code(self, doctor_id: str) -> int:
+        code = self._doctor_codes.get(doctor_id)
+        if code is None:
+            doctor = self.appointment_service.doctors.get(doctor_id)
+            spec = doctor.speciality if doctor else ""
+            spec_code = self._spec_codes.setdefault(spec.lower(), len(self._spec_codes))
+            if spec_code == len(self._specialities):
+                self._specialities.append(spec)
+            code = self._doctor_codes[doctor_id] = len(self._doctor_ids)
+            self._doctor_ids.append(doctor_id)
+            self._doctor_spec.extend((spec_code,), 1)
+            self._slots_total.extend((0,), 1)
+            self._slots_booked.extend((0,), 1)
+        return code
+    def _count_slots(self, doctor_id: str):
+        code = self._doctor_code(doctor_id)
+        svc = self.appointment_service
+        total = svc._slot_index.count(doctor_id)
+        self._slots_total.data[code] = total
+        self._slots_booked.data[code] = total - svc._free_index.count(doctor_id)
+    def _append_appointments(self, appts: List[Appointment]):
+        slots, codes, minutes = self.appointment_service.slots, self._doctor_codes, {}
+        for doctor_id in {a.doctor_id for a in appts}.difference(codes):
+            self._doctor_code(doctor_id)
+        def start(appt: Appointment) -> int:
+            slot = slots.get(appt.slot_id)
+            if not slot:
+                return _local_minutes(appt.created_at)
+            key = (slot.date, slot.start_time)
+            value = minutes.get(key)
+            if value is None:
+                value = minutes[key] = slot.date.toordinal() * 1440 + slot.start_time.hour * 60 + slot.start_time.minute
+            return value
+        base = self._appt_status.size
+        self._appt_rows.update(zip((a.appointment_id for a in appts), range(base, base + len(appts))))
+        self._appt_doctor.extend((codes[a.doctor_id] for a in appts), len(appts))
+        self._appt_status.extend((STATUS_CODES[a.status] for a in appts), len(appts))
+        self._appt_start.extend(map(start, appts), len(appts))
+        self._appt_created.extend((_local_minutes(a.created_at) for a in appts), len(appts))
+    def _new_appointments(self) -> List[Appointment]:
+        appointments = self.appointment_service.appointments
+        while True:
+            try:
+                return list(islice(appointments.values(), len(self._appt_rows), None))
+            except RuntimeError:
+                continue
+    def _rebuild(self):
+        self._reset()
+        for doctor_id in list(self.appointment_service.doctors):
+            self._count_slots(doctor_id)
+        appts = self._new_appointments()
+        for i in range(0, len(appts), 100000):
+            self._append_appointments(appts[i:i + 100000])
+    def _patch(self, changed: Iterable[str]):
+        self._append_appointments(self._new_appointments())
+        status = self._appt_status.data
+        for doctor_id in changed:
+            self._count_slots(doctor_id)
+            doctor = self.appointment_service.doctors.get(doctor_id)
+            if doctor:
+                for appt in self.appointment_service.list_doctor_appointments(doctor):
+                    row = self._appt_rows.get(appt.appointment_id)
+                    if row is not None:
+                        status[row] = STATUS_CODES[appt.status]
+    @timed("analytics.report")
+    def report(self, now: datetime | None = None) -> AnalyticsReport:
+        with self._lock:
+            version = self.appointment_service.version
+            if self._report and version == self._version and now is None:
+                self.hits += 1
+                return self._report
+            changed = self.appointment_service.changes_since(self._version) if self._report else None
+            if changed is None:
+                self.rebuilds += 1
+                self._rebuild()
+            elif changed:
+                self.patches += 1
+                self._patch(changed)
+            self._version = version
+            self._report = self._compute(version, now or datetime.now())
+            return self._report
+    def _compute(self, version: int, now: datetime) -> AnalyticsReport:
+        total, booked = self._slots_total.view(), self._slots_booked.view()
+        utilization = np.divide(booked, total, out=np.zeros(len(total)), where=total > 0)
+        n_spec = len(self._specialities)
+        status, start = self._appt_status.view(), self._appt_start.view()
+        spec = self._doctor_spec.view()[self._appt_doctor.view()]
+        appointments = np.bincount(spec, minlength=n_spec)
+        cancelled = np.bincount(spec[status == CANCELLED], minlength=n_spec)
+        cancellation_rate = np.divide(cancelled, appointments, out=np.zeros(n_spec), where=appointments > 0)
+        due = (start < _minutes(now)) & (status != CANCELLED)
+        due_count = np.bincount(spec[due], minlength=n_spec)
+        missed = np.bincount(spec[due & (status == BOOKED)], minlength=n_spec)
+        no_show_rate = np.divide(missed, due_count, out=np.zeros(n_spec), where=due_count > 0)
+        active = status != CANCELLED
+        lead = (start[active] - self._appt_created.view()[active]) / 60.0
+        lead_time_hours = {}
+        if len(lead):
+            p50, p90 = np.percentile(lead, (50, 90))
+            lead_time_hours = {"mean": float(lead.mean()), "p50": float(p50), "p90": float(p90)}
+        minutes = start[active]
+        cell = ((minutes // 1440 - 1) % 7) * 24 + (minutes % 1440) // 60
+        heatmap = np.bincount(cell, minlength=168).reshape(7, 24)
+        return AnalyticsReport(version, list(self._doctor_ids), total.copy(), booked.copy(), utilization, list(self._specialities),
+                               appointments, cancellation_rate, no_show_rate, lead_time_hours, heatmap)
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "patches": self.patches, "rebuilds": self.rebuilds, "appointments": self._appt_status.size}
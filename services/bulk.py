@@ -0,0 +1,241 @@
+import argparse
+import csv
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import datetime, time
+from itertools import count
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from models import Doctor, TimeSlot, Appointment, AppointmentStatus, UserRole
+from services import AuthService, AppointmentService
+from storage import Storage, SQLiteStorage
+
+DOCTOR_FIELDS = ("id", "name", "email", "password_hash", "speciality", "experience_years", "location", "consultation_mode")
+SLOT_FIELDS = ("slot_id", "doctor_id", "date", "start_time", "end_time", "is_booked")
+APPOINTMENT_FIELDS = ("appointment_id", "patient_id", "doctor_id", "slot_id", "status", "created_at")
+DISABLED_PASSWORD = "!"
+MAX_ERRORS = 100
+_parse_day = lru_cache(4096)(datetime.fromisoformat)
+_parse_time = lru_cache(4096)(time.fromisoformat)
+
+@dataclass
+class ImportReport:
+    kind: str
+    rows: int = 0
+    imported: int = 0
+    rejected: int = 0
+    errors: List[str] = field(default_factory=list)
+    def reject(self, line: int | None, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"row {line}: {error}" if line else error)
+
+def _is_parquet(path: str) -> bool:
+    return path.endswith((".parquet", ".pq"))
+
+def read_batches(path: str, batch_size: int = 10000) -> Iterator[List[Dict[str, str]]]:
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size):
+            yield batch.to_pylist()
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        batch = []
+        for row in reader:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def write_rows(path: str, fields: tuple, rows: Iterable[tuple], batch_size: int = 10000) -> int:
+    written = 0
+    batch: List[tuple] = []
+    if _is_parquet(path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([(name, pa.string()) for name in fields])
+        with pq.ParquetWriter(path, schema) as writer:
+            for row in rows:
+                batch.append(row)
+                if len(batch) == batch_size:
+                    writer.write_table(pa.Table.from_pylist([dict(zip(fields, map(_text, r))) for r in batch], schema))
+                    written += len(batch)
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist([dict(zip(fields, map(_text, r))) for r in batch], schema))
+                written += len(batch)
+        return written
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                writer.writerows(batch)
+                written += len(batch)
+                batch = []
+        writer.writerows(batch)
+        written += len(batch)
+    return written
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+def _required(row: Dict[str, str], name: str) -> str:
+    value = (row.get(name) or "").strip()
+    if not value:
+        raise ValueError(f"missing {name}")
+    return value
+
+def _id_factory() -> Callable[[], str]:
+    prefix, n = uuid.uuid4().hex[:12], count()
+    return lambda: f"{prefix}-{next(n)}"
+
+def parse_doctor(row: Dict[str, str], new_id: Callable[[], str]) -> Doctor:
+    email = _required(row, "email").lower()
+    if "@" not in email:
+        raise ValueError(f"invalid email {email!r}")
+    experience = int(row.get("experience_years") or 0)
+    if experience < 0:
+        raise ValueError("experience_years must not be negative")
+    return Doctor((row.get("id") or "").strip() or new_id(), _required(row, "name"), email,
+                  (row.get("password_hash") or "").strip() or DISABLED_PASSWORD, UserRole.DOCTOR,
+                  speciality=_required(row, "speciality"), experience_years=experience,
+                  location=(row.get("location") or "").strip(), consultation_mode=(row.get("consultation_mode") or "").strip() or "In-person")
+
+def parse_slot(row: Dict[str, str], new_id: Callable[[], str]) -> TimeSlot:
+    start, end = _parse_time(_required(row, "start_time")), _parse_time(_required(row, "end_time"))
+    if start >= end:
+        raise ValueError("start_time must be before end_time")
+    return TimeSlot((row.get("slot_id") or "").strip() or new_id(), _required(row, "doctor_id"),
+                    _parse_day(_required(row, "date")), start, end, (row.get("is_booked") or "0").strip().lower() in ("1", "true"))
+
+def parse_appointment(row: Dict[str, str], new_id: Callable[[], str]) -> Appointment:
+    created = (row.get("created_at") or "").strip()
+    return Appointment((row.get("appointment_id") or "").strip() or new_id(), _required(row, "patient_id"), _required(row, "doctor_id"),
+                       _required(row, "slot_id"), AppointmentStatus((row.get("status") or "BOOKED").strip().upper()),
+                       datetime.fromisoformat(created) if created else datetime.utcnow())
+
+def _parse_batch(batch: List[Dict[str, str]], parse, new_id, report: ImportReport, strict: bool) -> List[Tuple[int, object]]:
+    parsed = []
+    for row in batch:
+        report.rows += 1
+        try:
+            parsed.append((report.rows, parse(row, new_id)))
+        except (ValueError, TypeError) as e:
+            if strict:
+                raise ValueError(f"{report.kind} row {report.rows}: {e}") from e
+            report.reject(report.rows, str(e))
+    return parsed
+
+def _reject_all(report: ImportReport, lines: Dict[int, int], errors: List[tuple]):
+    for record, error in errors:
+        report.reject(lines[id(record)], error)
+
+def import_doctors(auth: AuthService, appts: AppointmentService, path: str, batch_size: int = 10000, strict: bool = True) -> ImportReport:
+    report, new_id = ImportReport("doctors"), _id_factory()
+    for batch in read_batches(path, batch_size):
+        parsed = _parse_batch(batch, parse_doctor, new_id, report, strict)
+        if not strict:
+            emails, ids = set(), set()
+            keep = []
+            for line, doctor in parsed:
+                if doctor.email in emails or auth.find_user(doctor.email):
+                    report.reject(line, f"email already in use: {doctor.email}")
+                    continue
+                if doctor.id in ids or auth.find_user_by_id(doctor.id):
+                    report.reject(line, f"id already in use: {doctor.id}")
+                    continue
+                emails.add(doctor.email)
+                ids.add(doctor.id)
+                keep.append((line, doctor))
+            parsed = keep
+        doctors = [doctor for _, doctor in parsed]
+        auth.add_users(doctors)
+        appts.add_doctors(doctors)
+        report.imported += len(doctors)
+    return report
+
+def import_slots(appts: AppointmentService, path: str, batch_size: int = 10000, strict: bool = True) -> ImportReport:
+    report, new_id = ImportReport("slots"), _id_factory()
+    for batch in read_batches(path, batch_size):
+        parsed = _parse_batch(batch, parse_slot, new_id, report, strict)
+        slots = []
+        for line, slot in parsed:
+            if slot.doctor_id in appts.doctors:
+                slots.append(slot)
+            elif strict:
+                raise ValueError(f"slots row {line}: unknown doctor {slot.doctor_id}")
+            else:
+                report.reject(line, f"unknown doctor {slot.doctor_id}")
+        overlaps: List[Tuple[TimeSlot, str]] = []
+        report.imported += appts.add_slots(slots, batch_size, skip_overlaps=not strict, errors=overlaps)
+        _reject_all(report, {id(slot): line for line, slot in parsed}, overlaps)
+    return report
+
+def import_appointments(appts: AppointmentService, path: str, batch_size: int = 10000, strict: bool = True) -> ImportReport:
+    report, new_id = ImportReport("appointments"), _id_factory()
+    for batch in read_batches(path, batch_size):
+        parsed = _parse_batch(batch, parse_appointment, new_id, report, strict)
+        conflicts: List[Tuple[Appointment, str]] = []
+        report.imported += appts.add_appointments([appt for _, appt in parsed], batch_size, skip_conflicts=not strict, errors=conflicts)
+        _reject_all(report, {id(appt): line for line, appt in parsed}, conflicts)
+    return report
+
+def export_doctors(appts: AppointmentService, path: str, batch_size: int = 10000) -> int:
+    rows = ((d.id, d.name, d.email, d.password_hash, d.speciality, d.experience_years, d.location, d.consultation_mode)
+            for d in appts.doctors.values())
+    return write_rows(path, DOCTOR_FIELDS, rows, batch_size)
+
+def export_slots(appts: AppointmentService, path: str, batch_size: int = 10000) -> int:
+    rows = ((s.slot_id, s.doctor_id, s.date.isoformat(), s.start_time.isoformat(), s.end_time.isoformat(), int(s.is_booked))
+            for s in appts.slots.values())
+    return write_rows(path, SLOT_FIELDS, rows, batch_size)
+
+def export_appointments(appts: AppointmentService, path: str, batch_size: int = 10000) -> int:
+    rows = ((a.appointment_id, a.patient_id, a.doctor_id, a.slot_id, a.status.value, a.created_at.isoformat())
+            for a in appts.appointments.values())
+    return write_rows(path, APPOINTMENT_FIELDS, rows, batch_size)
+
+def open_services(storage: Storage) -> tuple:
+    auth = AuthService(storage)
+    appts = AppointmentService(storage)
+    appts.add_doctors(u for u in auth.users() if isinstance(u, Doctor))
+    return auth, appts
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m services.bulk", description="Bulk import/export of doctors, slots and appointments (CSV or Parquet)")
+    ap.add_argument("action", choices=("import", "export"))
+    ap.add_argument("kind", choices=("doctors", "slots", "appointments"))
+    ap.add_argument("path")
+    ap.add_argument("--db", default="medibook.sqlite3", help="SQLite database to load into or export from")
+    ap.add_argument("--batch-size", type=int, default=10000)
+    ap.add_argument("--skip-invalid", action="store_true", help="reject bad rows instead of aborting the import")
+    args = ap.parse_args(argv)
+    storage = SQLiteStorage(args.db)
+    try:
+        auth, appts = open_services(storage)
+        if args.action == "export":
+            export = {"doctors": export_doctors, "slots": export_slots, "appointments": export_appointments}[args.kind]
+            print(f"exported {export(appts, args.path, args.batch_size)} {args.kind}")
+            return
+        strict = not args.skip_invalid
+        if args.kind == "doctors":
+            report = import_doctors(auth, appts, args.path, args.batch_size, strict)
+        elif args.kind == "slots":
+            report = import_slots(appts, args.path, args.batch_size, strict)
+        else:
+            report = import_appointments(appts, args.path, args.batch_size, strict)
+        print(f"{report.kind}: {report.rows} rows, {report.imported} imported, {report.rejected} rejected")
+        for error in report.errors:
+            print(f"  {error}")
+    except ValueError as e:
+        ap.exit(1, f"error: {e}\n")
+    finally:
+        storage.close()
+
+if __name__ == "__main__":
+    main()
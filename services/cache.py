@@ -0,0 +1,33 @@
+import threading
+import time as _time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class TTLCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < _time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (_time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    def pop(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,52 @@
+import threading
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, List, Optional
+from models import Doctor
+
+@dataclass
+class _ContextEntry:
+    version: int
+    lines: Dict[str, List[str]]
+    text: str
+
+class SlotContextCache:
+    def __init__(self, appointment_service):
+        self.appointment_service = appointment_service
+        self._entries: Dict[Optional[str], _ContextEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.patches = 0
+        self.rebuilds = 0
+    def _doctor_lines(self, d: Doctor) -> List[str]:
+        return [f"Doctor {d.name} ({d.speciality}), doctor_id={d.id}, slot_id={s.slot_id}, date={s.date.date()}, start={s.start_time}, end={s.end_time}"
+                for s in self.appointment_service.get_free_slots(d.id)]
+    def _matches(self, d: Doctor, key: Optional[str]) -> bool:
+        return key is None or d.speciality.lower() == key
+    def get(self, speciality: str | None = None) -> str:
+        key = speciality.lower() if speciality else None
+        with self._lock:
+            version = self.appointment_service.version
+            entry = self._entries.get(key)
+            if entry and entry.version == version:
+                self.hits += 1
+                return entry.text
+            changed = self.appointment_service.changes_since(entry.version) if entry else None
+            if changed is None:
+                self.rebuilds += 1
+                lines = {d.id: self._doctor_lines(d) for d in self.appointment_service.list_doctors(speciality)}
+            else:
+                self.patches += 1
+                lines = entry.lines
+                for doctor_id in changed:
+                    d = self.appointment_service.doctors.get(doctor_id)
+                    if d and self._matches(d, key):
+                        lines[doctor_id] = self._doctor_lines(d)
+                    else:
+                        lines.pop(doctor_id, None)
+            entry = _ContextEntry(version, lines, "\n".join(chain.from_iterable(lines.values())) or "No free slots.")
+            self._entries[key] = entry
+            return entry.text
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.patches + self.rebuilds
+        return {"hits": self.hits, "patches": self.patches, "rebuilds": self.rebuilds, "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import threading
+import time as _time
+from collections import deque
+from typing import Dict, Optional
+from services.cache import TTLCache
+from services.metrics import timed
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split()).casefold()
+
+class GeminiClient:
+    def __init__(self, model, timeout: float = 20.0, max_concurrency: int = 4, retries: int = 2, backoff: float = 0.5,
+                 cache_size: int = 256, cache_ttl: float = 600.0, latency_window: int = 1000):
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=latency_window)
+        self.calls = self.cache_hits = self.cache_misses = self.coalesced = self.errors = self.timeouts = self.retried = 0
+    @classmethod
+    def from_env(cls, model_name: str = "gemini-2.5-flash", api_key: str | None = None, **kwargs) -> "GeminiClient":
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY not set")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return cls(genai.GenerativeModel(model_name), **kwargs)
+    async def _call(self, prompt: str) -> str:
+        if hasattr(self.model, "generate_content_async"):
+            resp = await self.model.generate_content_async(prompt)
+        else:
+            resp = await asyncio.to_thread(self.model.generate_content, prompt)
+        return resp.text
+    def _count(self, **deltas: int):
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+    async def agenerate(self, prompt: str, use_cache: bool = True) -> str:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._agenerate(prompt, use_cache), self._ensure_loop()))
+    @timed("gemini.generate")
+    async def _agenerate(self, prompt: str, use_cache: bool = True) -> str:
+        key = normalize_prompt(prompt)
+        self._count(calls=1)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(cache_hits=1)
+                return cached
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self._count(coalesced=1)
+                return await asyncio.shield(pending)
+            self._count(cache_misses=1)
+            pending = self._inflight[key] = asyncio.ensure_future(self._generate(prompt, key))
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return await asyncio.shield(pending)
+        return await self._generate(prompt, None)
+    async def _generate(self, prompt: str, key: Optional[str]) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                t0 = _time.perf_counter()
+                try:
+                    text = await asyncio.wait_for(self._call(prompt), self.timeout)
+                except asyncio.TimeoutError:
+                    self._count(timeouts=1)
+                    if attempt == self.retries:
+                        self._count(errors=1)
+                        raise
+                except Exception:
+                    if attempt == self.retries:
+                        self._count(errors=1)
+                        raise
+                else:
+                    with self._stats_lock:
+                        self._latencies.append(_time.perf_counter() - t0)
+                    if key is not None:
+                        self.cache.put(key, text)
+                    return text
+                self._count(retried=1)
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="gemini-client", daemon=True)
+                self._thread.start()
+            return self._loop
+    def generate(self, prompt: str, use_cache: bool = True) -> str:
+        future = asyncio.run_coroutine_threadsafe(self._agenerate(prompt, use_cache), self._ensure_loop())
+        return future.result()
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            lat = sorted(self._latencies)
+            stats = {"calls": self.calls, "cache_hits": self.cache_hits, "cache_misses": self.cache_misses, "coalesced": self.coalesced,
+                     "errors": self.errors, "timeouts": self.timeouts, "retries": self.retried}
+        for name, q in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            stats[name] = lat[min(int(q * len(lat)), len(lat) - 1)] * 1e3 if lat else 0.0
+        return stats
+    def close(self):
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+                self._loop = None
+                self._semaphore = None
+                self._inflight.clear()
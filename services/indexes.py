@@ -0,0 +1,187 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from operator import attrgetter
+from datetime import date, time
+from typing import Callable, Dict, Iterator, List, Optional
+from models import TimeSlot, Appointment
+
+_slot_key = attrgetter("start_time", "slot_id")
+
+class SlotIndex:
+    def __init__(self):
+        self._days: Dict[str, Dict[date, List[TimeSlot]]] = {}
+        self._day_order: Dict[str, List[date]] = {}
+    def add(self, key: str, slot: TimeSlot):
+        day = slot.date.date()
+        days = self._days.setdefault(key, {})
+        bucket = days.get(day)
+        if bucket is None:
+            bucket = days[day] = []
+            insort(self._day_order.setdefault(key, []), day)
+        insort(bucket, slot, key=_slot_key)
+    def extend_day(self, key: str, day: date, slots: List[TimeSlot]):
+        if not slots:
+            return
+        days = self._days.setdefault(key, {})
+        bucket = days.get(day)
+        if bucket is None:
+            days[day] = sorted(slots, key=_slot_key)
+            insort(self._day_order.setdefault(key, []), day)
+        elif len(slots) * 8 < len(bucket):
+            for slot in slots:
+                insort(bucket, slot, key=_slot_key)
+        else:
+            bucket.extend(slots)
+            bucket.sort(key=_slot_key)
+    def has_day(self, key: str, day: date) -> bool:
+        return day in self._days.get(key, ())
+    def overlapping(self, key: str, slot: TimeSlot) -> Optional[TimeSlot]:
+        bucket = self._days.get(key, {}).get(slot.date.date())
+        if not bucket:
+            return None
+        i = bisect_left(bucket, (slot.start_time, ""), key=_slot_key)
+        for other in bucket[max(i - 1, 0):i + 1]:
+            if other.start_time < slot.end_time and slot.start_time < other.end_time:
+                return other
+        return None
+    def remove(self, key: str, slot: TimeSlot) -> bool:
+        day = slot.date.date()
+        bucket = self._days.get(key, {}).get(day)
+        if not bucket:
+            return False
+        i = bisect_left(bucket, _slot_key(slot), key=_slot_key)
+        if i == len(bucket) or bucket[i] is not slot:
+            return False
+        del bucket[i]
+        if not bucket:
+            del self._days[key][day]
+            order = self._day_order[key]
+            del order[bisect_left(order, day)]
+        return True
+    def day(self, key: str, day: date) -> List[TimeSlot]:
+        return list(self._days.get(key, {}).get(day, ()))
+    def iter_slots(self, key: str, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[TimeSlot]:
+        days = self._days.get(key)
+        if not days:
+            return
+        order = self._day_order[key]
+        i = bisect_left(order, start) if start else 0
+        for day in order[i:]:
+            if end and day > end:
+                break
+            yield from days.get(day, ())
+    def all(self, key: str) -> List[TimeSlot]:
+        return list(self.iter_slots(key))
+    def count(self, key: str) -> int:
+        return sum(len(b) for b in self._days.get(key, {}).values())
+
+@dataclass
+class AppointmentPage:
+    items: List[Appointment]
+    next_cursor: Optional[int] = None
+
+class AppointmentIndex:
+    def __init__(self):
+        self._by_key: Dict[str, List[Appointment]] = {}
+    def add(self, key: str, appt: Appointment):
+        self._by_key.setdefault(key, []).append(appt)
+    def count(self, key: str) -> int:
+        return len(self._by_key.get(key, ()))
+    def iter(self, key: str, predicate: Optional[Callable[[Appointment], bool]] = None) -> Iterator[Appointment]:
+        for appt in self._by_key.get(key, ()):
+            if predicate is None or predicate(appt):
+                yield appt
+    def iter_newest(self, key: str, predicate: Optional[Callable[[Appointment], bool]] = None) -> Iterator[Appointment]:
+        for appt in reversed(self._by_key.get(key, ())):
+            if predicate is None or predicate(appt):
+                yield appt
+    def page(self, key: str, predicate: Optional[Callable[[Appointment], bool]] = None, cursor: Optional[int] = None, limit: int = 20) -> AppointmentPage:
+        appts = self._by_key.get(key, [])
+        i = len(appts) - 1 if cursor is None else min(cursor, len(appts) - 1)
+        items = []
+        while i >= 0 and len(items) < limit:
+            appt = appts[i]
+            i -= 1
+            if predicate is None or predicate(appt):
+                items.append(appt)
+        return AppointmentPage(items, i if i >= 0 else None)
+
+class SlotTimeIndex:
+    def __init__(self):
+        self._days: Dict[str, Dict[date, Dict[time, Dict[str, TimeSlot]]]] = {}
+        self._day_order: Dict[str, List[date]] = {}
+        self._time_order: Dict[tuple, List[time]] = {}
+    def add(self, key: str, slot: TimeSlot):
+        day = slot.date.date()
+        days = self._days.setdefault(key, {})
+        times = days.get(day)
+        if times is None:
+            times = days[day] = {}
+            insort(self._day_order.setdefault(key, []), day)
+        group = times.get(slot.start_time)
+        if group is None:
+            group = times[slot.start_time] = {}
+            insort(self._time_order.setdefault((key, day), []), slot.start_time)
+        group[slot.slot_id] = slot
+    def extend(self, key: str, day: date, slots: List[TimeSlot]):
+        if not slots:
+            return
+        days = self._days.setdefault(key, {})
+        times = days.get(day)
+        if times is None:
+            times = days[day] = {}
+            for slot in slots:
+                group = times.get(slot.start_time)
+                if group is None:
+                    times[slot.start_time] = {slot.slot_id: slot}
+                else:
+                    group[slot.slot_id] = slot
+            insort(self._day_order.setdefault(key, []), day)
+            self._time_order[(key, day)] = sorted(times)
+            return
+        added = []
+        for slot in slots:
+            group = times.get(slot.start_time)
+            if group is None:
+                group = times[slot.start_time] = {}
+                added.append(slot.start_time)
+            group[slot.slot_id] = slot
+        if added:
+            order = self._time_order.setdefault((key, day), [])
+            order.extend(added)
+            order.sort()
+    def remove(self, key: str, slot: TimeSlot) -> bool:
+        day = slot.date.date()
+        times = self._days.get(key, {}).get(day)
+        group = times.get(slot.start_time) if times else None
+        if not group or group.pop(slot.slot_id, None) is None:
+            return False
+        if not group:
+            del times[slot.start_time]
+            order = self._time_order[(key, day)]
+            del order[bisect_left(order, slot.start_time)]
+            if not times:
+                del self._days[key][day]
+                del self._time_order[(key, day)]
+                order = self._day_order[key]
+                del order[bisect_left(order, day)]
+        return True
+    def iter_window(self, key: str, start: Optional[date] = None, end: Optional[date] = None,
+                    time_from: Optional[time] = None, time_to: Optional[time] = None) -> Iterator[TimeSlot]:
+        days = self._days.get(key)
+        if not days:
+            return
+        order = self._day_order.get(key, [])
+        for day in order[bisect_left(order, start) if start else 0:]:
+            if end and day > end:
+                break
+            times = days.get(day)
+            if not times:
+                continue
+            starts = self._time_order.get((key, day), [])
+            for start_time in starts[bisect_left(starts, time_from) if time_from else 0:]:
+                if time_to and start_time >= time_to:
+                    break
+                group = times.get(start_time)
+                if group:
+                    yield from list(group.values())
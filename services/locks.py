@@ -0,0 +1,10 @@
+import threading
+from typing import Iterable, List
+
+class StripedLock:
+    def __init__(self, stripes: int = 64):
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+    def for_key(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+    def for_keys(self, keys: Iterable[str]) -> List[threading.Lock]:
+        return [self._locks[i] for i in sorted({hash(key) % len(self._locks) for key in keys})]
@@ -0,0 +1,180 @@
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time as _time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _bucket_value(index: int) -> int:
+    shift, mantissa = divmod(index, SUB_BUCKETS)
+    if not shift:
+        return mantissa
+    return (mantissa << shift) + (1 << (shift - 1))
+
+class Histogram:
+    def __init__(self):
+        self._counts: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+    def clear(self):
+        with self._lock:
+            self._counts = defaultdict(int)
+            self.count = self.total = self.max = 0
+            self.min = None
+    def record(self, value_ns: int):
+        if value_ns < SUB_BUCKETS:
+            index = value_ns
+        else:
+            shift = value_ns.bit_length() - SUB_BUCKET_BITS
+            index = shift * SUB_BUCKETS + (value_ns >> shift)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value_ns
+            if value_ns > self.max:
+                self.max = value_ns
+            if self.min is None or value_ns < self.min:
+                self.min = value_ns
+    def quantiles(self, qs=QUANTILES) -> List[int]:
+        with self._lock:
+            buckets = sorted(self._counts.items())
+            count = self.count
+        res, seen, i = [], 0, 0
+        for q in qs:
+            target = max(1, round(q * count))
+            while i < len(buckets) and seen + buckets[i][1] < target:
+                seen += buckets[i][1]
+                i += 1
+            res.append(min(_bucket_value(buckets[i][0]), self.max) if i < len(buckets) else self.max)
+        return res
+    def snapshot(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        p50, p95, p99 = self.quantiles()
+        return {"count": self.count, "mean_ms": self.total / self.count / 1e6, "min_ms": self.min / 1e6, "max_ms": self.max / 1e6,
+                "p50_ms": p50 / 1e6, "p95_ms": p95 / 1e6, "p99_ms": p99 / 1e6}
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, max_depth: int = 32):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+    def reset(self):
+        self.samples = Counter()
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+    def top(self, n: int = 20) -> List[tuple]:
+        leaves = Counter()
+        for stack, count in list(self.samples.items()):
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in list(self.samples.items()))
+
+class Metrics:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.profiler = SamplingProfiler()
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+    def histogram(self, name: str) -> Histogram:
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram())
+        return hist
+    def record(self, name: str, value_ns: int):
+        self.histogram(name).record(value_ns)
+    @contextmanager
+    def timer(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = _time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(_time.perf_counter_ns() - start)
+    def timed(self, name: str):
+        def decorate(fn):
+            hist = self.histogram(name)
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    start = _time.perf_counter_ns()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        hist.record(_time.perf_counter_ns() - start)
+                return async_wrapper
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = _time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.record(_time.perf_counter_ns() - start)
+            return wrapper
+        return decorate
+    def reset(self):
+        for hist in list(self._histograms.values()):
+            hist.clear()
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: hist.snapshot() for name, hist in sorted(self._histograms.items()) if hist.count}
+    def to_json(self) -> str:
+        return json.dumps({"enabled": self.enabled, "timestamp": _time.time(), "metrics": self.snapshot()}, indent=2)
+    def to_prometheus(self, prefix: str = "medibook") -> str:
+        lines = [f"# TYPE {prefix}_latency_seconds summary"]
+        for name, hist in sorted(self._histograms.items()):
+            if not hist.count:
+                continue
+            label = f'op="{name}"'
+            for q, value in zip(QUANTILES, hist.quantiles()):
+                lines.append(f'{prefix}_latency_seconds{{{label},quantile="{q}"}} {value / 1e9:.9f}')
+            lines.append(f"{prefix}_latency_seconds_sum{{{label}}} {hist.total / 1e9:.9f}")
+            lines.append(f"{prefix}_latency_seconds_count{{{label}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics(enabled=os.getenv("MEDIBOOK_METRICS", "") not in ("", "0"))
+timed = METRICS.timed
+timer = METRICS.timer
@@ -0,0 +1,47 @@
+import secrets
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from models import SCRYPT_COST, hash_password, verify_password, needs_rehash
+from services.cache import TTLCache
+
+class PasswordHasher:
+    def __init__(self, cost: tuple = SCRYPT_COST, max_workers: int = 2, max_pending: int = 64, processes: bool = False):
+        self.cost = cost
+        self.max_workers = max_workers
+        self._executor: Executor = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(max_workers)
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self.hashes = self.verifies = self.rehashes = 0
+    def _run(self, fn, *args):
+        with self._pending:
+            return self._executor.submit(fn, *args).result()
+    def hash(self, password: str) -> str:
+        self.hashes += 1
+        return self._run(hash_password, password, self.cost)
+    def verify(self, password: str, stored: str) -> bool:
+        self.verifies += 1
+        return self._run(verify_password, password, stored)
+    def needs_rehash(self, stored: str) -> bool:
+        return needs_rehash(stored, self.cost)
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+class SessionCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 900.0):
+        self._tokens = TTLCache(maxsize, ttl)
+        self.hits = self.misses = 0
+    def issue(self, user_id: str) -> str:
+        token = secrets.token_urlsafe(32)
+        self._tokens.put(token, user_id)
+        return token
+    def resolve(self, token: str) -> Optional[str]:
+        user_id = self._tokens.get(token)
+        if user_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user_id
+    def revoke(self, token: str):
+        self._tokens.pop(token)
+    def __len__(self) -> int:
+        return len(self._tokens)
@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+SPECIALITY_SYNONYMS = {
+    "Cardiology": ("cardiolog", ["cardiologist", "cardiology", "cardiac", "heart", "chest pain", "palpitations", "blood pressure", "hypertension"]),
+    "Neurology": ("neurolog", ["neurologist", "neurology", "migraine", "seizure", "seizures", "stroke", "numbness", "nerve"]),
+    "Dermatology": ("dermatolog", ["dermatologist", "dermatology", "skin", "rash", "acne", "eczema", "mole"]),
+    "Orthopedics": ("orthop", ["orthopedist", "orthopaedist", "orthopedic", "orthopedics", "bone", "fracture", "knee", "back pain", "joint", "sprain"]),
+    "Pediatrics": ("pediatric", ["pediatrician", "paediatrician", "pediatrics", "child", "kid", "baby", "infant", "son", "daughter"]),
+    "Oncology": ("oncolog", ["oncologist", "oncology", "cancer", "tumor", "tumour", "chemo"]),
+    "Pulmonology": ("pulmonolog", ["pulmonologist", "pulmonology", "lung", "lungs", "asthma", "breathing", "cough"]),
+    "Gastroenterology": ("gastroenterolog", ["gastroenterologist", "gastroenterology", "stomach", "digestion", "acid reflux", "abdominal"]),
+    "Psychiatry": ("psychiatr", ["psychiatrist", "psychiatry", "anxiety", "depression", "mental health", "insomnia"]),
+    "Ophthalmology": ("ophthalmolog", ["ophthalmologist", "ophthalmology", "eye", "eyes", "vision", "eyesight"]),
+    "Endocrinology": ("endocrinolog", ["endocrinologist", "endocrinology", "diabetes", "thyroid", "hormone", "hormones"]),
+    "Urology": ("urolog", ["urologist", "urology", "kidney stone", "bladder", "prostate"]),
+    "Rheumatology": ("rheumatolog", ["rheumatologist", "rheumatology", "arthritis", "lupus", "gout"]),
+    "Nephrology": ("nephrolog", ["nephrologist", "nephrology", "kidney", "kidneys", "dialysis"]),
+    "Hematology": ("hematolog", ["hematologist", "haematologist", "hematology", "anemia", "anaemia", "blood disorder"]),
+}
+URGENCY_WORDS = {
+    "high": ["emergency", "urgent", "urgently", "asap", "immediately", "right away", "severe", "as soon as possible"],
+    "medium": ["soon", "this week", "quickly"],
+    "low": ["routine", "checkup", "check-up", "check up", "whenever", "no rush", "follow-up", "follow up"],
+}
+TIME_OF_DAY_WORDS = {
+    "morning": ["morning", "before noon", "early"],
+    "afternoon": ["afternoon", "after lunch", "noon", "midday"],
+    "evening": ["evening", "night", "after work", "late"],
+}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+LOCAL_PARSE_CONFIDENCE = 0.8
+
+def _alternation(words: Iterable[str]) -> str:
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+_SPEC_RE = re.compile(r"\b(" + _alternation(w for _, words in SPECIALITY_SYNONYMS.values() for w in words) + r")\b")
+_SPEC_BY_WORD = {w: name for name, (_, words) in SPECIALITY_SYNONYMS.items() for w in words}
+_URGENCY_RE = {level: re.compile(r"\b(" + _alternation(words) + r")\b") for level, words in URGENCY_WORDS.items()}
+_TOD_RE = {tod: re.compile(r"\b(" + _alternation(words) + r")\b") for tod, words in TIME_OF_DAY_WORDS.items()}
+_CLOCK_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b")
+_ISO_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_DAY_MONTH_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(" + "|".join(MONTHS) + r")[a-z]*\b|\b(" + "|".join(MONTHS) + r")[a-z]*\s+(\d{1,2})(?:st|nd|rd|th)?\b")
+_IN_N_RE = re.compile(r"\bin\s+(\d{1,3}|a|one|two|three)\s+(day|days|week|weeks)\b")
+_WEEKDAY_RE = re.compile(r"\b(next\s+|this\s+|on\s+)?(" + "|".join(WEEKDAYS) + r")\b")
+_SMALL_NUMBERS = {"a": 1, "one": 1, "two": 2, "three": 3}
+
+@dataclass(slots=True)
+class ParsedQuery:
+    speciality: Optional[str] = None
+    urgency: Optional[str] = None
+    preferred_time_of_day: Optional[str] = None
+    date_hint: Optional[str] = None
+    confidence: float = 0.0
+    def as_dict(self) -> Dict[str, Optional[str]]:
+        return {"speciality": self.speciality, "urgency": self.urgency, "preferred_time_of_day": self.preferred_time_of_day, "date_hint": self.date_hint}
+
+def _roster_name(canonical: str, roster: Optional[Iterable[str]]) -> str:
+    if roster is None:
+        return canonical
+    stem = SPECIALITY_SYNONYMS[canonical][0]
+    for name in roster:
+        if name.lower().startswith(stem):
+            return name
+    return canonical
+
+def _date_hint(text: str, today: date) -> Optional[date]:
+    if m := _ISO_RE.search(text):
+        try:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            return None
+    if m := _DAY_MONTH_RE.search(text):
+        day, month = (m.group(1), m.group(2)) if m.group(1) else (m.group(4), m.group(3))
+        try:
+            hint = date(today.year, MONTHS.index(month[:3]) + 1, int(day))
+            return hint if hint >= today else hint.replace(year=today.year + 1)
+        except ValueError:
+            return None
+    if "day after tomorrow" in text:
+        return today + timedelta(days=2)
+    if "tomorrow" in text:
+        return today + timedelta(days=1)
+    if "today" in text or "tonight" in text:
+        return today
+    if m := _IN_N_RE.search(text):
+        n = _SMALL_NUMBERS.get(m.group(1)) or int(m.group(1))
+        return today + timedelta(days=n * 7 if m.group(2).startswith("week") else n)
+    if m := _WEEKDAY_RE.search(text):
+        ahead = (WEEKDAYS.index(m.group(2)) - today.weekday()) % 7 or 7
+        if m.group(1) and m.group(1).strip() == "next" and ahead < 7 - today.weekday():
+            ahead += 7
+        return today + timedelta(days=ahead)
+    if "next week" in text:
+        return today + timedelta(days=7 - today.weekday())
+    if "next month" in text:
+        return (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return None
+
+def parse_query(text: str, roster: Optional[Iterable[str]] = None, today: Optional[date] = None) -> ParsedQuery:
+    text = " ".join(text.lower().split())
+    today = today or date.today()
+    res = ParsedQuery()
+    found = {_SPEC_BY_WORD[m] for m in _SPEC_RE.findall(text)}
+    if len(found) == 1:
+        res.speciality = _roster_name(found.pop(), roster)
+        res.confidence = LOCAL_PARSE_CONFIDENCE
+    elif found:
+        res.confidence = 0.2
+    for level in ("high", "low", "medium"):
+        if _URGENCY_RE[level].search(text):
+            res.urgency = level
+            break
+    if m := _CLOCK_RE.search(text):
+        hour = int(m.group(1)) % 12 + (12 if m.group(3) == "pm" else 0)
+        res.preferred_time_of_day = "morning" if hour < 12 else "afternoon" if hour < 17 else "evening"
+    else:
+        for tod, pattern in _TOD_RE.items():
+            if pattern.search(text):
+                res.preferred_time_of_day = tod
+                break
+    hint = _date_hint(text, today)
+    if hint:
+        res.date_hint = hint.isoformat()
+    if res.speciality:
+        res.confidence += 0.2 * sum(1 for v in (res.urgency, res.preferred_time_of_day, res.date_hint) if v) / 3
+    return res
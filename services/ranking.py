@@ -0,0 +1,60 @@
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List
+from models import Doctor, Patient, TimeSlot
+
+URGENCY_WEIGHTS = {"emergency": 4.0, "urgent": 3.0, "high": 3.0, "medium": 1.5, "normal": 1.5, "routine": 0.5, "low": 0.5}
+TIME_OF_DAY = {"morning": (0, 12 * 60), "afternoon": (12 * 60, 17 * 60), "evening": (17 * 60, 24 * 60)}
+TIME_OF_DAY_BONUS = 3.0
+
+@dataclass(slots=True)
+class RankedSlot:
+    score: float
+    doctor: Doctor
+    slot: TimeSlot
+    def line(self) -> str:
+        d, s = self.doctor, self.slot
+        return f"Doctor {d.name} ({d.speciality}, {d.location or 'n/a'}, {d.consultation_mode}), doctor_id={d.id}, slot_id={s.slot_id}, date={s.date.date()}, start={s.start_time}, end={s.end_time}"
+
+def doctor_score(doctor: Doctor, patient: Patient, constraints: Dict) -> float:
+    score = min(doctor.experience_years, 20) * 0.05
+    pref = getattr(patient, "preferred_speciality", None)
+    if pref and doctor.speciality.lower() == pref.lower():
+        score += 5.0
+    location = constraints.get("location")
+    if location and doctor.location.lower() == str(location).lower():
+        score += 4.0
+    mode = constraints.get("consultation_mode")
+    if mode and doctor.consultation_mode.lower() == str(mode).lower():
+        score += 3.0
+    return score
+
+def rank_slots(candidates: Iterable[tuple[Doctor, Iterable[TimeSlot]]], patient: Patient, urgency: str | None, constraints: Dict | None = None, k: int = 20, now: datetime | None = None) -> List[RankedSlot]:
+    constraints = constraints or {}
+    now = now or datetime.now()
+    weight = URGENCY_WEIGHTS.get(str(urgency or "").lower(), 1.0)
+    window = TIME_OF_DAY.get(str(constraints.get("time_of_day", "")).lower())
+    tod_max = TIME_OF_DAY_BONUS if window else 0.0
+    heap: list = []
+    seq = 0
+    for doctor, slots in candidates:
+        base = doctor_score(doctor, patient, constraints)
+        for slot in slots:
+            start = slot.date.replace(hour=slot.start_time.hour, minute=slot.start_time.minute)
+            if start < now:
+                continue
+            score = base - weight * (start - now).total_seconds() / 86400
+            if len(heap) == k and score + tod_max <= heap[0][0]:
+                break
+            if window:
+                minute = slot.start_time.hour * 60 + slot.start_time.minute
+                score += TIME_OF_DAY_BONUS if window[0] <= minute < window[1] else -TIME_OF_DAY_BONUS
+            seq += 1
+            item = (score, -seq, doctor, slot)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+    ranked = sorted(heap, key=lambda t: (-t[0], t[3].date, t[3].start_time, t[3].slot_id))
+    return [RankedSlot(score, doctor, slot) for score, _, doctor, slot in ranked]
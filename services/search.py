@@ -0,0 +1,186 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+from models import Doctor
+
+NO_AVAILABILITY = (date.max.toordinal(), 0)
+MAX_PREFIX = 12
+
+@dataclass
+class DoctorPage:
+    items: List[Doctor]
+    total: int
+    offset: int
+    next_offset: Optional[int] = None
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _prefixes(text: str) -> Set[str]:
+    return {word[:n] for word in text.split() for n in range(1, min(len(word), MAX_PREFIX) + 1)}
+
+class DoctorSearchIndex:
+    def __init__(self):
+        self.doctors: Dict[str, Doctor] = {}
+        self._speciality_order: Dict[str, Dict[str, None]] = {}
+        self._postings: Dict[str, Dict[str, Set[str]]] = {"speciality": {}, "location": {}, "mode": {}}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._prefixes: Dict[str, Set[str]] = {}
+        self._haystack: Dict[str, str] = {}
+        self._availability: Dict[str, tuple] = {}
+        self._ranked: Dict[Optional[Tuple[str, str]], Tuple[List[tuple], List[tuple]]] = {None: ([], [])}
+        self._lock = threading.RLock()
+    def _attributes(self, doctor: Doctor) -> Dict[str, str]:
+        return {"speciality": doctor.speciality.lower(), "location": doctor.location.lower(), "mode": doctor.consultation_mode.lower()}
+    def _scopes(self, doctor: Doctor) -> List[Optional[Tuple[str, str]]]:
+        attrs = self._attributes(doctor)
+        return [None, ("speciality", attrs["speciality"]), ("location", attrs["location"])]
+    def _rank_keys(self, doctor_id: str) -> Tuple[tuple, tuple]:
+        avail = self._availability[doctor_id]
+        exp = -self.doctors[doctor_id].experience_years
+        return (exp, avail, doctor_id), (avail, exp, doctor_id)
+    def _link(self, doctor: Doctor):
+        by_exp, by_avail = self._rank_keys(doctor.id)
+        for scope in self._scopes(doctor):
+            exp_list, avail_list = self._ranked.setdefault(scope, ([], []))
+            insort(exp_list, by_exp)
+            insort(avail_list, by_avail)
+    def _unlink(self, doctor: Doctor):
+        by_exp, by_avail = self._rank_keys(doctor.id)
+        for scope in self._scopes(doctor):
+            exp_list, avail_list = self._ranked[scope]
+            del exp_list[bisect_left(exp_list, by_exp)]
+            del avail_list[bisect_left(avail_list, by_avail)]
+    def _rebuild_ranked(self):
+        ranked: Dict[Optional[Tuple[str, str]], Tuple[List[tuple], List[tuple]]] = {None: ([], [])}
+        for doctor in self.doctors.values():
+            by_exp, by_avail = self._rank_keys(doctor.id)
+            for scope in self._scopes(doctor):
+                exp_list, avail_list = ranked.setdefault(scope, ([], []))
+                exp_list.append(by_exp)
+                avail_list.append(by_avail)
+        for exp_list, avail_list in ranked.values():
+            exp_list.sort()
+            avail_list.sort()
+        self._ranked = ranked
+    def add_many(self, doctors: List[Tuple[Doctor, tuple]]):
+        with self._lock:
+            for doctor, next_available in doctors:
+                self._add(doctor, next_available, link=False)
+            self._rebuild_ranked()
+    def add(self, doctor: Doctor, next_available: tuple = NO_AVAILABILITY):
+        with self._lock:
+            self._add(doctor, next_available, link=True)
+    def _add(self, doctor: Doctor, next_available: tuple, link: bool):
+        if doctor.id in self.doctors:
+            self.remove(doctor.id)
+        self.doctors[doctor.id] = doctor
+        attrs = self._attributes(doctor)
+        self._speciality_order.setdefault(attrs["speciality"], {})[doctor.id] = None
+        for name, value in attrs.items():
+            self._postings[name].setdefault(value, set()).add(doctor.id)
+        haystack = f"{doctor.name} {doctor.speciality}".lower()
+        self._haystack[doctor.id] = haystack
+        for gram in _trigrams(haystack):
+            self._trigrams.setdefault(gram, set()).add(doctor.id)
+        for prefix in _prefixes(haystack):
+            self._prefixes.setdefault(prefix, set()).add(doctor.id)
+        self._availability[doctor.id] = next_available
+        if link:
+            self._link(doctor)
+    def remove(self, doctor_id: str):
+        with self._lock:
+            doctor = self.doctors.get(doctor_id)
+            if not doctor:
+                return
+            self._unlink(doctor)
+            attrs = self._attributes(doctor)
+            self._speciality_order[attrs["speciality"]].pop(doctor_id, None)
+            for name, value in attrs.items():
+                self._postings[name][value].discard(doctor_id)
+            haystack = self._haystack.pop(doctor_id)
+            for gram in _trigrams(haystack):
+                self._trigrams[gram].discard(doctor_id)
+            for prefix in _prefixes(haystack):
+                self._prefixes[prefix].discard(doctor_id)
+            del self.doctors[doctor_id]
+            del self._availability[doctor_id]
+    def set_availabilities(self, updates: Dict[str, tuple]):
+        with self._lock:
+            if len(updates) * 50 < len(self.doctors):
+                for doctor_id, next_available in updates.items():
+                    self.set_availability(doctor_id, next_available)
+                return
+            for doctor_id, next_available in updates.items():
+                if doctor_id in self.doctors:
+                    self._availability[doctor_id] = next_available
+            self._rebuild_ranked()
+    def set_availability(self, doctor_id: str, next_available: tuple):
+        with self._lock:
+            doctor = self.doctors.get(doctor_id)
+            if not doctor or self._availability[doctor_id] == next_available:
+                return
+            self._unlink(doctor)
+            self._availability[doctor_id] = next_available
+            self._link(doctor)
+    def by_speciality(self, speciality: str) -> List[Doctor]:
+        return [self.doctors[i] for i in list(self._speciality_order.get(speciality.lower(), ()))]
+    def _substring_candidates(self, text: str) -> Set[str]:
+        postings = sorted((self._trigrams.get(g, set()) for g in _trigrams(text)), key=len)
+        ids = postings[0].intersection(*postings[1:])
+        return {i for i in ids if text in self._haystack[i]}
+    def _text_candidates(self, text: str) -> Set[str]:
+        text = " ".join(text.lower().split())
+        postings = []
+        for word in text.split():
+            if len(word) > MAX_PREFIX:
+                postings.append(self._substring_candidates(word))
+            else:
+                postings.append(self._prefixes.get(word, set()))
+        postings.sort(key=len)
+        ids = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        if not ids and len(text) >= 3:
+            ids = self._substring_candidates(text)
+        return ids
+    def search(self, text: str | None = None, speciality: str | None = None, location: str | None = None, mode: str | None = None,
+               sort: str = "experience", offset: int = 0, limit: int = 20) -> DoctorPage:
+        pos = 1 if sort == "availability" else 0
+        with self._lock:
+            filters: List[Set[str]] = []
+            scopes = [self._ranked[None]]
+            for name, value in (("speciality", speciality), ("location", location), ("mode", mode)):
+                if value:
+                    filters.append(self._postings[name].get(value.lower(), set()))
+                    if (name, value.lower()) in self._ranked:
+                        scopes.append(self._ranked[(name, value.lower())])
+            if text and text.strip():
+                filters.append(self._text_candidates(text))
+            ranked = min((scope[pos] for scope in scopes), key=len)
+            if not filters:
+                total = len(ranked)
+                ids = [key[-1] for key in ranked[offset:offset + limit]]
+            else:
+                filters.sort(key=len)
+                candidates = filters[0].intersection(*filters[1:]) if len(filters) > 1 else filters[0]
+                total = len(candidates)
+                if not total:
+                    ids = []
+                elif (offset + limit) * len(ranked) > 7 * total * total:
+                    keys = heapq.nsmallest(offset + limit, (self._rank_keys(i)[pos] for i in candidates))
+                    ids = [key[-1] for key in keys[offset:]]
+                else:
+                    ids, skipped = [], 0
+                    for key in ranked:
+                        if key[-1] in candidates:
+                            if skipped < offset:
+                                skipped += 1
+                                continue
+                            ids.append(key[-1])
+                            if len(ids) == limit:
+                                break
+            items = [self.doctors[i] for i in ids]
+            end = offset + len(items)
+            return DoctorPage(items, total, offset, end if end < total else None)
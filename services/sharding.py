@@ -0,0 +1,196 @@
+import heapq
+import multiprocessing as mp
+import os
+import threading
+import zlib
+from concurrent.futures import Future
+from datetime import datetime, time
+from itertools import count
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from models import Patient, Doctor, TimeSlot, Appointment, AppointmentStatus, RecurrenceRule
+from services import AppointmentService
+from services.metrics import timed
+from services.search import DoctorPage
+from storage import Storage
+
+def shard_for(doctor_id: str, shards: int) -> int:
+    return zlib.crc32(doctor_id.encode()) % shards
+
+def _search(service: AppointmentService, text, speciality, location, mode, sort, limit) -> tuple:
+    page = service.search_doctors(text, speciality, location, mode, sort, 0, limit)
+    pos = 1 if sort == "availability" else 0
+    return page.total, [service.doctor_index._rank_keys(d.id)[pos] for d in page.items]
+
+def _book(service: AppointmentService, patient: Patient, doctor_id: str, slot_id: str) -> Appointment:
+    doctor = service.doctors.get(doctor_id)
+    if not doctor:
+        raise ValueError("Invalid slot")
+    return service.book(patient, doctor, slot_id)
+
+def _book_many(service: AppointmentService, requests: List[tuple]) -> list:
+    res = []
+    for patient, doctor_id, slot_id in requests:
+        try:
+            res.append(_book(service, patient, doctor_id, slot_id))
+        except ValueError as e:
+            res.append(e)
+    return res
+
+def _has_appointment(service: AppointmentService, appointment_id: str) -> bool:
+    return appointment_id in service.appointments
+
+def _stats(service: AppointmentService) -> Dict[str, int]:
+    return {"pid": os.getpid(), "doctors": len(service.doctors), "slots": len(service.slots), "appointments": len(service.appointments)}
+
+SHARD_OPS = {"search": _search, "book": _book, "book_many": _book_many, "has_appointment": _has_appointment, "stats": _stats}
+
+def _serve(index: int, requests, responses, storage_factory: Optional[Callable[[int], Storage]]):
+    service = AppointmentService(storage_factory(index) if storage_factory else None)
+    while True:
+        msg = requests.get()
+        if msg is None:
+            break
+        request_id, op, args = msg
+        handler = SHARD_OPS.get(op)
+        try:
+            responses.put((request_id, True, handler(service, *args) if handler else getattr(service, op)(*args)))
+        except Exception as e:
+            responses.put((request_id, False, e))
+
+class ShardedAppointmentService:
+    def __init__(self, shards: int | None = None, storage_factory: Optional[Callable[[int], Storage]] = None,
+                 start_method: str | None = None, timeout: float | None = 60.0):
+        self.shards = shards or os.cpu_count() or 1
+        self.timeout = timeout
+        self.doctors: Dict[str, Doctor] = {}
+        self._specialities: Dict[str, str] = {}
+        self._appointment_shards: Dict[str, int] = {}
+        self._pending: Dict[int, Future] = {}
+        self._request_ids = count()
+        ctx = mp.get_context(start_method)
+        self._requests = [ctx.SimpleQueue() for _ in range(self.shards)]
+        self._responses = ctx.SimpleQueue()
+        self._processes = [ctx.Process(target=_serve, args=(i, q, self._responses, storage_factory), name=f"appointment-shard-{i}", daemon=True)
+                           for i, q in enumerate(self._requests)]
+        for p in self._processes:
+            p.start()
+        self._collector = threading.Thread(target=self._collect, name="shard-responses", daemon=True)
+        self._collector.start()
+    def _collect(self):
+        while True:
+            msg = self._responses.get()
+            if msg is None:
+                break
+            request_id, ok, value = msg
+            future = self._pending.pop(request_id)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+    def submit(self, shard: int, op: str, *args) -> Future:
+        future, request_id = Future(), next(self._request_ids)
+        self._pending[request_id] = future
+        self._requests[shard].put((request_id, op, args))
+        return future
+    def call(self, shard: int, op: str, *args):
+        return self.submit(shard, op, *args).result(self.timeout)
+    def broadcast(self, op: str, *args) -> list:
+        return [f.result(self.timeout) for f in [self.submit(i, op, *args) for i in range(self.shards)]]
+    def shard_for(self, doctor_id: str) -> int:
+        return shard_for(doctor_id, self.shards)
+    def _partition(self, items: Iterable, doctor_id: Callable) -> Dict[int, list]:
+        parts: Dict[int, list] = {}
+        for item in items:
+            parts.setdefault(self.shard_for(doctor_id(item)), []).append(item)
+        return parts
+    def _gather(self, op: str, parts: Dict[int, list], *args) -> list:
+        return [f.result(self.timeout) for f in [self.submit(shard, op, items, *args) for shard, items in parts.items()]]
+    def add_doctor(self, doctor: Doctor):
+        self.add_doctors([doctor])
+    def add_doctors(self, doctors: Iterable[Doctor]):
+        doctors = list(doctors)
+        for doctor in doctors:
+            self.doctors[doctor.id] = doctor
+            self._specialities.setdefault(doctor.speciality.lower(), doctor.speciality)
+        self._gather("add_doctors", self._partition(doctors, lambda d: d.id))
+    def specialities(self) -> List[str]:
+        return list(self._specialities.values())
+    def list_doctors(self, speciality: str | None = None) -> List[Doctor]:
+        if speciality:
+            return [d for d in self.doctors.values() if d.speciality.lower() == speciality.lower()]
+        return list(self.doctors.values())
+    def add_slots(self, slots: Iterable[TimeSlot], batch_size: int = 10000, skip_overlaps: bool = False) -> int:
+        return sum(self._gather("add_slots", self._partition(slots, lambda s: s.doctor_id), batch_size, skip_overlaps))
+    def publish_schedule(self, doctor_id: str, rule: RecurrenceRule, batch_size: int = 10000, skip_overlaps: bool = False) -> int:
+        return self.call(self.shard_for(doctor_id), "publish_schedule", doctor_id, rule, batch_size, skip_overlaps)
+    @timed("sharded.search_doctors")
+    def search_doctors(self, text: str | None = None, speciality: str | None = None, location: str | None = None, mode: str | None = None,
+                       sort: str = "experience", offset: int = 0, limit: int = 20) -> DoctorPage:
+        pages = self.broadcast("search", text, speciality, location, mode, sort, offset + limit)
+        total = sum(t for t, _ in pages)
+        ranked = list(heapq.merge(*(keys for _, keys in pages)))
+        items = [self.doctors[key[-1]] for key in ranked[offset:offset + limit]]
+        return DoctorPage(items, total, offset, offset + len(items) if offset + len(items) < total else None)
+    @timed("sharded.get_doctor_slots")
+    def get_doctor_slots(self, doctor_id: str, date: datetime | None = None) -> List[TimeSlot]:
+        return self.call(self.shard_for(doctor_id), "get_doctor_slots", doctor_id, date)
+    @timed("sharded.get_free_slots")
+    def get_free_slots(self, doctor_id: str, date: datetime | None = None) -> List[TimeSlot]:
+        return self.call(self.shard_for(doctor_id), "get_free_slots", doctor_id, date)
+    @timed("sharded.find_earliest_slots")
+    def find_earliest_slots(self, speciality: str | None = None, location: str | None = None, mode: str | None = None,
+                            date_from: datetime | None = None, date_to: datetime | None = None,
+                            time_from: time | None = None, time_to: time | None = None, limit: int = 10) -> List[Tuple[Doctor, TimeSlot]]:
+        streams = self.broadcast("find_earliest_slots", speciality, location, mode, date_from, date_to, time_from, time_to, limit)
+        merged = heapq.merge(*streams, key=lambda pair: (pair[1].date, pair[1].start_time))
+        return [(self.doctors[slot.doctor_id], slot) for _, slot in merged][:limit]
+    def _remember(self, appt: Appointment) -> Appointment:
+        self._appointment_shards[appt.appointment_id] = self.shard_for(appt.doctor_id)
+        return appt
+    @timed("sharded.book")
+    def book(self, patient: Patient, doctor: Doctor, slot_id: str) -> Appointment:
+        return self._remember(self.call(self.shard_for(doctor.id), "book", patient, doctor.id, slot_id))
+    @timed("sharded.book_many")
+    def book_many(self, requests: Iterable[Tuple[Patient, Doctor, str]]) -> List[Appointment | ValueError]:
+        requests = list(requests)
+        parts: Dict[int, List[int]] = {}
+        for i, (_, doctor, _) in enumerate(requests):
+            parts.setdefault(self.shard_for(doctor.id), []).append(i)
+        futures = {shard: self.submit(shard, "book_many", [(requests[i][0], requests[i][1].id, requests[i][2]) for i in rows]) for shard, rows in parts.items()}
+        res: List[Appointment | ValueError] = [None] * len(requests)
+        for shard, future in futures.items():
+            for i, outcome in zip(parts[shard], future.result(self.timeout)):
+                res[i] = self._remember(outcome) if isinstance(outcome, Appointment) else outcome
+        return res
+    def _appointment_shard(self, appointment_id: str) -> int:
+        shard = self._appointment_shards.get(appointment_id)
+        if shard is None:
+            owners = [i for i, found in enumerate(self.broadcast("has_appointment", appointment_id)) if found]
+            if not owners:
+                raise ValueError("Appointment not found")
+            shard = self._appointment_shards[appointment_id] = owners[0]
+        return shard
+    @timed("sharded.cancel")
+    def cancel(self, appointment_id: str, patient: Patient):
+        self.call(self._appointment_shard(appointment_id), "cancel", appointment_id, patient)
+    @timed("sharded.complete")
+    def complete(self, appointment_id: str):
+        self.call(self._appointment_shard(appointment_id), "complete", appointment_id)
+    def list_patient_appointments(self, patient: Patient, statuses: Iterable[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None) -> List[Appointment]:
+        parts = self.broadcast("list_patient_appointments", patient, statuses, date_from, date_to)
+        return [self._remember(a) for a in heapq.merge(*parts, key=lambda a: a.created_at)]
+    def list_doctor_appointments(self, doctor: Doctor, statuses: Iterable[AppointmentStatus] | None = None, date_from: datetime | None = None, date_to: datetime | None = None) -> List[Appointment]:
+        return [self._remember(a) for a in self.call(self.shard_for(doctor.id), "list_doctor_appointments", doctor, statuses, date_from, date_to)]
+    def stats(self) -> List[Dict[str, int]]:
+        return self.broadcast("stats")
+    def close(self):
+        for q in self._requests:
+            q.put(None)
+        for p in self._processes:
+            p.join()
+        self._responses.put(None)
+        self._collector.join()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,142 @@
+import sqlite3
+import threading
+from datetime import datetime, time, timedelta
+from typing import Iterable, List
+from models import User, Patient, Doctor, TimeSlot, Appointment, UserRole, AppointmentStatus
+
+class Storage:
+    def load_users(self) -> Iterable[User]:
+        return []
+    def load_slots(self) -> Iterable[TimeSlot]:
+        return []
+    def load_appointments(self) -> Iterable[Appointment]:
+        return []
+    def save_user(self, user: User):
+        pass
+    def save_users(self, users: List[User]):
+        for user in users:
+            self.save_user(user)
+    def save_slots(self, slots: List[TimeSlot]):
+        pass
+    def save_booking(self, appt: Appointment, slot: TimeSlot):
+        pass
+    def save_cancellation(self, appt: Appointment, slot: TimeSlot | None):
+        pass
+    def save_completion(self, appt: Appointment):
+        pass
+    def save_appointments(self, appts: List[Appointment]):
+        pass
+    def close(self):
+        pass
+
+USER_COLUMNS = ("id", "name", "email", "password_hash", "role", "age", "gender", "preferred_speciality", "speciality", "experience_years", "location", "consultation_mode")
+SLOT_COLUMNS = ("slot_id", "doctor_id", "date", "start_time", "end_time", "is_booked")
+APPOINTMENT_COLUMNS = ("appointment_id", "patient_id", "doctor_id", "slot_id", "status", "created_at")
+
+def user_to_row(user: User) -> tuple:
+    return (user.id, user.name, user.email, user.password_hash, user.role.value,
+            getattr(user, "age", None), getattr(user, "gender", None), getattr(user, "preferred_speciality", None),
+            getattr(user, "speciality", None), getattr(user, "experience_years", None), getattr(user, "location", None), getattr(user, "consultation_mode", None))
+
+def row_to_user(row) -> User:
+    uid, name, email, pw_hash, role, age, gender, pref, spec, exp, loc, mode = row
+    role = UserRole(role)
+    if role == UserRole.PATIENT:
+        return Patient(uid, name, email, pw_hash, role, age=age, gender=gender, preferred_speciality=pref)
+    if role == UserRole.DOCTOR:
+        return Doctor(uid, name, email, pw_hash, role, speciality=spec or "", experience_years=exp or 0, location=loc or "", consultation_mode=mode or "In-person")
+    return User(uid, name, email, pw_hash, role)
+
+def slot_to_row(slot: TimeSlot) -> tuple:
+    return (slot.slot_id, slot.doctor_id, slot.date.isoformat(), slot.start_time.isoformat(), slot.end_time.isoformat(), int(slot.is_booked))
+
+def row_to_slot(row) -> TimeSlot:
+    slot_id, doctor_id, day, start, end, booked = row
+    return TimeSlot(slot_id, doctor_id, datetime.fromisoformat(day), time.fromisoformat(start), time.fromisoformat(end), bool(booked))
+
+def appointment_to_row(appt: Appointment) -> tuple:
+    return (appt.appointment_id, appt.patient_id, appt.doctor_id, appt.slot_id, appt.status.value, appt.created_at.isoformat())
+
+def row_to_appointment(row) -> Appointment:
+    appt_id, patient_id, doctor_id, slot_id, status, created = row
+    return Appointment(appt_id, patient_id, doctor_id, slot_id, AppointmentStatus(status), datetime.fromisoformat(created))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL, password_hash TEXT NOT NULL, role TEXT NOT NULL,
+    age INTEGER, gender TEXT, preferred_speciality TEXT,
+    speciality TEXT, experience_years INTEGER, location TEXT, consultation_mode TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE TABLE IF NOT EXISTS slots (
+    slot_id TEXT PRIMARY KEY, doctor_id TEXT NOT NULL, date TEXT NOT NULL,
+    start_time TEXT NOT NULL, end_time TEXT NOT NULL, is_booked INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_slots_doctor_date ON slots(doctor_id, date);
+CREATE TABLE IF NOT EXISTS appointments (
+    appointment_id TEXT PRIMARY KEY, patient_id TEXT NOT NULL, doctor_id TEXT NOT NULL,
+    slot_id TEXT NOT NULL, status TEXT NOT NULL, created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments(patient_id);
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor ON appointments(doctor_id);
+"""
+
+_INSERT_USER = f"INSERT OR REPLACE INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' * len(USER_COLUMNS))})"
+_INSERT_SLOT = f"INSERT OR REPLACE INTO slots ({', '.join(SLOT_COLUMNS)}) VALUES ({', '.join('?' * len(SLOT_COLUMNS))})"
+_INSERT_APPOINTMENT = f"INSERT OR REPLACE INTO appointments ({', '.join(APPOINTMENT_COLUMNS)}) VALUES ({', '.join('?' * len(APPOINTMENT_COLUMNS))})"
+_SET_SLOT_BOOKED = "UPDATE slots SET is_booked = ? WHERE slot_id = ?"
+_SET_APPOINTMENT_STATUS = "UPDATE appointments SET status = ? WHERE appointment_id = ?"
+
+class SQLiteStorage(Storage):
+    def __init__(self, path: str = "medibook.sqlite3"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=OFF")
+        self._conn.executescript(_SCHEMA)
+    def _select(self, table: str, columns: tuple) -> Iterable[tuple]:
+        with self._lock:
+            return self._conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+    def load_users(self) -> Iterable[User]:
+        return [row_to_user(r) for r in self._select("users", USER_COLUMNS)]
+    def load_slots(self) -> Iterable[TimeSlot]:
+        return [row_to_slot(r) for r in self._select("slots", SLOT_COLUMNS)]
+    def load_appointments(self) -> Iterable[Appointment]:
+        return [row_to_appointment(r) for r in self._select("appointments", APPOINTMENT_COLUMNS)]
+    def load_doctor_slots(self, doctor_id: str, day: datetime) -> List[TimeSlot]:
+        start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SLOT_COLUMNS)} FROM slots WHERE doctor_id = ? AND date >= ? AND date < ? ORDER BY date, start_time",
+                (doctor_id, start.isoformat(), (start + timedelta(days=1)).isoformat()),
+            ).fetchall()
+        return [row_to_slot(r) for r in rows]
+    def save_user(self, user: User):
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT_USER, user_to_row(user))
+    def save_users(self, users: List[User]):
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT_USER, [user_to_row(u) for u in users])
+    def save_slots(self, slots: List[TimeSlot]):
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT_SLOT, [slot_to_row(s) for s in slots])
+    def save_booking(self, appt: Appointment, slot: TimeSlot):
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT_APPOINTMENT, appointment_to_row(appt))
+            self._conn.execute(_SET_SLOT_BOOKED, (1, slot.slot_id))
+    def save_cancellation(self, appt: Appointment, slot: TimeSlot | None):
+        with self._lock, self._conn:
+            self._conn.execute(_SET_APPOINTMENT_STATUS, (AppointmentStatus.CANCELLED.value, appt.appointment_id))
+            if slot:
+                self._conn.execute(_SET_SLOT_BOOKED, (0, slot.slot_id))
+    def save_completion(self, appt: Appointment):
+        with self._lock, self._conn:
+            self._conn.execute(_SET_APPOINTMENT_STATUS, (AppointmentStatus.COMPLETED.value, appt.appointment_id))
+    def save_appointments(self, appts: List[Appointment]):
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT_APPOINTMENT, [appointment_to_row(a) for a in appts])
+            self._conn.executemany(_SET_SLOT_BOOKED, [(1, a.slot_id) for a in appts if a.status == AppointmentStatus.BOOKED])
+    def close(self):
+        with self._lock:
+            self._conn.close()
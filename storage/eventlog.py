@@ -0,0 +1,199 @@
+import json
+import mmap
+import os
+import pickle
+import threading
+from collections import ChainMap
+from typing import Iterable, List, MutableMapping, Optional
+from models import User, TimeSlot, Appointment, AppointmentStatus
+from storage import (Storage, user_to_row, row_to_user, slot_to_row, row_to_slot,
+                     appointment_to_row, row_to_appointment)
+
+LOG_FILE = "events.jsonl"
+SNAPSHOT_FILE = "snapshot.pickle"
+
+class EventLogStorage(Storage):
+    def __init__(self, path: str = "medibook-events", commit_interval: float = 0.005, max_batch: int = 4096,
+                 snapshot_every: int = 1_000_000, durable: bool = True):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.snapshot_every = snapshot_every
+        self.durable = durable
+        self.users: MutableMapping[str, tuple] = {}
+        self.slots: MutableMapping[str, tuple] = {}
+        self.appointments: MutableMapping[str, tuple] = {}
+        self.events = self.replayed = self.commits = self.snapshots = 0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._buffer: List[bytes] = []
+        self._seq = self._durable_seq = 0
+        self._since_snapshot = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._log_end = self._recover()
+        self._log = open(os.path.join(path, LOG_FILE), "ab")
+        self._writer = threading.Thread(target=self._commit_loop, name="event-log-writer", daemon=True)
+        self._writer.start()
+    def _recover(self) -> int:
+        offset = 0
+        snapshot = os.path.join(self.path, SNAPSHOT_FILE)
+        if os.path.exists(snapshot) and os.path.getsize(snapshot):
+            with open(snapshot, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                state = pickle.loads(mm)
+            offset, self.users, self.slots, self.appointments = state["offset"], state["users"], state["slots"], state["appointments"]
+        log = os.path.join(self.path, LOG_FILE)
+        if not os.path.exists(log):
+            return 0
+        offset = min(offset, os.path.getsize(log))
+        with open(log, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(event)
+                offset += len(line)
+                self.replayed += 1
+        if offset < os.path.getsize(log):
+            with open(log, "r+b") as f:
+                f.truncate(offset)
+        return offset
+    def _apply(self, event: dict):
+        kind = event["t"]
+        if kind == "register":
+            self.users[event["u"][0]] = tuple(event["u"])
+        elif kind == "register_batch":
+            for row in event["u"]:
+                self.users[row[0]] = tuple(row)
+        elif kind == "add_slots":
+            for row in event["s"]:
+                self.slots[row[0]] = tuple(row)
+        elif kind == "book":
+            self.appointments[event["a"][0]] = tuple(event["a"])
+            self._set_booked(event["s"], 1)
+        elif kind == "add_appointments":
+            for row in event["a"]:
+                self.appointments[row[0]] = tuple(row)
+                if row[4] == AppointmentStatus.BOOKED.value:
+                    self._set_booked(row[3], 1)
+        elif kind == "cancel":
+            self._set_status(event["a"], AppointmentStatus.CANCELLED)
+            if event["s"]:
+                self._set_booked(event["s"], 0)
+        elif kind == "complete":
+            self._set_status(event["a"], AppointmentStatus.COMPLETED)
+        else:
+            raise ValueError(f"Unknown event type {kind!r}")
+    def _set_booked(self, slot_id: str, booked: int):
+        self.slots[slot_id] = self.slots[slot_id][:5] + (booked,)
+    def _set_status(self, appointment_id: str, status: AppointmentStatus):
+        row = self.appointments[appointment_id]
+        self.appointments[appointment_id] = row[:4] + (status.value,) + row[5:]
+    def _append(self, event: dict):
+        line = (json.dumps(event, separators=(",", ":")) + "\n").encode()
+        with self._cond:
+            if self._closed:
+                raise ValueError("Event log is closed")
+            self._apply(event)
+            self._buffer.append(line)
+            self._log_end += len(line)
+            self._seq += 1
+            seq = self._seq
+            self.events += 1
+            self._since_snapshot += 1
+            if self.durable or len(self._buffer) >= self.max_batch:
+                self._cond.notify_all()
+            if self._since_snapshot >= self.snapshot_every:
+                self._start_snapshot()
+            if self.durable:
+                while self._durable_seq < seq:
+                    self._cond.wait()
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait(self.commit_interval)
+                if not self._buffer:
+                    if self._closed:
+                        return
+                    continue
+                batch, self._buffer = self._buffer, []
+                seq = self._seq
+            self._log.write(b"".join(batch))
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            with self._cond:
+                self._durable_seq = seq
+                self.commits += 1
+                self._cond.notify_all()
+    def _start_snapshot(self):
+        if self._snapshot_thread and self._snapshot_thread.is_alive():
+            return
+        self._since_snapshot = 0
+        users, slots, appointments = self.users, self.slots, self.appointments
+        self.users, self.slots, self.appointments = ChainMap({}, users), ChainMap({}, slots), ChainMap({}, appointments)
+        state = {"seq": self._seq, "offset": self._log_end, "users": users, "slots": slots, "appointments": appointments}
+        self._snapshot_thread = threading.Thread(target=self._write_snapshot, args=(state,), name="event-log-snapshot", daemon=True)
+        self._snapshot_thread.start()
+    def _write_snapshot(self, state: dict):
+        try:
+            with self._cond:
+                self._cond.notify_all()
+                while self._durable_seq < state["seq"]:
+                    self._cond.wait()
+            path = os.path.join(self.path, SNAPSHOT_FILE)
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            self.snapshots += 1
+        finally:
+            with self._cond:
+                for name in ("users", "slots", "appointments"):
+                    overlay, frozen = getattr(self, name).maps
+                    frozen.update(overlay)
+                    setattr(self, name, frozen)
+    def snapshot(self):
+        with self._cond:
+            self._start_snapshot()
+            thread = self._snapshot_thread
+        thread.join()
+    def sync(self):
+        with self._cond:
+            seq = self._seq
+            self._cond.notify_all()
+            while self._durable_seq < seq:
+                self._cond.wait()
+    def load_users(self) -> Iterable[User]:
+        return [row_to_user(r) for r in self.users.values()]
+    def load_slots(self) -> Iterable[TimeSlot]:
+        return [row_to_slot(r) for r in self.slots.values()]
+    def load_appointments(self) -> Iterable[Appointment]:
+        return [row_to_appointment(r) for r in self.appointments.values()]
+    def save_user(self, user: User):
+        self._append({"t": "register", "u": user_to_row(user)})
+    def save_users(self, users: List[User]):
+        self._append({"t": "register_batch", "u": [user_to_row(u) for u in users]})
+    def save_slots(self, slots: List[TimeSlot]):
+        self._append({"t": "add_slots", "s": [slot_to_row(s) for s in slots]})
+    def save_booking(self, appt: Appointment, slot: TimeSlot):
+        self._append({"t": "book", "a": appointment_to_row(appt), "s": slot.slot_id})
+    def save_cancellation(self, appt: Appointment, slot: TimeSlot | None):
+        self._append({"t": "cancel", "a": appt.appointment_id, "s": slot.slot_id if slot else None})
+    def save_completion(self, appt: Appointment):
+        self._append({"t": "complete", "a": appt.appointment_id})
+    def save_appointments(self, appts: List[Appointment]):
+        self._append({"t": "add_appointments", "a": [appointment_to_row(a) for a in appts]})
+    def close(self):
+        self.sync()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        if self._snapshot_thread:
+            self._snapshot_thread.join()
+        self._log.close()
@@ -0,0 +1,35 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+from controllers import AppController
+
+@pytest.fixture
+def kolkata():
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "Asia/Kolkata"
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+def test_lead_time_uses_one_clock(kolkata):
+    controller = AppController()
+    patient = controller.register_patient("Lead Time", "lead@example.com", "secret")
+    doctor, slot = controller.find_earliest_slots(limit=1)[0]
+    appt = controller.book_appointment(patient, doctor, slot.slot_id)
+    start = datetime.combine(slot.date.date(), slot.start_time)
+    appt.created_at = start - timedelta(hours=1) - (datetime.now() - datetime.utcnow())
+    assert controller.get_admin_report().lead_time_hours["p50"] == pytest.approx(1.0, abs=0.02)
+
+def test_completion_refreshes_report():
+    controller = AppController()
+    patient = controller.register_patient("Completion", "complete@example.com", "secret")
+    doctor, slot = controller.find_earliest_slots(limit=1)[0]
+    appt = controller.book_appointment(patient, doctor, slot.slot_id)
+    before = controller.get_admin_report()
+    controller.complete_appointment(appt.appointment_id)
+    assert controller.get_admin_report().version > before.version
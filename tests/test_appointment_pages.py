@@ -0,0 +1,54 @@
+from datetime import date, datetime, time, timedelta
+from models import AppointmentStatus, Doctor, Patient, RecurrenceRule, UserRole
+from services import AppointmentService
+
+DAY = date.today() + timedelta(days=1)
+
+def booked_service(count: int):
+    svc = AppointmentService()
+    doctor = Doctor("d1", "Ann Carter", "d1@example.com", "!", UserRole.DOCTOR, speciality="Cardiology")
+    patient = Patient("p1", "Pat", "p1@example.com", "!", UserRole.PATIENT)
+    svc.add_doctor(doctor)
+    svc.publish_schedule(doctor.id, RecurrenceRule(DAY, DAY + timedelta(days=2), weekdays=tuple(range(7)), day_start=time(9), day_end=time(12), slot_minutes=60))
+    free = svc.get_free_slots(doctor.id)
+    appts = [svc.book(patient, doctor, slot.slot_id) for slot in free[:count]]
+    return svc, doctor, patient, appts, free[count:]
+
+def walk(page_fn, **filters) -> list:
+    seen, cursor = [], None
+    while True:
+        page = page_fn(cursor=cursor, limit=2, **filters)
+        seen.append([a.appointment_id for a in page.items])
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+
+def test_pages_run_newest_first_and_end_with_no_cursor():
+    svc, doctor, patient, appts, _ = booked_service(5)
+    ids = [a.appointment_id for a in reversed(appts)]
+    assert walk(lambda **kw: svc.page_patient_appointments(patient, **kw)) == [ids[:2], ids[2:4], ids[4:]]
+    assert walk(lambda **kw: svc.page_doctor_appointments(doctor, **kw)) == [ids[:2], ids[2:4], ids[4:]]
+    last = svc.page_patient_appointments(patient, limit=5)
+    assert len(last.items) == 5 and last.next_cursor is None
+
+def test_cursor_is_stable_across_new_bookings():
+    svc, doctor, patient, appts, free = booked_service(4)
+    first = svc.page_patient_appointments(patient, limit=2)
+    newer = svc.book(patient, doctor, free[0].slot_id)
+    second = svc.page_patient_appointments(patient, cursor=first.next_cursor, limit=2)
+    assert [a.appointment_id for a in first.items + second.items] == [a.appointment_id for a in reversed(appts)]
+    assert second.next_cursor is None
+    assert svc.page_patient_appointments(patient, limit=1).items == [newer]
+
+def test_status_and_date_filters():
+    svc, doctor, patient, appts, _ = booked_service(6)
+    for appt in appts[::2]:
+        svc.cancel(appt.appointment_id, patient)
+    booked = walk(lambda **kw: svc.page_patient_appointments(patient, **kw), statuses=[AppointmentStatus.BOOKED])
+    assert sum(booked, []) == [a.appointment_id for a in reversed(appts[1::2])]
+    first_day = datetime.combine(DAY, time())
+    on_day = svc.page_doctor_appointments(doctor, date_from=first_day, date_to=first_day, limit=10)
+    assert [a.appointment_id for a in on_day.items] == [a.appointment_id for a in reversed(appts[:3])]
+    assert on_day.next_cursor is None
+    later = svc.page_doctor_appointments(doctor, statuses=[AppointmentStatus.CANCELLED], date_from=first_day + timedelta(days=1), limit=10)
+    assert later.items == [appts[4]]
@@ -0,0 +1,98 @@
+import csv
+import time as _time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from controllers import AppController
+from models import AppointmentStatus, Doctor, UserRole
+from services import AuthService, AppointmentService
+from services.bulk import APPOINTMENT_FIELDS, SLOT_FIELDS, export_appointments, export_doctors, export_slots, import_appointments, import_doctors, import_slots
+from storage import Storage
+
+def booked_controller() -> AppController:
+    controller = AppController()
+    patient = controller.register_patient("Round Trip", "roundtrip@example.com", "secret")
+    doctor, slot = controller.find_earliest_slots(limit=1)[0]
+    controller.book_appointment(patient, doctor, slot.slot_id)
+    return controller
+
+def test_export_import_round_trip(tmp_path):
+    source = booked_controller().appt_service
+    paths = {kind: str(tmp_path / f"{kind}.csv") for kind in ("doctors", "slots", "appointments")}
+    export_doctors(source, paths["doctors"])
+    export_slots(source, paths["slots"])
+    export_appointments(source, paths["appointments"])
+    auth, appts = AuthService(), AppointmentService()
+    import_doctors(auth, appts, paths["doctors"])
+    import_slots(appts, paths["slots"])
+    report = import_appointments(appts, paths["appointments"])
+    assert (report.imported, report.rejected) == (1, 0)
+    appt = next(iter(appts.appointments.values()))
+    assert appt.status == AppointmentStatus.BOOKED
+    assert appts.slots[appt.slot_id].is_booked
+    assert appt.slot_id not in {s.slot_id for s in appts.get_free_slots(appt.doctor_id)}
+
+def test_conflicting_appointments_are_reported(tmp_path):
+    source = booked_controller().appt_service
+    path = str(tmp_path / "appointments.csv")
+    export_appointments(source, path)
+    report = import_appointments(source, path, strict=False)
+    assert report.rejected == 1 and len(report.errors) == 1
+    assert "already exists" in report.errors[0]
+
+def write_csv(path, fields, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        writer.writerows(rows)
+    return str(path)
+
+def test_doctor_rejects_report_their_own_rows(tmp_path):
+    path = write_csv(tmp_path / "doctors.csv", ("id", "name", "email", "speciality"), [
+        ("d1", "Ann", "ann@example.com", "Cardiology"),
+        ("d2", "Bob", "not-an-email", "Cardiology"),
+        ("d3", "Cy", "ann@example.com", "Cardiology"),
+        ("d1", "Di", "di@example.com", "Cardiology"),
+        ("d5", "Ed", "ed@example.com", "Neurology"),
+    ])
+    report = import_doctors(AuthService(), AppointmentService(), path, batch_size=2, strict=False)
+    assert (report.rows, report.imported, report.rejected) == (5, 2, 3)
+    assert [e.split(":")[0] for e in report.errors] == ["row 2", "row 3", "row 4"]
+    assert "id already in use: d1" in report.errors[2]
+
+def test_slot_overlaps_are_reported_with_rows(tmp_path):
+    appts = AppointmentService()
+    appts.add_doctor(Doctor("d1", "Ann", "ann@example.com", "!", UserRole.DOCTOR, speciality="Cardiology"))
+    day = (date.today() + timedelta(days=1)).isoformat()
+    path = write_csv(tmp_path / "slots.csv", SLOT_FIELDS, [
+        ("s1", "d1", day, "09:00", "09:30", 0),
+        ("s2", "d9", day, "09:00", "09:30", 0),
+        ("s3", "d1", day, "09:15", "09:45", 0),
+        ("s4", "d1", day, "09:30", "10:00", 0),
+    ])
+    report = import_slots(appts, path, batch_size=3, strict=False)
+    assert (report.imported, report.rejected) == (2, 2)
+    assert report.errors[0] == "row 2: unknown doctor d9"
+    assert report.errors[1].startswith("row 3: Slot s3 overlaps")
+
+class SlowStorage(Storage):
+    def save_appointments(self, appts):
+        _time.sleep(0.05)
+
+def test_import_racing_a_booking_keeps_one_holder(tmp_path):
+    controller = AppController(SlowStorage())
+    svc = controller.appt_service
+    patient = controller.register_patient("Racer", "racer@example.com", "secret")
+    doctor, slot = controller.find_earliest_slots(limit=1)[0]
+    path = write_csv(tmp_path / "appointments.csv", APPOINTMENT_FIELDS, [("imp-1", "p-import", doctor.id, slot.slot_id, "BOOKED", "")])
+    with ThreadPoolExecutor(2) as pool:
+        imported = pool.submit(import_appointments, svc, path, strict=False)
+        _time.sleep(0.01)
+        booked = pool.submit(svc.book, patient, doctor, slot.slot_id)
+        report = imported.result()
+        try:
+            booked.result()
+        except ValueError:
+            pass
+    holders = [a for a in svc.appointments.values() if a.slot_id == slot.slot_id and a.status == AppointmentStatus.BOOKED]
+    assert len(holders) == 1
+    assert report.imported + report.rejected == 1
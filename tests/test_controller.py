@@ -0,0 +1,21 @@
+from controllers import AppController
+from models import UserRole
+
+def test_no_admin_without_configured_password(monkeypatch):
+    monkeypatch.delenv("MEDIBOOK_ADMIN_PASSWORD", raising=False)
+    controller = AppController()
+    assert controller.auth.find_user("admin@medibook.local") is None
+    assert not [u for u in controller.auth.users() if u.role == UserRole.ADMIN]
+
+def test_admin_password_from_environment(monkeypatch):
+    monkeypatch.setenv("MEDIBOOK_ADMIN_PASSWORD", "s3cret-admin")
+    controller = AppController()
+    assert controller.login("admin@medibook.local", "admin123") is None
+    assert controller.login("admin@medibook.local", "s3cret-admin").role == UserRole.ADMIN
+
+def test_parsed_speciality_reaches_every_seeded_doctor():
+    controller = AppController()
+    spec = controller.parse_request("I need a cardiologist")["speciality"]
+    names = {d.name for d, _ in controller.find_earliest_slots(spec, limit=50)}
+    assert {"Dr. Arjun Rao", "Dr. Sarah Johnson"} <= names
+    assert len({s.lower() for s in controller.specialities()}) == len(controller.specialities()) == 15
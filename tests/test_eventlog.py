@@ -0,0 +1,68 @@
+import os
+import pickle
+import threading
+from datetime import datetime, time
+from models import Appointment, AppointmentStatus, TimeSlot
+from storage.eventlog import EventLogStorage, LOG_FILE, SNAPSHOT_FILE
+
+def add_slots(storage: EventLogStorage, start: int, stop: int):
+    for n in range(start, stop):
+        storage.save_slots([TimeSlot(f"s-{n}", "doc", datetime(2025, 1, 6), time(n % 24), time(n % 24, 30))])
+
+def drop_last_lines(path: str, n: int):
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    with open(path, "wb") as f:
+        f.writelines(lines[:-n])
+
+def test_snapshot_offset_never_points_past_the_log(tmp_path):
+    path = str(tmp_path)
+    storage = EventLogStorage(path)
+    add_slots(storage, 0, 10)
+    storage.snapshot()
+    storage.close()
+    drop_last_lines(os.path.join(path, LOG_FILE), 3)
+    storage = EventLogStorage(path)
+    assert len(storage.slots) == 10
+    add_slots(storage, 10, 17)
+    storage.snapshot()
+    add_slots(storage, 17, 25)
+    storage.close()
+    storage = EventLogStorage(path)
+    assert sorted(storage.slots) == sorted(f"s-{n}" for n in range(25))
+    storage.close()
+
+def test_snapshot_waits_for_buffered_events(tmp_path):
+    path = str(tmp_path)
+    storage = EventLogStorage(path, durable=False, commit_interval=60)
+    add_slots(storage, 0, 5)
+    storage.snapshot()
+    assert os.path.getsize(os.path.join(path, LOG_FILE)) == storage._log_end
+    storage.close()
+
+def test_appends_proceed_while_a_snapshot_is_written(tmp_path, monkeypatch):
+    path = str(tmp_path)
+    release, dumping = threading.Event(), threading.Event()
+    dump = pickle.dump
+    def blocked_dump(state, f, protocol):
+        dumping.set()
+        release.wait(5)
+        dump(state, f, protocol=protocol)
+    monkeypatch.setattr("storage.eventlog.pickle.dump", blocked_dump)
+    storage = EventLogStorage(path, commit_interval=0.001)
+    add_slots(storage, 0, 5)
+    waiter = threading.Thread(target=storage.snapshot)
+    waiter.start()
+    assert dumping.wait(5)
+    add_slots(storage, 5, 10)
+    storage.save_booking(Appointment("a-1", "p-1", "doc", "s-1", AppointmentStatus.BOOKED, datetime(2025, 1, 1)), storage.load_slots()[1])
+    assert len(storage.slots) == 10 and storage.slots["s-1"][5] == 1
+    release.set()
+    waiter.join()
+    assert isinstance(storage.slots, dict) and len(storage.slots) == 10 and storage.slots["s-1"][5] == 1
+    with open(os.path.join(path, SNAPSHOT_FILE), "rb") as f:
+        assert sorted(pickle.load(f)["slots"]) == [f"s-{n}" for n in range(5)]
+    storage.close()
+    storage = EventLogStorage(path)
+    assert len(storage.slots) == 10 and storage.slots["s-1"][5] == 1 and "a-1" in storage.appointments
+    storage.close()
@@ -0,0 +1,20 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from services.gemini import GeminiClient
+
+class EchoModel:
+    async def generate_content_async(self, prompt: str):
+        await asyncio.sleep(0.01)
+        return type("Resp", (), {"text": f"echo {prompt}"})()
+
+def test_sync_and_async_callers_share_one_loop():
+    client = GeminiClient(EchoModel(), max_concurrency=1)
+    try:
+        with ThreadPoolExecutor(2) as pool:
+            assert list(pool.map(client.generate, ["a", "b"])) == ["echo a", "echo b"]
+        async def both():
+            return await asyncio.gather(client.agenerate("x"), client.agenerate("y"), client.agenerate("x"))
+        assert asyncio.run(both()) == ["echo x", "echo y", "echo x"]
+        assert asyncio.run(client.agenerate("z")) == "echo z"
+    finally:
+        client.close()
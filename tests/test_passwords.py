@@ -0,0 +1,50 @@
+import hashlib
+import time as _time
+from models import Patient, UserRole
+from services import AuthService
+from services.cache import TTLCache
+from services.passwords import PasswordHasher, SessionCache
+
+FAST = (2 ** 4, 8, 1)
+
+def auth_with(stored_hash: str, cost: tuple = FAST) -> AuthService:
+    auth = AuthService(hasher=PasswordHasher(cost))
+    auth.add_users([Patient("p-1", "Legacy", "legacy@example.com", stored_hash, UserRole.PATIENT)])
+    return auth
+
+def test_legacy_sha256_is_rehashed_on_login():
+    auth = auth_with(hashlib.sha256(b"old-secret").hexdigest())
+    assert auth.login("legacy@example.com", "wrong") is None
+    user = auth.login("legacy@example.com", "old-secret")
+    assert user.password_hash.startswith(f"scrypt${FAST[0]}$")
+    assert auth.hasher.rehashes == 1
+    assert auth.login("legacy@example.com", "old-secret") is user
+    assert auth.hasher.rehashes == 1
+
+def test_cost_change_triggers_rehash():
+    old = PasswordHasher((2 ** 5, 8, 1)).hash("secret")
+    hasher = PasswordHasher(FAST)
+    assert hasher.needs_rehash(old) and not PasswordHasher((2 ** 5, 8, 1)).needs_rehash(old)
+    auth = auth_with(old)
+    user = auth.login("legacy@example.com", "secret")
+    assert not hasher.needs_rehash(user.password_hash) and user.password_hash != old
+
+def test_sessions_expire_and_end():
+    auth = auth_with(PasswordHasher(FAST).hash("secret"))
+    auth.sessions = SessionCache(ttl=0.05)
+    user, token = auth.create_session("legacy@example.com", "secret")
+    assert auth.resume_session(token) is user
+    other = auth.start_session(user)
+    auth.end_session(other)
+    assert auth.resume_session(other) is None
+    _time.sleep(0.1)
+    assert auth.resume_session(token) is None
+    assert (auth.sessions.hits, auth.sessions.misses) == (1, 2)
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c"), len(cache)) == (1, None, 3, 2)
@@ -0,0 +1,46 @@
+from datetime import date
+from services import AIRecommendationService, AppointmentService
+from services.query_parser import LOCAL_PARSE_CONFIDENCE, parse_query
+
+TODAY = date(2025, 3, 5)
+
+def test_confident_parse_with_date_and_time_of_day():
+    parsed = parse_query("I need a cardiologist tomorrow morning", today=TODAY)
+    assert parsed.as_dict() == {"speciality": "Cardiology", "urgency": None, "preferred_time_of_day": "morning", "date_hint": "2025-03-06"}
+    assert parsed.confidence >= LOCAL_PARSE_CONFIDENCE
+
+def test_speciality_maps_to_roster_spelling():
+    assert parse_query("heart problems", ["Neurology", "Cardiologist"], today=TODAY).speciality == "Cardiologist"
+
+def test_ambiguous_or_missing_speciality_is_not_confident():
+    assert parse_query("rash and chest pain", today=TODAY).confidence < LOCAL_PARSE_CONFIDENCE
+    assert parse_query("book me something next week", today=TODAY).confidence == 0
+
+def test_relative_and_absolute_dates():
+    hints = {text: parse_query(f"dermatologist {text}", today=TODAY).date_hint for text in
+             ("in 2 weeks", "in three days", "day after tomorrow", "on friday", "next friday", "next week", "next month", "march 1st", "2025-04-10")}
+    assert hints == {"in 2 weeks": "2025-03-19", "in three days": "2025-03-08", "day after tomorrow": "2025-03-07", "on friday": "2025-03-07",
+                     "next friday": "2025-03-14", "next week": "2025-03-10", "next month": "2025-04-01", "march 1st": "2026-03-01",
+                     "2025-04-10": "2025-04-10"}
+
+def test_out_of_range_dates_are_ignored():
+    assert parse_query("cardiologist in 99999999 days", today=TODAY).date_hint is None
+    assert parse_query("cardiologist on feb 29", today=date(2024, 3, 5)).date_hint is None
+    assert parse_query("cardiologist on 2025-02-30", today=TODAY).date_hint is None
+
+def test_clock_times_pick_time_of_day():
+    assert [parse_query(f"neurologist at {t}", today=TODAY).preferred_time_of_day for t in ("9am", "3:30 pm", "7 pm", "12 pm")] == \
+        ["morning", "afternoon", "evening", "afternoon"]
+
+def test_urgency_prefers_high():
+    assert parse_query("urgent routine checkup with a dermatologist", today=TODAY).urgency == "high"
+
+class FailingClient:
+    def generate(self, prompt: str) -> str:
+        raise RuntimeError("offline")
+
+def test_service_falls_back_to_local_fields():
+    svc = AIRecommendationService(AppointmentService(), client=FailingClient())
+    assert svc.parse_natural_query("cardiologist tomorrow")["speciality"] == "Cardiology"
+    assert svc.parse_natural_query("something for my rash and chest pain in 99999999 days") == {}
+    assert (svc.local_parses, svc.model_parses) == (1, 1)
@@ -0,0 +1,77 @@
+from datetime import date, time, timedelta
+from models import Doctor, RecurrenceRule, UserRole
+from services import AppointmentService
+from services.search import DoctorSearchIndex
+
+def doctor(i: int, name: str, speciality: str, exp: int, location: str = "Boston", mode: str = "In-person") -> Doctor:
+    return Doctor(f"d{i}", name, f"d{i}@example.com", "!", UserRole.DOCTOR, speciality=speciality, experience_years=exp,
+                  location=location, consultation_mode=mode)
+
+DOCTORS = [
+    doctor(1, "Ann Carter", "Cardiology", 5),
+    doctor(2, "Bob Cardenas", "Neurology", 9, "Denver"),
+    doctor(3, "Cy Stone", "Gastroenterology", 12, mode="Video"),
+    doctor(4, "Di Moss", "Cardiology", 20, "Denver", "Video"),
+    doctor(5, "Ed Park", "Dermatology", 1),
+]
+
+def index() -> DoctorSearchIndex:
+    idx = DoctorSearchIndex()
+    idx.add_many([(d, (date(2025, 1, 10 - i).toordinal(), 0)) for i, d in enumerate(DOCTORS)])
+    return idx
+
+def ids(page) -> list:
+    return [d.id for d in page.items]
+
+def test_prefix_and_multi_word_text():
+    idx = index()
+    assert ids(idx.search("car")) == ["d4", "d2", "d1"]
+    assert ids(idx.search("ann card")) == ["d1"]
+    assert ids(idx.search("CARD  bob")) == ["d2"]
+
+def test_trigram_substrings():
+    idx = index()
+    assert ids(idx.search("gastroenterolog")) == ["d3"]
+    assert ids(idx.search("ardio")) == ["d4", "d1"]
+    assert idx.search("zzz").total == 0
+
+def test_attribute_postings_combine_with_text():
+    idx = index()
+    assert ids(idx.search(speciality="cardiology")) == ["d4", "d1"]
+    assert ids(idx.search(location="denver", mode="video")) == ["d4"]
+    assert ids(idx.search("car", location="Boston")) == ["d1"]
+    assert ids(idx.search(speciality="Pediatrics")) == []
+
+def test_ranking_by_experience_or_availability():
+    idx = index()
+    assert ids(idx.search()) == ["d4", "d3", "d2", "d1", "d5"]
+    assert ids(idx.search(sort="availability")) == ["d5", "d4", "d3", "d2", "d1"]
+    idx.set_availability("d1", (date(2025, 1, 1).toordinal(), 0))
+    assert ids(idx.search(sort="availability", limit=1)) == ["d1"]
+
+def test_offset_limit_paging():
+    idx = index()
+    pages, offset = [], 0
+    while offset is not None:
+        page = idx.search(limit=2, offset=offset)
+        assert page.total == 5
+        pages.append(ids(page))
+        offset = page.next_offset
+    assert pages == [["d4", "d3"], ["d2", "d1"], ["d5"]]
+    filtered = idx.search("car", limit=2, offset=2)
+    assert (ids(filtered), filtered.next_offset) == (["d1"], None)
+    assert ids(idx.search(text="c", speciality="cardiology", offset=1, limit=5)) == ["d1"]
+
+def test_service_index_follows_added_and_updated_doctors():
+    svc = AppointmentService()
+    svc.add_doctors(DOCTORS[:2])
+    assert ids(svc.search_doctors("car")) == ["d2", "d1"]
+    svc.add_doctor(doctor(1, "Ann Carter", "Pediatrics", 30, "Austin"))
+    assert ids(svc.search_doctors(speciality="cardiology")) == []
+    assert ids(svc.search_doctors(location="austin")) == ["d1"]
+    assert ids(svc.search_doctors("car")) == ["d1", "d2"]
+    svc.add_doctor(DOCTORS[4])
+    assert ids(svc.search_doctors(sort="availability")) == ["d1", "d2", "d5"]
+    day = date.today() + timedelta(days=3)
+    svc.publish_schedule("d5", RecurrenceRule(day, day, weekdays=tuple(range(7)), day_start=time(9), day_end=time(10)))
+    assert ids(svc.search_doctors(sort="availability"))[0] == "d5"
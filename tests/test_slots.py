@@ -0,0 +1,32 @@
+import time as _time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from models import Doctor, RecurrenceRule
+from services import AppointmentService
+from storage import Storage
+
+class SlowStorage(Storage):
+    def save_slots(self, slots):
+        _time.sleep(0.02)
+
+def test_concurrent_publishes_never_overlap():
+    svc = AppointmentService(SlowStorage())
+    doctor = Doctor.create("Dr. Race", "race@example.com", None, "Cardiology", password_hash="!")
+    svc.add_doctor(doctor)
+    start = date.today() + timedelta(days=1)
+    rules = [RecurrenceRule(start, start, day_start=time(9, minutes), weekdays=tuple(range(7))) for minutes in (0, 10, 20, 0)]
+    with ThreadPoolExecutor(len(rules)) as pool:
+        list(pool.map(lambda rule: svc.publish_schedule(doctor.id, rule, skip_overlaps=True), rules))
+    slots = svc.get_doctor_slots(doctor.id)
+    assert len(slots) in (15, 16)
+    assert all(a.end_time <= b.start_time for a, b in zip(slots, slots[1:]))
+
+def test_earliest_slots_after_batched_inserts():
+    svc = AppointmentService()
+    doctor = Doctor.create("Dr. Batch", "batch@example.com", None, "Neurology", password_hash="!")
+    svc.add_doctor(doctor)
+    day = date.today() + timedelta(days=1)
+    svc.publish_schedule(doctor.id, RecurrenceRule(day, day, weekdays=tuple(range(7)), day_start=time(13), day_end=time(15)))
+    svc.publish_schedule(doctor.id, RecurrenceRule(day, day, weekdays=tuple(range(7)), day_start=time(9), day_end=time(11)))
+    found = svc.find_earliest_slots("neurology", limit=8)
+    assert [s.start_time.hour * 60 + s.start_time.minute for _, s in found] == [540, 570, 600, 630, 780, 810, 840, 870]